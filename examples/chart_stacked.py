@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stacked Charts
+--------------
+
+Three lanes with independent vertical axes sharing one horizontal axis.
+"""
+import os
+import signal
+import sys
+import numpy as np
+from qtpy.QtCore import QTimer
+from qtpy.QtWidgets import QApplication
+
+
+PKG_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+if PKG_DIR not in sys.path:
+    sys.path.append(PKG_DIR)
+
+
+from qplotutils.chart.items import LineChartItem
+from qplotutils.chart.stacked import StackedChartView
+from qplotutils.chart.view import ChartView
+
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+
+if __name__ == "__main__":
+    """ Minimal example showing three stacked lanes.
+    Panning or zooming one lane moves the time axis of all lanes.
+    """
+
+    def sigint_handler(signum, frame):
+        """ Install handler for the SIGINT signal. To kill app through shell.
+
+        :param signum:
+        :param frame:
+        :return:
+        """
+        QApplication.exit()
+
+    signal.signal(signal.SIGINT, sigint_handler)
+
+    qapp = QApplication([])
+
+    # call the python loop periodically to catch interrupts from shell
+    timer = QTimer()
+    timer.start(1000)
+    timer.timeout.connect(lambda: None)
+
+    view = StackedChartView(lanes=3, orientation=ChartView.CARTESIAN)
+    view.resize(800, 600)
+
+    x = np.arange(-30, 300, 0.2, dtype=np.float64)
+    for lane, amplitude in enumerate([1.0, 50.0, 2000.0]):
+        l = LineChartItem()
+        y = amplitude * np.sin(2 * np.pi * (lane + 1) / float(max(x) - min(x)) * x)
+        l.plot(y, x, "lane {}".format(lane))
+        view.addItem(l, lane)
+
+    view.autoRange()
+    view.show()
+    qapp.exec_()
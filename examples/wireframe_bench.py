@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wire frame benchmark
+--------------------
+
+Draws N mesh items sharing one shader program and reports the time per frame, the GL state changes and the
+uniform uploads. The color map uniform is changed between frames with ShaderProgram.setUniform.
+
+Usage: wireframe_bench.py [N] [FRAMES]
+"""
+import os
+import sys
+import time
+import logging
+
+from qtpy.QtWidgets import QApplication
+
+PKG_DIR = os.path.abspath(os.path.join(__file__, "..", ".."))
+if PKG_DIR not in sys.path:
+    sys.path.append(PKG_DIR)
+
+from qplotutils.wireframe.items import MeshItem, Mesh
+from qplotutils.wireframe.view import ChartView3d
+
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+
+_log = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    qapp = QApplication([])
+
+    w = ChartView3d()
+    w.resize(800, 600)
+    w.show()
+    w.props.distance = 40
+
+    side = int(n ** 0.5) + 1
+    mesh = Mesh.sphere(12, 12, 0.4)
+    items = []
+    for k in range(n):
+        b = MeshItem(mesh, shader="heightColor", smooth=True)
+        b.translate(k % side - side / 2.0, k // side - side / 2.0, 0)
+        w.addItem(b)
+        items.append(b)
+
+    program = items[0].shader_program
+    qapp.processEvents()
+
+    # warm up, buffers are uploaded with the first frame
+    w.repaint()
+    w.glState.resetCounters()
+    program.uploads = program.skipped = 0
+
+    t = time.perf_counter()
+    for f in range(frames):
+        w.makeCurrent()
+        program.setUniform("colorMap", [1, 1, 1, 1, 0.5 + 0.5 * f / frames, 1, 1, 0, 1])
+        w.repaint()
+    dt = (time.perf_counter() - t) / frames
+
+    print("{} items, {} frames: {:.2f} ms per frame".format(n, frames, dt * 1000))
+    print("GL state changes: {}".format(w.glState.counters))
+    print("Uniform uploads: {}, skipped: {}".format(program.uploads, program.skipped))
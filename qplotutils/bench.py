@@ -8,8 +8,15 @@ Widgets to create IDE like workbenches with dock widgets that can be rearanged a
 """
 import json
 import logging
+import mmap
+import os
 import pickle
+import struct
 import uuid
+import zlib
+from collections import OrderedDict
+
+import numpy as np
 
 import math
 from qtpy.QtCore import (
@@ -68,6 +75,12 @@ _log = logging.getLogger(__name__)
 _log.setLevel(LOG_LEVEL)
 
 
+#: Leading bytes of bench snapshots
+SNAPSHOT_MAGIC = b"QPUSNAP\x00"
+
+#: Version of the snapshot format written by this module
+SNAPSHOT_VERSION = 1
+
 # TODO:  Equal sized adding
 # TODO: Min Sizes configurable
 # TODO: Detach / Reattach from Bench
@@ -166,6 +179,117 @@ class Placement(object):
     LEFT, TOP, RIGHT, BOTTOM, TAB = ["Left", "Top", "Right", "Bottom", "Tab"]
 
 
+class ItemRegistry(object):
+    """ Resolves the factories of the bench items referenced in saved layouts.
+
+    Layouts reference items by module and class name. Factories can be registered for these names, all other
+    names are imported once and cached.
+    """
+
+    _factories = {}
+
+    @classmethod
+    def key(cls, module_str, class_str):
+        return "{}.{}".format(module_str, class_str)
+
+    @classmethod
+    def register(cls, klass, factory=None):
+        """ Registers the factory that creates instances of the bench item class.
+
+        :param klass: BenchItem subclass as referenced by saved layouts
+        :param factory: callable with the constructor signature of the class, defaults to the class itself
+        :return: the class, so this can be used as decorator
+        """
+        cls._factories[cls.key(klass.__module__, klass.__name__)] = (
+            klass if factory is None else factory
+        )
+        return klass
+
+    @classmethod
+    def resolve(cls, module_str, class_str):
+        """ Returns the factory for the bench item.
+
+        :param module_str: module name
+        :param class_str: class name
+        :return: callable that creates the item
+        """
+        key = cls.key(module_str, class_str)
+        factory = cls._factories.get(key)
+        if factory is None:
+            mod = __import__(module_str, fromlist=[class_str])
+            factory = cls._factories[key] = getattr(mod, class_str)
+        return factory
+
+
+class UpdateScheduler(object):
+    """ Defers the updates of docks that are not visible on the bench.
+
+    Updates of a visible dock are executed right away. For hidden docks, e.g. inactive tabs or collapsed
+    splitter sections, only the latest update per key is kept and executed once the dock becomes visible
+    again.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+        #: number of updates executed right away
+        self.executed = 0
+        #: number of updates deferred because the dock was hidden
+        self.deferred = 0
+
+    @classmethod
+    def isDockVisible(cls, dock):
+        """ True if at least a part of the dock is on screen.
+
+        :param dock: the dock
+        """
+        return dock.isVisible() and dock.width() > 0 and dock.height() > 0
+
+    def schedule(self, dock, callback, key=None):
+        """ Executes the callback if the dock is visible, otherwise marks the dock dirty.
+
+        :param dock: the dock the update belongs to
+        :param callback: callable without arguments
+        :param key: updates with the same key replace each other, defaults to the callback
+        :return: True if the callback was executed
+        """
+        if self.isDockVisible(dock):
+            self.executed += 1
+            callback()
+            return True
+
+        self.deferred += 1
+        pending = self._pending.setdefault(dock.uid, OrderedDict())
+        key = callback if key is None else key
+        pending.pop(key, None)
+        pending[key] = callback
+        return False
+
+    def isDirty(self, dock):
+        return dock.uid in self._pending
+
+    def flush(self, docks):
+        """ Executes the pending updates of the docks that are visible.
+
+        :param docks: list of docks
+        """
+        for dock in docks:
+            if dock.uid not in self._pending or not self.isDockVisible(dock):
+                continue
+
+            pending = self._pending.pop(dock.uid)
+            _log.debug("Flushing {} updates of {}".format(len(pending), dock))
+            for callback in pending.values():
+                callback()
+
+    def discard(self, dock):
+        """ Drops the pending updates of the dock, e.g. when it is closed.
+
+        :param dock: the dock
+        """
+        self._pending.pop(dock.uid, None)
+
+
 class Bench(QWidget):
     """ Widget that provides the area on which docks can be added and moved around completely free
 
@@ -190,6 +314,18 @@ class Bench(QWidget):
         self.root_container.contentModified.connect(self.__contentModified)
         self.layout.addWidget(self.root_container)
 
+        #: defers updates of hidden docks
+        self.scheduler = UpdateScheduler()
+
+        # uid -> dock and dock uid -> tab container, maintained by the tab containers
+        self.__dockIndex = {}
+        self.__containerIndex = {}
+
+        # flattened lists, rebuilt on demand after the content was modified
+        self.__dockList = None
+        self.__containerList = None
+        self.contentModified.connect(self.__invalidate)
+
     @classmethod
     def __widgetIndex(cls, placement):
         if placement in [Placement.TOP, Placement.LEFT]:
@@ -207,6 +343,41 @@ class Bench(QWidget):
     def __contentModified(self):
         self.contentModified.emit()
 
+    def __invalidate(self):
+        self.__dockList = None
+        self.__containerList = None
+
+    def _indexDock(self, dock, container):
+        """ Registers the dock placed in the tab container.
+
+        :param dock: the dock
+        :param container: the TabContainer holding the dock
+        """
+        self.__dockIndex[dock.uid] = dock
+        self.__containerIndex[dock.uid] = container
+        self.__invalidate()
+
+    def _unindexDock(self, dock, container):
+        """ Removes the dock from the index, unless it was moved to another container meanwhile.
+
+        :param dock: the dock
+        :param container: the TabContainer the dock is removed from
+        """
+        if self.__containerIndex.get(dock.uid) is not container:
+            return
+
+        del self.__dockIndex[dock.uid]
+        del self.__containerIndex[dock.uid]
+        self.__invalidate()
+
+    def getContainer(self, uid):
+        """ Returns the tab container that holds the dock with the given UID.
+
+        :param uid: Dock UID
+        :return: TabContainer if found else None
+        """
+        return self.__containerIndex.get(uid)
+
     def addDock(self, dock, placement=Placement.BOTTOM, ref=None):
         """ Adds a dock to the bench.
 
@@ -318,13 +489,8 @@ class Bench(QWidget):
         """
         _log.debug("Dock move: {}, {}, {}".format(dock_uid, placement, ref_uid))
 
-        dock = None
-        ref = None
-        for d in self.root_container.flatDockList:
-            if d.uid == dock_uid:
-                dock = d
-            elif d.uid == ref_uid:
-                ref = d
+        dock = self.getDock(dock_uid)
+        ref = self.getDock(ref_uid) if ref_uid != dock_uid else None
 
         previous_container = dock.parentContainer
         self.addDock(dock, placement, ref)
@@ -333,23 +499,38 @@ class Bench(QWidget):
     def getDock(self, uid):
         """ Returns the dock with the given UID if dock is part of this bench.
 
+        Docks restored by loadLayout that were not shown yet are PlaceholderDock instances, they are replaced by
+        the real dock (with the same UID) once their tab is activated.
+
         :param uid: Dock UID
         :return: Dock instance if found else None
         """
-        for d in self.root_container.flatDockList:
-            if d.uid == uid:
-                return d
-
-        return None
+        return self.__dockIndex.get(uid)
         # raise BenchException("No such dock on bench")
 
     @property
     def docks(self):
         """ List a dock on the bench.
 
+        Docks that were not shown since loadLayout are PlaceholderDock instances, see getDock.
+
         :return: list with all docks
         """
-        return self.root_container.flatDockList
+        if self.__dockList is None:
+            self.__dockList = self.root_container.flatDockList
+        return list(self.__dockList)
+
+    @property
+    def containers(self):
+        """ List of all containers on the bench, the root container first.
+
+        :return: list with all containers
+        """
+        if self.__containerList is None:
+            self.__containerList = [
+                self.root_container
+            ] + self.root_container.flatContainerList
+        return list(self.__containerList)
 
     def saveLayout(self, filename=None):
         """ Saves the benches dock layout to filename
@@ -370,25 +551,174 @@ class Bench(QWidget):
 
         :param filename: Full path to layout json file
         """
+        with open(filename, "r") as fh:
+            layout = json.load(fh)
+
+        self.__restoreLayout(layout)
+
+    def __restoreLayout(self, layout):
         self.clearAll()
         self.root_container.setParent(None)
         self.root_container.close()
 
-        with open(filename, "r") as fh:
-            layout = json.load(fh)
+        klass = ItemRegistry.resolve(layout["module"], layout["class"])
+
+        self.root_container = klass(self, None)
+        self.root_container.contentModified.connect(self.__contentModified)
+        self.layout.addWidget(self.root_container)
 
-            module_str = layout["module"]
-            class_str = layout["class"]
+        self.root_container.loadLayout(layout)
 
-            # Bootstrap part II: Make the child containers
-            mod = __import__(module_str, fromlist=[class_str])
-            klass = getattr(mod, class_str)
+    def saveSnapshot(self, filename=None):
+        """ Saves the layout together with the state of every dock as compact binary snapshot.
+
+        The snapshot starts with SNAPSHOT_MAGIC and a big endian header of version (uint16) and payload size
+        (uint32), followed by the zlib compressed JSON payload. Numpy arrays in the dock states are not
+        inlined: memory maps spanning their whole mapping are referenced by file, dtype, shape, offset and order.
+        Other arrays, including views of memory maps, are saved as .npy files next to the snapshot. All arrays
+        are loaded as memory maps on restore.
+
+        :param filename: Full path of the snapshot file, optional
+        :return: the snapshot
+        """
+        directory = None if filename is None else os.path.dirname(filename)
+        prefix = None if filename is None else os.path.basename(filename)
+
+        arrays = []
+
+        def encode(value):
+            if (
+                isinstance(value, np.memmap)
+                and isinstance(value.base, mmap.mmap)
+                and value.filename
+            ):
+                # views share the offset of their memory map, only the whole mapping can be referenced
+                arrays.append(value.filename)
+                return {
+                    "__memmap__": value.filename,
+                    "dtype": np.lib.format.dtype_to_descr(value.dtype),
+                    "shape": list(value.shape),
+                    "offset": int(value.offset),
+                    "order": (
+                        "F"
+                        if value.flags.f_contiguous and not value.flags.c_contiguous
+                        else "C"
+                    ),
+                }
+            if isinstance(value, np.ndarray):
+                if directory is None:
+                    raise BenchException("Arrays can only be saved in snapshot files")
+                path = "{}.{}.npy".format(prefix, len(arrays))
+                np.save(os.path.join(directory, path), value)
+                arrays.append(path)
+                return {"__array__": path}
+            if isinstance(value, dict):
+                return {k: encode(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [encode(v) for v in value]
+            if isinstance(value, np.generic):
+                return value.item()
+            return value
+
+        states = {d.uid: d.saveSnapshot() for d in self.docks}
+        snapshot = {
+            "layout": self.root_container.saveLayout(),
+            "states": encode(states),
+        }
+
+        payload = zlib.compress(
+            json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+        )
+        data = (
+            SNAPSHOT_MAGIC
+            + struct.pack(">HI", SNAPSHOT_VERSION, len(payload))
+            + payload
+        )
+
+        if filename is not None:
+            with open(filename, "wb") as fh:
+                fh.write(data)
+
+        return data
+
+    def loadSnapshot(self, source, directory=None):
+        """ Restores layout and dock states from a snapshot. States of docks that are created lazily are
+        applied once the dock is created.
 
-            self.root_container = klass(self, None)
-            self.root_container.contentModified.connect(self.__contentModified)
-            self.layout.addWidget(self.root_container)
+        The .npy files of a snapshot file are looked up next to it. Snapshot bytes that reference such files
+        need the directory they were saved to.
 
-            self.root_container.loadLayout(layout)
+        :param source: Full path of the snapshot file or the snapshot bytes
+        :param directory: Directory of the .npy files, defaults to the directory of the snapshot file
+        """
+        if isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        else:
+            if directory is None:
+                directory = os.path.dirname(os.path.abspath(source))
+            with open(source, "rb") as fh:
+                data = fh.read()
+
+        header = len(SNAPSHOT_MAGIC) + struct.calcsize(">HI")
+        if len(data) < header or not data.startswith(SNAPSHOT_MAGIC):
+            raise BenchException("Not a bench snapshot")
+
+        version, size = struct.unpack(">HI", data[len(SNAPSHOT_MAGIC) : header])
+        if version > SNAPSHOT_VERSION:
+            raise BenchException("Unsupported snapshot version {}".format(version))
+        if len(data) - header != size:
+            raise BenchException(
+                "Snapshot payload has {} bytes, expected {}".format(
+                    len(data) - header, size
+                )
+            )
+
+        def decode(value):
+            if isinstance(value, dict):
+                if "__memmap__" in value:
+                    return np.memmap(
+                        os.path.join(directory or "", value["__memmap__"]),
+                        dtype=np.lib.format.descr_to_dtype(value["dtype"]),
+                        mode="r",
+                        offset=value["offset"],
+                        shape=tuple(value["shape"]),
+                        order=value["order"],
+                    )
+                if "__array__" in value and len(value) == 1:
+                    if directory is None:
+                        raise BenchException(
+                            "Snapshot references {}, a directory is required".format(
+                                value["__array__"]
+                            )
+                        )
+                    path = os.path.join(directory, value["__array__"])
+                    return np.load(path, mmap_mode="r")
+                return {k: decode(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [decode(v) for v in value]
+            return value
+
+        # decode everything before the current layout is torn down
+        try:
+            snapshot = json.loads(zlib.decompress(data[header:]).decode("utf-8"))
+            layout = snapshot["layout"]
+            states = decode(snapshot["states"])
+        except (
+            zlib.error,
+            UnicodeDecodeError,
+            ValueError,
+            KeyError,
+            TypeError,
+            OSError,
+        ) as ex:
+            raise BenchException("Corrupt snapshot: {}".format(ex))
+
+        self.__restoreLayout(layout)
+
+        for dock in self.docks:
+            state = states.get(dock.uid)
+            if state is not None:
+                dock.loadSnapshot(state)
 
     def clearAll(self):
         """ Removes all docks from the bench.
@@ -429,6 +759,39 @@ class Dock(BenchItem):
         """
         self.layout().addWidget(widget)
 
+    @property
+    def bench(self):
+        """ The bench the dock is placed on, None if the dock is not placed. """
+        if self.parentContainer is None:
+            return None
+        return self.parentContainer._bench
+
+    def scheduleUpdate(self, callback, key=None):
+        """ Executes the callback now if the dock is visible, otherwise once it becomes visible.
+
+        .. see: UpdateScheduler.schedule()
+
+        :param callback: callable without arguments
+        :param key: updates with the same key replace each other, defaults to the callback
+        :return: True if the callback was executed
+        """
+        bench = self.bench
+        if bench is None:
+            callback()
+            return True
+        return bench.scheduler.schedule(self, callback, key)
+
+    def showEvent(self, event):
+        super(Dock, self).showEvent(event)
+        if self.bench is not None:
+            self.bench.scheduler.flush([self])
+
+    def resizeEvent(self, event):
+        super(Dock, self).resizeEvent(event)
+        # a collapsed splitter section is expanded again
+        if self.bench is not None:
+            self.bench.scheduler.flush([self])
+
     @property
     def title(self):
         return self._tab.title
@@ -448,13 +811,83 @@ class Dock(BenchItem):
         return layout
 
     def loadLayout(self, layout):
+        self._uid = layout.get("uid", self._uid)
         self.title = layout["title"]
 
+    def saveSnapshot(self):
+        """ State of the dock stored in bench snapshots. Collects the states of the widgets added to the dock
+        that provide a saveSnapshot (or save_snapshot) method.
+
+        :return: JSON serializable dict, numpy arrays are allowed
+        """
+        widgets = []
+        for k in range(self.layout().count()):
+            w = self.layout().itemAt(k).widget()
+            save = getattr(w, "saveSnapshot", None) or getattr(w, "save_snapshot", None)
+            widgets.append(save() if save is not None else None)
+        return {"widgets": widgets}
+
+    def loadSnapshot(self, state):
+        """ Restores the state saved by saveSnapshot. Widgets are restored with their loadSnapshot (or
+        load_snapshot) method.
+
+        :param state: dict
+        """
+        widgets = state.get("widgets", [])
+        for k in range(min(self.layout().count(), len(widgets))):
+            w = self.layout().itemAt(k).widget()
+            load = getattr(w, "loadSnapshot", None) or getattr(w, "load_snapshot", None)
+            if widgets[k] is not None and load is not None:
+                load(widgets[k])
+
     def closeEvent(self, event):
         _log.debug("Close event")
         self.closing.emit(self.uid)
 
 
+class PlaceholderDock(Dock):
+    """ Stands in for a dock of a restored layout until the dock is shown for the first time.
+
+    :param layout: saved layout of the dock
+    """
+
+    def __init__(self, layout):
+        super(PlaceholderDock, self).__init__(layout.get("title", "Dock"))
+        self._uid = layout.get("uid", self._uid)
+        self._layout = layout
+        self._snapshot = None
+
+    def saveLayout(self):
+        return dict(self._layout)
+
+    def loadLayout(self, layout):
+        self._layout = layout
+        self.title = layout.get("title", self.title)
+
+    def saveSnapshot(self):
+        return self._snapshot
+
+    def loadSnapshot(self, state):
+        # applied to the real dock once it is created
+        self._snapshot = state
+
+    def materialize(self):
+        """ Creates the real dock and puts it in place of the placeholder.
+
+        :return: the dock
+        """
+        klass = ItemRegistry.resolve(self._layout["module"], self._layout["class"])
+        dock = klass()
+        dock.loadLayout(self._layout)
+        if self._snapshot is not None:
+            dock.loadSnapshot(self._snapshot)
+
+        container = self.parentContainer
+        if container is not None:
+            container.replaceDock(self, dock)
+        return dock
+
+
 class AbstractContainer(BenchItem):
     closing = Signal(object)
     contentModified = Signal()
@@ -528,9 +961,14 @@ class SplitterContainer(AbstractContainer):
         self._splitter.setHandleWidth(2)
 
         self.layout.addWidget(self._splitter)
+        self._splitter.splitterMoved.connect(self.__splitterMoved)
 
         self._sizes = []
 
+    def __splitterMoved(self, pos, index):
+        # collapsed docks might have become visible again
+        self._bench.scheduler.flush(self.flatDockList)
+
     @property
     def orientation(self):
         return self._splitter.orientation()
@@ -626,12 +1064,8 @@ class SplitterContainer(AbstractContainer):
 
     def loadLayout(self, layout):
         for k, child in enumerate(layout["children"]):
-            module_str = child["module"]
-            class_str = child["class"]
-
             # Bootstrap part II: Make the child containers
-            mod = __import__(module_str, fromlist=[class_str])
-            klass = getattr(mod, class_str)
+            klass = ItemRegistry.resolve(child["module"], child["class"])
 
             child_obj = klass(self._bench, self)
             self.addItem(k, child_obj)
@@ -687,10 +1121,17 @@ class TabContainer(AbstractContainer):
     def activateTab(self, uid):
         _log.debug("Activating tab for dock: {}".format(uid))
 
+        for d in self.flatDockList:
+            if d.uid == uid and isinstance(d, PlaceholderDock):
+                # the real dock takes the uid of the placeholder
+                d.materialize()
+                break
+
         for d in self.flatDockList:
             if d.uid == uid:
                 self._dockstack.setCurrentWidget(d)
                 d.tab.setActive(True)
+                self._bench.scheduler.flush([d])
             else:
                 d.tab.setActive(False)
 
@@ -704,6 +1145,8 @@ class TabContainer(AbstractContainer):
 
                 was_active = d.tab.active
 
+                self._bench.scheduler.discard(d)
+                self._bench._unindexDock(d, self)
                 d.tab.setParent(None)
                 d.tab._dock = None
                 d.parentContainer = None
@@ -730,6 +1173,19 @@ class TabContainer(AbstractContainer):
         return self.flatDockList
 
     def addItem(self, index, item):
+        self._insertDock(index, item)
+        # a placeholder is created once it is shown, e.g. when moved into an empty container
+        if (
+            not isinstance(item, PlaceholderDock)
+            or self._dockstack.currentWidget() is item
+        ):
+            self.activateTab(item.uid)
+
+        item.setVisible(True)
+        item.tab.setVisible(True)
+
+    def _insertDock(self, index, item):
+        """ Adds the dock without activating it. """
 
         # _config.debug check
         if not isinstance(item, Dock):
@@ -738,13 +1194,10 @@ class TabContainer(AbstractContainer):
         item.parentContainer = self
         item.closing.connect(self.closeChild)
         item.activated.connect(self.activateTab)
+        self._bench._indexDock(item, self)
 
         self._tabbar.addTab(index, item)
         self._dockstack.insertWidget(index, item)
-        self.activateTab(item.uid)
-
-        item.setVisible(True)
-        item.tab.setVisible(True)
 
     @classmethod
     def __checkEventMimeTypeData(cls, event):
@@ -886,23 +1339,56 @@ class TabContainer(AbstractContainer):
         for dock in self.flatDockList:
             children.append(dock.saveLayout())
         layout["children"] = children
+        layout["active"] = self._dockstack.currentIndex()
 
         return layout
 
     def loadLayout(self, layout):
+        """ Restores the docks. Only the active dock is created right away, the others are represented by
+        placeholders until their tab is activated.
 
-        for k, child in enumerate(layout["children"]):
-            module_str = child["module"]
-            class_str = child["class"]
+        :param layout: dict with layout information.
+        """
+        children = layout["children"]
+        active = layout.get("active", len(children) - 1)
+
+        for k, child in enumerate(children):
+            if k == active:
+                # Bootstrap part II: Make the docks
+                klass = ItemRegistry.resolve(child["module"], child["class"])
+                child_obj = klass()
+                child_obj.loadLayout(child)
+                self.addItem(k, child_obj)
+            else:
+                # not activated, even if it is the first widget of the stack
+                child_obj = PlaceholderDock(child)
+                self._insertDock(k, child_obj)
+                child_obj.tab.setVisible(True)
 
-            # Bootstrap part II: Make the child containers
-            mod = __import__(module_str, fromlist=[class_str])
-            klass = getattr(mod, class_str)
+        if 0 <= active < len(children):
+            self.activateTab(self.flatDockList[active].uid)
 
-            child_obj = klass()
-            self.addItem(k, child_obj)
+    def replaceDock(self, old, new):
+        """ Puts the new dock in place of the old one, e.g. to replace a placeholder.
 
-            child_obj.loadLayout(child)
+        The new dock is not activated, activating it is up to the caller (e.g. activateTab).
+
+        :param old: dock on this container
+        :param new: dock that takes the place and uid of the old dock
+        """
+        index = self._dockstack.indexOf(old)
+
+        self._bench.scheduler.discard(old)
+        self._bench._unindexDock(old, self)
+        old.tab.setParent(None)
+        self._dockstack.removeWidget(old)
+        old.parentContainer = None
+        old.setParent(None)
+        old.deleteLater()
+
+        new._uid = old.uid
+        self._insertDock(index, new)
+        new.tab.setVisible(True)
 
 
 class DropOverlay(QWidget):
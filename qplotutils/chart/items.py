@@ -67,6 +67,22 @@ class BaseMixin(object):
         """
         pass
 
+    def renderState(self):
+        """ Data derived from the current visible range that is expensive to recompute. The view history keeps it
+        along with the range and hands it back through restoreRenderState.
+
+        :return: opaque render state or None if there is nothing worth caching
+        """
+        return None
+
+    def restoreRenderState(self, state):
+        """ Hands back a render state previously returned by renderState. It is announced before the view
+        changes its visible range and may be used by the following visibleRangeChanged call.
+
+        :param state: render state
+        """
+        pass
+
     @property
     def chartItemFlags(self):
         """ Property of the ChartItemFlags for this chart_tests item. """
@@ -232,6 +248,9 @@ class LineChartItem(ChartItem):
     :param parent: Items parent
     """
 
+    #: Above this number of data points only the visible part is drawn, decimated to its minima and maxima
+    MAX_PATH_POINTS = 4000
+
     def __init__(self, parent=None):
         super(LineChartItem, self).__init__(parent)
         self._xData = None
@@ -239,10 +258,16 @@ class LineChartItem(ChartItem):
         self._label = None
         # self._color = None
         self._bRect = None
+        self._path = None
         self.markers = {}
 
         self._showticks = False
         self._visible_range = None
+        self._visible_indices = None
+        self._visible_path = None
+        self._restored_state = None
+        # incremented by plot, render states of older data are not restored
+        self._data_version = 0
 
         self._ordinate = None
         self._abscissa = None
@@ -323,6 +348,15 @@ class LineChartItem(ChartItem):
 
         self._makePath()
 
+        # derived data of the previous data points is stale
+        self._data_version += 1
+        self._restored_state = None
+        self._visible_indices = None
+        self._visible_path = None
+        self._clearMarkers()
+        if self._visible_range is not None:
+            self.visibleRangeChanged(self._visible_range)
+
     def _makePath(self):
         self._path = QPainterPath()
         self._path.moveTo(self._xData[0], self._yData[0])
@@ -331,6 +365,49 @@ class LineChartItem(ChartItem):
             d = self._yData[k]
             self._path.lineTo(idx, d)
 
+    def _makeVisiblePath(self, rect):
+        """ Path of the data points within the horizontal range of rect, decimated to the minimum and maximum of
+        MAX_PATH_POINTS / 2 buckets. None if the data is small enough to draw the full path.
+
+        :param rect: visible range
+        :return: QPainterPath or None
+        """
+        if len(self._xData) <= self.MAX_PATH_POINTS:
+            return None
+
+        x = np.asarray(self._xData)
+        y = np.asarray(self._yData)
+        visible = np.flatnonzero(np.logical_and(x >= rect.left(), x <= rect.right()))
+
+        path = QPainterPath()
+        if len(visible) == 0:
+            return path
+
+        # one point beyond the range on each side, so the line runs to the border
+        indices = np.arange(max(visible[0] - 1, 0), min(visible[-1] + 2, len(x)))
+        if len(indices) > self.MAX_PATH_POINTS:
+            n = self.MAX_PATH_POINTS // 2
+            starts = np.linspace(0, len(indices), n, endpoint=False).astype(int)
+            ends = np.append(starts[1:], len(indices)) - 1
+            ys = y[indices]
+            xs = np.column_stack([x[indices[starts]], x[indices[ends]]]).ravel()
+            ys = np.column_stack(
+                [np.minimum.reduceat(ys, starts), np.maximum.reduceat(ys, starts)]
+            ).ravel()
+        else:
+            xs, ys = x[indices], y[indices]
+
+        path.moveTo(xs[0], ys[0])
+        for k in range(1, len(xs)):
+            path.lineTo(xs[k], ys[k])
+        return path
+
+    def _clearMarkers(self):
+        for marker in self.markers.values():
+            if marker.scene() is not None:
+                marker.scene().removeItem(marker)
+        self.markers = {}
+
     def boundingRect(self):
         """ Returns the bounding rect of the chart_tests item
         :return: Bounding Rectangle
@@ -343,8 +420,9 @@ class LineChartItem(ChartItem):
         pen = makePen(self.color)
         p.setPen(pen)
 
-        if self._path:
-            p.drawPath(self._path)
+        path = self._path if self._visible_path is None else self._visible_path
+        if path:
+            p.drawPath(path)
 
         # if any(self.markers):
         #     # pen = makePen(Qt.yellow)
@@ -369,12 +447,26 @@ class LineChartItem(ChartItem):
         _log.debug("Visible range changed to: {}".format(rect))
         self._visible_range = rect
 
-        visible_indices = np.where(
-            np.logical_and(
-                np.logical_and(self._xData >= rect.left(), self._xData <= rect.right()),
-                np.logical_and(self._yData >= rect.top(), self._yData <= rect.bottom()),
-            )
-        )[0]
+        restored, self._restored_state = self._restored_state, None
+        if (
+            restored is not None
+            and restored[0] == rect
+            and restored[1] == self._data_version
+        ):
+            visible_indices, self._visible_path = restored[2], restored[3]
+        else:
+            self._visible_path = self._makeVisiblePath(rect)
+            visible_indices = np.where(
+                np.logical_and(
+                    np.logical_and(
+                        self._xData >= rect.left(), self._xData <= rect.right()
+                    ),
+                    np.logical_and(
+                        self._yData >= rect.top(), self._yData <= rect.bottom()
+                    ),
+                )
+            )[0]
+        self._visible_indices = visible_indices
 
         # _log.debug("Visible plot points idx: {}".format(visible_indices))
 
@@ -394,11 +486,20 @@ class LineChartItem(ChartItem):
 
         else:
             _log.debug("removing all markers")
-            for k in self.markers:
-                item = self.markers[k]
-                self.scene().removeItem(item)
-                # del self.markers[k]
-            self.markers = {}
+            self._clearMarkers()
+
+    def renderState(self):
+        if self._visible_indices is None:
+            return None
+        return (
+            QRectF(self._visible_range),
+            self._data_version,
+            self._visible_indices,
+            self._visible_path,
+        )
+
+    def restoreRenderState(self, state):
+        self._restored_state = state
 
     def __del__(self):
         _log.debug("Finalize Linechart {}".format(self))
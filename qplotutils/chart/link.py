@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qplotutils.chart.link
+---------------------
+
+Links the visible ranges of several chart views. Views join a :class:`RangeLink` for the horizontal axis, the
+vertical axis or both. Range changes are collected and propagated once per frame, the downstream updates of all
+linked views happen in the same event-loop tick.
+"""
+import logging
+from functools import partial
+
+from qtpy.QtCore import QObject, QRectF, QTimer, Signal
+
+from . import LOG_LEVEL
+from .view import ChartArea
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+_log.setLevel(LOG_LEVEL)
+
+
+class RangeLink(QObject):
+    """ Group of chart views sharing their visible range.
+
+    The view that changed its range last within a frame is authoritative, its range is applied to all other
+    members once the frame interval elapsed. Range changes caused by the propagation itself are not echoed back.
+
+    :param interval: propagation interval in milliseconds, defaults to one frame at 60 Hz
+    :param parent: parent object
+    """
+
+    #: Link the horizontal axis
+    X = 0x1
+
+    #: Link the vertical axis
+    Y = 0x2
+
+    #: Link both axes
+    XY = X | Y
+
+    #: Emitted after the authoritative range has been applied to the linked views.
+    rangeChanged = Signal(object)
+
+    def __init__(self, interval=16, parent=None):
+        super(RangeLink, self).__init__(parent)
+
+        self._members = []
+
+        self.__source = None
+        self.__range = None
+        self.__applying = False
+
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(interval)
+        self.__timer.timeout.connect(self.flush)
+
+    @classmethod
+    def _chartArea(cls, view):
+        if isinstance(view, ChartArea):
+            return view
+        return view.centralWidget.area
+
+    @property
+    def views(self):
+        """ Chart areas of all members. """
+        return [m["area"] for m in self._members]
+
+    @property
+    def interval(self):
+        return self.__timer.interval()
+
+    def setInterval(self, value):
+        self.__timer.setInterval(value)
+
+    def join(self, view, axis=XY):
+        """ Adds the view to the group.
+
+        :param view: ChartView or ChartArea
+        :param axis: RangeLink.X, RangeLink.Y or RangeLink.XY
+        """
+        area = self._chartArea(view)
+        if area in self.views:
+            self.leave(area)
+
+        slot = partial(self._rangeChange, area)
+        area.hAxisChange.connect(slot)
+        self._members.append({"area": area, "axis": axis, "slot": slot})
+
+        # align the new member with the group
+        if len(self._members) > 1:
+            ref = self._members[0]["area"]
+            if ref.visibleRange is not None:
+                self._apply(ref.visibleRange, self._members[0]["axis"], self._members[-1])
+
+    def leave(self, view):
+        """ Removes the view from the group.
+
+        :param view: ChartView or ChartArea
+        """
+        area = self._chartArea(view)
+        for m in list(self._members):
+            if m["area"] is area:
+                area.hAxisChange.disconnect(m["slot"])
+                self._members.remove(m)
+
+        if self.__source is area:
+            self.__source = None
+            self.__range = None
+
+    def _rangeChange(self, area, transform):
+        """ Collects the latest range change, the propagation itself is deferred to the next frame. """
+        if self.__applying or area.visibleRange is None:
+            return
+
+        self.__source = area
+        self.__range = QRectF(area.visibleRange)
+
+        if not self.__timer.isActive():
+            self.__timer.start()
+
+    def flush(self):
+        """ Applies the pending authoritative range to all linked views immediately. """
+        self.__timer.stop()
+
+        source, r = self.__source, self.__range
+        self.__source = None
+        self.__range = None
+
+        if source is None:
+            return
+
+        axis = [m["axis"] for m in self._members if m["area"] is source]
+        if len(axis) == 0:
+            return
+
+        for m in self._members:
+            if m["area"] is not source:
+                self._apply(r, axis[0], m)
+
+        self.rangeChanged.emit(r)
+
+    def _apply(self, r, axis, member):
+        """ Applies the linked part of the range to the member.
+
+        :param r: authoritative range
+        :param axis: linked axes of the source view
+        :param member: target member
+        """
+        linked = axis & member["axis"]
+        area = member["area"]
+        current = area.visibleRange
+
+        if linked == 0 or current is None:
+            return
+
+        n = QRectF(current)
+        if linked & RangeLink.X:
+            n.setLeft(r.left())
+            n.setRight(r.right())
+        if linked & RangeLink.Y:
+            n.setTop(r.top())
+            n.setBottom(r.bottom())
+
+        if n == current:
+            return
+
+        self.__applying = True
+        try:
+            area.setRange(n)
+            area.visibleRangeChange.emit(area.visibleRange)
+        finally:
+            self.__applying = False
+
+    def __repr__(self):
+        return "<RangeLink members={}>".format(len(self._members))
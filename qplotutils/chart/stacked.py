@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+qplotutils.chart.stacked
+------------------------
+
+Chart view that stacks several chart areas with independent vertical axes on top of each other. All areas share
+a single horizontal axis, so panning or zooming one lane moves the abscissa of every lane. As all lanes live in the
+same scene, the resulting repaint is done in one paint pass of the view.
+"""
+import logging
+
+from qtpy.QtCore import Qt, QRectF
+from qtpy.QtGui import QBrush, QPainter, QPen
+from qtpy.QtWidgets import (
+    QFrame,
+    QGraphicsGridLayout,
+    QGraphicsScene,
+    QGraphicsView,
+    QGraphicsWidget,
+    QSizePolicy,
+    QStyleOptionGraphicsItem,
+)
+
+from . import LOG_LEVEL
+from .items import ChartItem
+from .view import (
+    ChartArea,
+    ChartGrid,
+    ChartView,
+    HorizontalAxis,
+    VerticalAxis,
+)
+from .. import CONFIG
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+_log.setLevel(LOG_LEVEL)
+
+#: Maximum size of a widget, see QWIDGETSIZE_MAX in qwidget.h
+QWIDGETSIZE_MAX = (1 << 24) - 1
+
+
+class StackedChartView(QGraphicsView):
+    """ Widget that displays chart items in several lanes stacked on top of each other.
+
+    Every lane has its own chart area and vertical axis, the horizontal axis and its transform is shared.
+
+    :param lanes: number of lanes initially created
+    :param parent: parent widget
+    :param orientation: ChartView.DEFAULT_ORIENTATION or ChartView.CARTESIAN
+    """
+
+    def __init__(self, lanes=1, parent=None, orientation=ChartView.DEFAULT_ORIENTATION):
+        super(StackedChartView, self).__init__(parent)
+
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setTransformationAnchor(QGraphicsView.NoAnchor)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+        self.setViewportUpdateMode(QGraphicsView.MinimalViewportUpdate)
+        self.setRenderHints(QPainter.SmoothPixmapTransform | QPainter.Antialiasing)
+
+        self.setAcceptDrops(False)
+
+        scene = QGraphicsScene()
+        self.setScene(scene)
+
+        self.centralWidget = StackedChartWidget(orientation=orientation)
+        self.scene().addItem(self.centralWidget)
+
+        for _ in range(lanes):
+            self.centralWidget.addLane()
+
+        b_rect = QRectF(0, 0, self.size().width() - 2, self.size().height() - 2)
+        self.centralWidget.setGeometry(b_rect)
+
+        self.setBackgroundBrush(QBrush(Qt.black, Qt.SolidPattern))
+
+    def resizeEvent(self, event):
+        b_rect = QRectF(0, 0, self.size().width() - 3, self.size().height() - 3)
+        self.centralWidget.setGeometry(b_rect)
+        self.centralWidget.axisChange()
+
+    def showEvent(self, event):
+        self.centralWidget.axisChange()
+
+    @property
+    def lanes(self):
+        """ Number of lanes. """
+        return len(self.centralWidget.areas)
+
+    def addLane(self):
+        """ Appends a lane below the existing ones.
+
+        :return: index of the new lane
+        """
+        self.centralWidget.addLane()
+        return self.lanes - 1
+
+    def area(self, lane):
+        """ Chart area of the given lane.
+
+        :param lane: index of the lane
+        :return: ChartArea
+        """
+        return self.centralWidget.areas[lane]
+
+    def addItem(self, item=None, lane=0):
+        """ Adds the item to the given lane.
+
+        :param item: chart item, defaults to an empty ChartItem
+        :param lane: index of the lane
+        """
+        if item is None:
+            item = ChartItem()
+        area = self.centralWidget.areas[lane]
+        item.setParentItem(area.getRootItem())
+        area.visibleRangeChange.connect(item.visibleRangeChanged)
+
+    def removeItem(self, item):
+        item.setParentItem(None)
+
+    def autoRange(self):
+        self.centralWidget.autoRange()
+
+    def setRange(self, rect, lane=None):
+        """ Sets the horizontal range of all lanes and the vertical range of the given lane.
+
+        :param rect: visible rectangle in chart coordinates
+        :param lane: index of the lane or None to apply the vertical range to all lanes
+        """
+        self.centralWidget.setRange(rect, lane)
+
+    def setVisibleRange(self, rect, lane=None):
+        self.setRange(rect, lane)
+
+    def __repr__(self):
+        return "<StackedChartView lanes={}>".format(self.lanes)
+
+
+class StackedVerticalAxis(VerticalAxis):
+    """ Vertical axis of a single lane.
+
+    Calculates the ticks for its own height and negotiates the width of the shared axis column with the
+    other lanes of the parent StackedChartWidget.
+    """
+
+    def _displayRange(self):
+        return self.size().height()
+
+    def _requestWidth(self, width):
+        self.parentWidget().requestAxisWidth(self, width)
+
+
+class StackedChartWidget(QGraphicsWidget):
+    """ Provides the layout of the lanes, one row per lane with the vertical axis to the left, and the shared
+    horizontal axis at the bottom.
+
+    .. note:: Is instantiated and connected by the parent stacked chart view.
+
+    :param parent: the stacked chart view
+    :param orientation: orientation of the lanes
+    """
+
+    def __init__(self, parent=None, orientation=ChartView.DEFAULT_ORIENTATION):
+        super(StackedChartWidget, self).__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        self.setLayout(QGraphicsGridLayout())
+        self.layout().setContentsMargins(0, 0, 0, 0)
+        self.layout().setHorizontalSpacing(-1)
+        self.layout().setVerticalSpacing(-1)
+        self.layout().setColumnFixedWidth(0, 60)
+
+        self.orientation = orientation
+
+        self.areas = []
+        self.vertical_axes = []
+        self.grids = []
+
+        self.__axisWidths = {}
+        self.__syncing = False
+
+        self.horizontal_axis = HorizontalAxis(self)
+        self.layout().addItem(self.horizontal_axis, 0, 1, 1, 1)
+        self.layout().setRowFixedHeight(0, 30)
+
+        self._dbg_box_color = Qt.green
+
+    def addLane(self):
+        """ Adds a chart area with its own vertical axis above the horizontal axis.
+
+        :return: the chart area of the new lane
+        """
+        row = len(self.areas)
+
+        # move the shared horizontal axis one row down
+        self.layout().removeItem(self.horizontal_axis)
+        self.layout().setRowMinimumHeight(row, 0)
+        self.layout().setRowMaximumHeight(row, QWIDGETSIZE_MAX)
+        self.layout().addItem(self.horizontal_axis, row + 1, 1, 1, 1)
+        self.layout().setRowFixedHeight(row + 1, 30)
+
+        axis = StackedVerticalAxis(self)
+        self.layout().addItem(axis, row, 0, 1, 1)
+
+        area = ChartArea(self)
+        area.getRootItem().setTransform(self.orientation)
+        self.layout().addItem(area, row, 1, 1, 1)
+        self.layout().setRowStretchFactor(row, 1)
+
+        grid = ChartGrid(self.horizontal_axis, axis, area)
+
+        area.vAxisChange.connect(axis.axisChange)
+        area.hAxisChange.connect(grid.axisChange)
+        area.hAxisChange.connect(self.__horizontalChange)
+
+        # share the current abscissa with the new lane
+        if len(self.areas) > 0:
+            area.setHorizontalTransform(self.areas[0].getRootItem().transform())
+
+        self.areas.append(area)
+        self.vertical_axes.append(axis)
+        self.grids.append(grid)
+
+        # give the new lane its geometry right away, items may be added and ranged before the next layout pass
+        self.layout().activate()
+        return area
+
+    def requestAxisWidth(self, axis, width):
+        """ Fits the vertical axis column to the widest tick labels of all lanes.
+
+        :param axis: vertical axis of a lane
+        :param width: width required by that axis
+        """
+        self.__axisWidths[axis] = width
+        self.layout().setColumnFixedWidth(0, max(self.__axisWidths.values()))
+
+    def __horizontalChange(self, transform):
+        """ Propagates the abscissa of the lane that changed to all other lanes. """
+        if self.__syncing:
+            return
+
+        self.__syncing = True
+        try:
+            for area in self.areas:
+                area.setHorizontalTransform(transform)
+            self.horizontal_axis.axisChange(transform)
+        finally:
+            self.__syncing = False
+
+    def axisChange(self):
+        for area in self.areas:
+            area.axisChange()
+
+    def autoRange(self):
+        """ Fits the vertical range of every lane to its items and the shared horizontal range to the items of
+        all lanes.
+        """
+        ranges = {}
+        self.__syncing = True
+        try:
+            for lane, area in enumerate(self.areas):
+                if len(area.getRootItem().childItems()) == 0:
+                    continue
+                area.autoRange()
+                ranges[lane] = QRectF(area.visibleRange)
+        finally:
+            self.__syncing = False
+
+        if len(ranges) == 0:
+            return
+
+        left = min(r.left() for r in ranges.values())
+        right = max(r.right() for r in ranges.values())
+
+        for lane, area in enumerate(self.areas):
+            r = ranges.get(lane, area.visibleRange)
+            if r is None:
+                continue
+            area.setRange(QRectF(left, r.top(), right - left, r.height()))
+
+    def setRange(self, rect, lane=None):
+        r = rect.normalized()
+        for k, area in enumerate(self.areas):
+            if lane is None or k == lane:
+                area.setRange(r)
+            elif area.visibleRange is not None:
+                v = area.visibleRange
+                area.setRange(QRectF(r.left(), v.top(), r.width(), v.height()))
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.size().width() - 1, self.size().height() - 1)
+
+    def paint(self, p=QPainter(), o=QStyleOptionGraphicsItem(), widget=None):
+        if CONFIG.debug:
+            p.setPen(QPen(self._dbg_box_color))
+            p.drawRect(self.boundingRect())
+
+    def __repr__(self):
+        return "<StackedChartWidget>"
+
+    def wheelEvent(self, e):
+        e.accept()  # but do nothing
+        _log.debug("Wheel on axis is ignored")
@@ -6,11 +6,14 @@ qplotutils.chart.view
 
 Base widget that provides the view for all charts including axis, legend and zooming and panning capabilities.
 """
+import itertools
 import logging
+import weakref
+from collections import OrderedDict
 
 import math
 import numpy as np
-from qtpy.QtCore import Signal, Qt, QPointF, QRectF, QSizeF
+from qtpy.QtCore import Signal, Qt, QPointF, QRectF, QSizeF, QLineF
 from qtpy.QtGui import (
     QPen,
     QBrush,
@@ -20,6 +23,7 @@ from qtpy.QtGui import (
     QFontMetrics,
     QFont,
     QPicture,
+    QPixmap,
     QTransform,
 )
 from qtpy.QtWidgets import (
@@ -310,6 +314,53 @@ class ChartView(QGraphicsView):
     def setRange(self, rect):
         self.centralWidget.area.setRange(rect)
 
+    def back(self):
+        """ Goes back to the previous visible range. """
+        self.centralWidget.area.back()
+
+    def forward(self):
+        """ Goes forward to the next visible range. """
+        self.centralWidget.area.forward()
+
+    def addBookmark(self, name):
+        self.centralWidget.area.addBookmark(name)
+
+    def gotoBookmark(self, name):
+        self.centralWidget.area.gotoBookmark(name)
+
+    def saveSnapshot(self):
+        """ View state stored in bench snapshots: visible range, aspect ratio and the visibility of the items.
+
+        :return: dict
+        """
+        area = self.centralWidget.area
+        r = area.visibleRange
+        return {
+            "range": None if r is None else [r.x(), r.y(), r.width(), r.height()],
+            "aspectRatio": area.aspectRatio,
+            "items": [
+                {"label": getattr(c, "label", None), "visible": c.isVisible()}
+                for c in area.getRootItem().childItems()
+            ],
+        }
+
+    def loadSnapshot(self, state):
+        """ Restores the view state saved by saveSnapshot. Items are matched by position.
+
+        :param state: dict
+        """
+        area = self.centralWidget.area
+        area.setAspectRatio(state.get("aspectRatio"))
+
+        for c, s in zip(area.getRootItem().childItems(), state.get("items", [])):
+            c.setVisible(s["visible"])
+
+        if state.get("range") is not None:
+            area.setRange(QRectF(*state["range"]))
+            # items refresh their visible data before the range and their render state are recorded
+            area.visibleRangeChange.emit(area.visibleRange)
+            area.commitRange()
+
     def __toggle_apect1by1(self, checked):
         _log.debug("Aspect 1:1")
         if checked:
@@ -446,8 +497,15 @@ class ChartWidget(QGraphicsWidget):
         self.layout().setRowFixedHeight(4, 0)
         self.horizontal_axis_label.setVisible(False)
 
+        # grid lines of the area, aligned to the main axes
+        self.grid = ChartGrid(
+            self.main_horizontal_axis, self.main_vertical_axis, self.area
+        )
+
         self.area.vAxisChange.connect(self.main_vertical_axis.axisChange)
         self.area.hAxisChange.connect(self.main_horizontal_axis.axisChange)
+        # both axis signals carry the same transform, one connection is sufficient
+        self.area.hAxisChange.connect(self.grid.axisChange)
 
         self._dbg_box_color = Qt.green
 
@@ -628,6 +686,11 @@ class ChartAxis(QGraphicsWidget):
         self._areaTransform = None
         self._picture = None
 
+        # Axis state (shift, remaining state) the picture was recorded with and the
+        # pixel offset along the axis by which the picture is translated when played.
+        self._renderedState = None
+        self._pictureOffset = 0
+
         self.setZValue(-1)
 
         self._dbg_box_color = Qt.yellow
@@ -639,7 +702,12 @@ class ChartAxis(QGraphicsWidget):
         p.setRenderHint(QPainter.Antialiasing, False)
         if self._picture is None:
             self._refreshPicture()
+
+        p.save()
+        p.setClipRect(self._clipRect())
+        p.translate(self._offsetVector(self._pictureOffset))
         self._picture.play(p)
+        p.restore()
 
         if CONFIG.debug:
             p.setPen(QPen(self._dbg_box_color))
@@ -653,21 +721,85 @@ class ChartAxis(QGraphicsWidget):
         self._generatePicture(painter)
         painter.end()
 
+        self._pictureOffset = 0
+        if self._areaTransform is None:
+            self._renderedState = None
+        else:
+            self._renderedState = self._axisState(self._areaTransform)
+
     def resizeEvent(self, event):
         _log.debug("Resize Event")
         self._refreshPicture()
 
     def axisChange(self, transform):
+        """ Slot. Updates the axis to the given transform of the chart area.
+
+        The picture is only re-recorded when the scaling or the geometry relevant to this axis changed. A pure
+        shift along the axis that stays within the pan margin translates the cached picture instead.
+
+        :param transform: transform of the chart areas root item
+        """
         # _log.debug("Axis change: {}".format(transform))
         self._areaTransform = transform
-        self._refreshPicture()
+
+        if self._picture is None or self._renderedState is None:
+            self._refreshPicture()
+            self.update()
+            return
+
+        shift, state = self._axisState(transform)
+        renderedShift, renderedState = self._renderedState
+        offset = shift - renderedShift
+
+        if state != renderedState or abs(offset) > self._panMargin():
+            self._refreshPicture()
+        elif offset == self._pictureOffset:
+            # Nothing this axis displays has changed
+            return
+        else:
+            self._pictureOffset = offset
+
         self.update()
 
+    def _axisState(self, transform):
+        """ Returns the parts of the transform and geometry the axis picture depends on.
+
+        :param transform: transform of the chart area
+        :return: tuple of the shift along the axis and the remaining state, which must be equal for the picture
+            to be reused.
+        """
+        state = (
+            transform.m11(),
+            transform.m12(),
+            transform.m21(),
+            transform.m22(),
+            transform.m31(),
+            transform.m32(),
+            self.size(),
+        )
+        return 0.0, state
+
+    def _panMargin(self):
+        """ Pixels the picture is recorded beyond both ends of the axis, i.e. the distance it can be shifted
+        without being re-recorded.
+        """
+        return 0
+
+    def _offsetVector(self, offset):
+        """ Returns the translation of the picture for the given offset along the axis. """
+        return QPointF(0, 0)
+
+    def _clipRect(self):
+        """ Area the picture is clipped to when played. """
+        return self.boundingRect()
+
     def _generatePicture(self, p=QPainter()):
         p.setPen(QPen(Qt.green))
         p.drawRect(self.boundingRect())
 
-    def calcTicks(self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40):
+    def calcTicks(
+        self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40, margin=0
+    ):
         """ Calculates the axis ticks.
          The ticks are calculated along the logarithm of the base 10 of the displayed value range.
          The resulting exponent for the ticks is than scaled with respect to the preferred number of
@@ -680,6 +812,7 @@ class ChartAxis(QGraphicsWidget):
         :param displayRange: range of visible pixels
         :param maxGridSpace: maximum space between gridlines
         :param minGridSpace: minimum space between gridlines
+        :param margin: additional pixels before and after the display range for which ticks are returned
         :return: list of ticks (tuple of position and label) and the required tick with
         """
         # first lets see how many ticks can be placed on the axis
@@ -709,8 +842,8 @@ class ChartAxis(QGraphicsWidget):
             tickDistance *= 0.5
 
         # _log.debug("Tick info: log10 {}".format(log10Exponent))
-        first_pos_idx = int(upperValue / tickDistance)
-        last_pos_idx = int(lowerValue / tickDistance)
+        first_pos_idx = int((-margin - shift) / scaling / tickDistance)
+        last_pos_idx = int((displayRange + margin - shift) / scaling / tickDistance)
 
         if first_pos_idx < last_pos_idx:
             d = 1
@@ -747,11 +880,56 @@ class VerticalAxis(ChartAxis):
     """ Vertical chart axis. """
 
     def boundingRect(self):
-        parent = self.parentWidget().size()
+        # One pixel wider to contain the axis line on the right edge
         s = self.size()
-        b_rect = QRectF(0, 0, parent.width(), s.height())
+        b_rect = QRectF(0, 0, s.width() + 1, s.height())
         return b_rect
 
+    def _axisState(self, transform):
+        scaling = transform.m12() + transform.m22()
+        state = (scaling, self.size(), self._displayRange())
+        return transform.m32(), state
+
+    def _displayRange(self):
+        """ Pixels along the axis the ticks are calculated for. """
+        return self.parentWidget().size().height()
+
+    def _requestWidth(self, width):
+        """ Requests the width needed to display the tick labels from the parent layout.
+
+        :param width: required width
+        """
+        self.parentWidget().layout().setColumnFixedWidth(1, width)
+
+    def _panMargin(self):
+        return self.size().height()
+
+    def _offsetVector(self, offset):
+        return QPointF(0, offset)
+
+    def _clipRect(self):
+        r = self.boundingRect()
+        r.setTop(0)
+        r.setBottom(self.size().height())
+        return r
+
+    def axisTicks(self, transform, margin=0):
+        """ Returns the ticks of the axis for the given transform of the chart area.
+
+        :param transform: transform of the chart area
+        :param margin: additional pixels before and after the axis for which ticks are returned
+        :return: list of ticks (tuple of position and label) and the required tick with
+        """
+        translation = transform.m32()
+        scaling = (
+            transform.m12() + transform.m22()
+        )  # only for rotations along 90 degrees
+
+        if scaling == 0:
+            return [], 0
+
+        return self.calcTicks(translation, scaling, self._displayRange(), margin=margin)
+
     def _generatePicture(self, p=QPainter()):
         p.setBrush(Qt.transparent)
         p.setPen(makePen(self.gridColor))
@@ -760,12 +938,6 @@ class VerticalAxis(ChartAxis):
         if self._areaTransform is None:
             return
 
-        parent_w = (
-            self.parentWidget().area.size().width() + self.size().width() - 2
-        )  # self.parentWidget().size().width()
-        parent_h = self.parentWidget().size().height()
-
-        translation = self._areaTransform.m32()
         scaling = (
             self._areaTransform.m12() + self._areaTransform.m22()
         )  # only for rotations along 90 degrees
@@ -774,14 +946,16 @@ class VerticalAxis(ChartAxis):
             _log.debug("????")
             return
 
-        ticks, run_width = self.calcTicks(translation, scaling, parent_h)
+        margin = self._panMargin()
+        ticks, run_width = self.axisTicks(self._areaTransform, margin)
 
-        self.parentWidget().layout().setColumnFixedWidth(1, run_width + 10)
+        self._requestWidth(run_width + 10)
 
-        p.drawLine(self.size().width(), 0, self.size().width(), self.size().height())
+        w = self.size().width()
+        p.drawLine(QLineF(w, -margin, w, self.size().height() + margin))
         for pos, tickString in ticks:
-            if 10 < pos < self.size().height():
-                p.drawLine(run_width + 6, round(pos), parent_w, round(pos))
+            if -margin < pos < self.size().height() + margin:
+                p.drawLine(QLineF(run_width + 6, round(pos), w, round(pos)))
 
                 tickRect = QRectF(0, pos - 4, run_width + 2, 10)
                 p.drawText(tickRect, self.flags, tickString)
@@ -799,17 +973,42 @@ class HorizontalAxis(ChartAxis):
         super(HorizontalAxis, self).__init__(parent)
         self.flags = Qt.TextDontClip | Qt.AlignCenter | Qt.AlignVCenter
 
-    def boundingRect(self):
-        parent = self.parentWidget().area.size()
-        v_axis = self.parentWidget().main_vertical_axis.size()
-        s = self.size()
-        b_rect = QRectF(
-            -v_axis.width(),
-            -parent.height(),
-            s.width() + v_axis.width(),
-            parent.height() + s.height(),
+    def _axisState(self, transform):
+        scaling = transform.m11() + transform.m21()
+        state = (scaling, self.size())
+        return transform.m31(), state
+
+    def _panMargin(self):
+        return self.size().width()
+
+    def _offsetVector(self, offset):
+        return QPointF(offset, 0)
+
+    def _clipRect(self):
+        r = self.boundingRect()
+        r.setLeft(0)
+        r.setRight(self.size().width())
+        return r
+
+    def axisTicks(self, transform, margin=0):
+        """ Returns the ticks of the axis for the given transform of the chart area.
+
+        :param transform: transform of the chart area
+        :param margin: additional pixels before and after the axis for which ticks are returned
+        :return: list of ticks (tuple of position and label) and the required tick with
+        """
+        shift = transform.m31()
+        scaling = transform.m11() + transform.m21()
+        displayRange = self.size().width()
+
+        return self.calcTicks(
+            shift,
+            scaling,
+            displayRange,
+            maxGridSpace=100,
+            minGridSpace=80,
+            margin=margin,
         )
-        return b_rect
 
     def _generatePicture(self, p=QPainter()):
         p.setBrush(Qt.transparent)
@@ -823,21 +1022,16 @@ class HorizontalAxis(ChartAxis):
         if self._areaTransform is None:
             return
 
-        parent_h = self.parentWidget().area.size().height() - 2
-
-        shift = self._areaTransform.m31()
-        scaling = self._areaTransform.m11() + self._areaTransform.m21()
         displayRange = self.size().width()
 
-        ticks, run_width = self.calcTicks(
-            shift, scaling, displayRange, maxGridSpace=100, minGridSpace=80
-        )
+        margin = self._panMargin()
+        ticks, run_width = self.axisTicks(self._areaTransform, margin)
         rw = run_width / 2.0
 
-        p.drawLine(0, 0, self.size().width(), 0)
+        p.drawLine(QLineF(-margin, 0, displayRange + margin, 0))
         for pos, tickString in ticks:
-            if 0 < pos < self.size().width() - 30:
-                p.drawLine(round(pos), 5, round(pos), -parent_h)
+            if -margin < pos < displayRange + margin - 30:
+                p.drawLine(QLineF(round(pos), 0, round(pos), 5))
 
                 tickRect = QRectF(pos - rw, 8, run_width, 10)
                 p.drawText(tickRect, self.flags, tickString)
@@ -875,6 +1069,11 @@ class SecondaryHorizontalAxis(HorizontalAxis):
         )
         return b_rect
 
+    def _axisState(self, transform):
+        # Grid lines span the chart area
+        shift, state = super(SecondaryHorizontalAxis, self)._axisState(transform)
+        return shift, state + (self.parentWidget().area.size(),)
+
     def _generatePicture(self, p=QPainter()):
         p.setBrush(Qt.transparent)
         pen = QPen(QBrush(self.gridColor), 1.0)
@@ -882,7 +1081,9 @@ class SecondaryHorizontalAxis(HorizontalAxis):
         p.setPen(pen)
         p.setFont(self.font)
 
-        p.drawLine(0, self.size().height(), self.size().width(), self.size().height())
+        margin = self._panMargin()
+        h = self.size().height()
+        p.drawLine(QLineF(-margin, h, self.size().width() + margin, h))
 
         pen = QPen(QBrush(QColor(188, 136, 184, 255)), 1.0, style=Qt.DotLine)
         pen.setCosmetic(True)
@@ -898,23 +1099,25 @@ class SecondaryHorizontalAxis(HorizontalAxis):
         displayRange = self.size().width()
 
         ticks, run_width = self.calcTicks(
-            shift, scaling, displayRange, maxGridSpace=100, minGridSpace=80
+            shift,
+            scaling,
+            displayRange,
+            maxGridSpace=100,
+            minGridSpace=80,
+            margin=margin,
         )
         rw = run_width / 2.0
 
         for pos, tickString in ticks:
-            if 0 < pos < self.size().width() - 30:
-                p.drawLine(
-                    round(pos),
-                    self.size().height() - 5,
-                    round(pos),
-                    parent_h + self.size().height(),
-                )
+            if -margin < pos < displayRange + margin - 30:
+                p.drawLine(QLineF(round(pos), h - 5, round(pos), parent_h + h))
 
                 tickRect = QRectF(pos - rw, self.size().height() - 18, run_width, 10)
                 p.drawText(tickRect, self.flags, tickString)
 
-    def calcTicks(self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40):
+    def calcTicks(
+        self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40, margin=0
+    ):
         """ Calculates the axis ticks.
          The ticks are calculated along the logarithm of the base 10 of the displayed value range.
          The resulting exponent for the ticks is than scaled with respect to the preferred number of
@@ -927,6 +1130,7 @@ class SecondaryHorizontalAxis(HorizontalAxis):
         :param displayRange: range of visible pixels
         :param maxGridSpace: maximum space between gridlines
         :param minGridSpace: minimum space between gridlines
+        :param margin: additional pixels before and after the display range for which ticks are returned
         :return: list of ticks (tuple of position and label) and the required tick with
         """
         # first lets see how many ticks can be placed on the axis
@@ -936,9 +1140,11 @@ class SecondaryHorizontalAxis(HorizontalAxis):
         if maxNumberOfGridLines == 0:
             return [], 0
 
+        maxNumberOfGridLines = (displayRange + 2 * margin) / float(minGridSpace)
+
         # Calculate the up most and lowest value on axis
-        lowerValue = -shift / scaling
-        upperValue = (displayRange - shift) / scaling
+        lowerValue = (-margin - shift) / scaling
+        upperValue = (displayRange + margin - shift) / scaling
 
         idx, = np.where(
             np.logical_and(
@@ -1004,13 +1210,20 @@ class SecondaryVerticalAxis(VerticalAxis):
         b_rect = QRectF(-10, 0, parent.width(), s.height() + 20)
         return b_rect
 
+    def _axisState(self, transform):
+        # Grid lines span the chart area
+        shift, state = super(SecondaryVerticalAxis, self)._axisState(transform)
+        return shift, state + (self.parentWidget().area.size(),)
+
     def _generatePicture(self, p=QPainter()):
         pen = QPen(QBrush(self.gridColor), 1.0)
         pen.setCosmetic(True)
         p.setPen(pen)
         p.setBrush(Qt.transparent)
         p.setFont(self.font)
-        p.drawLine(0, 0, 0, self.size().height())
+
+        margin = self._panMargin()
+        p.drawLine(QLineF(0, -margin, 0, self.size().height() + margin))
 
         if self._areaTransform is None:
             return
@@ -1027,7 +1240,7 @@ class SecondaryVerticalAxis(VerticalAxis):
             _log.debug("Scaling is 0")
             return
 
-        ticks, run_width = self.calcTicks(shift, scaling, displayRange)
+        ticks, run_width = self.calcTicks(shift, scaling, displayRange, margin=margin)
 
         if run_width == 0:
             self.parentWidget().layout().setColumnFixedWidth(3, 0)
@@ -1040,12 +1253,14 @@ class SecondaryVerticalAxis(VerticalAxis):
 
         for pos, tickString in ticks:
             # if 10 < pos < self.size().height():
-            p.drawLine(-parent_w, round(pos), 6, round(pos))
+            p.drawLine(QLineF(-parent_w, round(pos), 6, round(pos)))
 
             tickRect = QRectF(10, pos - 4, run_width + 2, 10)
             p.drawText(tickRect, self.flags, tickString)
 
-    def calcTicks(self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40):
+    def calcTicks(
+        self, shift, scaling, displayRange, maxGridSpace=80, minGridSpace=40, margin=0
+    ):
         """ Calculates the axis ticks.
          The ticks are calculated along the logarithm of the base 10 of the displayed value range.
          The resulting exponent for the ticks is than scaled with respect to the preferred number of
@@ -1058,6 +1273,7 @@ class SecondaryVerticalAxis(VerticalAxis):
         :param displayRange: range of visible pixels
         :param maxGridSpace: maximum space between gridlines
         :param minGridSpace: minimum space between gridlines
+        :param margin: additional pixels before and after the display range for which ticks are returned
         :return: list of ticks (tuple of position and label) and the required tick with
         """
         # first lets see how many ticks can be placed on the axis
@@ -1067,9 +1283,11 @@ class SecondaryVerticalAxis(VerticalAxis):
         if maxNumberOfGridLines == 0:
             return [], 0
 
+        maxNumberOfGridLines = (displayRange + 2 * margin) / float(minGridSpace)
+
         # Calculate the up most and lowest value on axis
-        upperValue = -shift / scaling
-        lowerValue = (displayRange - shift) / scaling
+        upperValue = (-margin - shift) / scaling
+        lowerValue = (displayRange + margin - shift) / scaling
 
         idx, = np.where(
             np.logical_and(
@@ -1131,6 +1349,293 @@ class ScaleBox(QGraphicsItem):
         p.drawRect(r)
 
 
+class ChartGrid(QGraphicsItem):
+    """ Grid lines of the chart area, aligned to the ticks of the main axes.
+
+    The vertical and the horizontal grid lines are each rendered once into a narrow pixmap tile, which is tiled
+    across the area when painted. The tiles are rendered with the device pixel ratio of the paint device and
+    with a margin along their axis, so panning only moves the tiles and a zoom along one axis re-renders only
+    the tile of that axis.
+
+    .. note:: Is instantiated and connected by the parent chart widget.
+
+    :param horizontalAxis: axis that provides the ticks of the vertical grid lines
+    :param verticalAxis: axis that provides the ticks of the horizontal grid lines
+    :param parent: chart area
+    """
+
+    #: Size of the tiles perpendicular to the axis they belong to
+    TILE_SIZE = 16
+
+    def __init__(self, horizontalAxis, verticalAxis, parent=None):
+        super(ChartGrid, self).__init__(parent)
+        self.setZValue(-1)
+
+        self.gridColor = QColor(80, 80, 80, 255)
+
+        self._axes = {Qt.Horizontal: horizontalAxis, Qt.Vertical: verticalAxis}
+        self._areaTransform = None
+
+        # Per axis orientation: the pixmap, the (shift, state) it was rendered with
+        # and its current offset
+        self._tiles = {
+            Qt.Horizontal: {"pixmap": None, "rendered": None, "offset": 0},
+            Qt.Vertical: {"pixmap": None, "rendered": None, "offset": 0},
+        }
+
+    def boundingRect(self):
+        s = self.parentItem().size()
+        return QRectF(0, 0, s.width(), s.height())
+
+    def axisChange(self, transform):
+        """ Slot. Schedules a repaint if the grid changed for the given transform of the chart area.
+
+        :param transform: transform of the chart areas root item
+        """
+        self._areaTransform = transform
+
+        for orientation, tile in self._tiles.items():
+            if tile["rendered"] is None:
+                self.update()
+                return
+
+            renderedShift, renderedState = tile["rendered"]
+            devicePixelRatio = renderedState[-1]
+            shift, state = self._tileState(orientation, transform, devicePixelRatio)
+            if state != renderedState or shift - renderedShift != tile["offset"]:
+                self.update()
+                return
+
+        # Nothing the grid displays has changed
+
+    def _tileState(self, orientation, transform, devicePixelRatio):
+        """ Returns the shift along the given axis and the state the tile of that axis depends on. """
+        size = self.parentItem().size()
+        if orientation == Qt.Horizontal:
+            shift = transform.m31()
+            scaling = transform.m11() + transform.m21()
+        else:
+            shift = transform.m32()
+            scaling = transform.m12() + transform.m22()
+
+        return shift, (scaling, size, devicePixelRatio)
+
+    def _margin(self, orientation):
+        """ Pixels the tile is rendered beyond both ends of the area along the given axis. """
+        size = self.parentItem().size()
+        if orientation == Qt.Horizontal:
+            return size.width()
+        return size.height()
+
+    def _renderTile(self, orientation, devicePixelRatio):
+        """ Renders the grid lines for the ticks of the given axis into a new tile. """
+        size = self.parentItem().size()
+        margin = self._margin(orientation)
+
+        if orientation == Qt.Horizontal:
+            length = size.width()
+            w, h = length + 2 * margin, self.TILE_SIZE
+        else:
+            length = size.height()
+            w, h = self.TILE_SIZE, length + 2 * margin
+
+        pixmap = QPixmap(
+            int(math.ceil(w * devicePixelRatio)), int(math.ceil(h * devicePixelRatio))
+        )
+        pixmap.setDevicePixelRatio(devicePixelRatio)
+        pixmap.fill(Qt.transparent)
+
+        ticks, _ = self._axes[orientation].axisTicks(self._areaTransform, margin)
+
+        p = QPainter(pixmap)
+        p.setRenderHint(QPainter.Antialiasing, False)
+        p.setPen(makePen(self.gridColor))
+        for pos, _ in ticks:
+            if -margin <= pos <= length + margin:
+                v = round(pos) + margin
+                if orientation == Qt.Horizontal:
+                    p.drawLine(QLineF(v, 0, v, h))
+                else:
+                    p.drawLine(QLineF(0, v, w, v))
+        p.end()
+
+        return pixmap
+
+    def _updateTile(self, orientation, devicePixelRatio):
+        tile = self._tiles[orientation]
+        shift, state = self._tileState(
+            orientation, self._areaTransform, devicePixelRatio
+        )
+
+        if tile["rendered"] is not None:
+            renderedShift, renderedState = tile["rendered"]
+            offset = shift - renderedShift
+            if state == renderedState and abs(offset) <= self._margin(orientation):
+                tile["offset"] = offset
+                return
+
+        tile["pixmap"] = self._renderTile(orientation, devicePixelRatio)
+        tile["rendered"] = (shift, state)
+        tile["offset"] = 0
+
+    def paint(self, p=QPainter(), o=QStyleOptionGraphicsItem(), widget=None):
+        if self._areaTransform is None:
+            return
+
+        devicePixelRatio = p.device().devicePixelRatioF()
+        r = self.boundingRect()
+
+        for orientation, tile in self._tiles.items():
+            self._updateTile(orientation, devicePixelRatio)
+
+            margin = self._margin(orientation)
+            offset = round(tile["offset"])
+            if orientation == Qt.Horizontal:
+                origin = QPointF(margin - offset, 0)
+            else:
+                origin = QPointF(0, margin - offset)
+
+            p.drawTiledPixmap(r, tile["pixmap"], origin)
+
+    def __repr__(self):
+        return "<ChartGrid>"
+
+
+class RangeHistory(object):
+    """ Bounded history of visible ranges with back and forward navigation and named bookmarks.
+
+    Each entry may keep the render states of the chart items for its range. Only the most recently used
+    entries keep them, the others fall back to a plain range.
+
+    :param maxlen: maximum number of entries in the history
+    :param cacheSize: number of entries that keep the render states of the items, 0 disables the cache
+    """
+
+    def __init__(self, maxlen=50, cacheSize=8):
+        self.maxlen = maxlen
+        self.cacheSize = cacheSize
+
+        self._entries = []
+        self._index = -1
+        self._bookmarks = {}
+        self._cached = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def current(self):
+        """ Entry of the currently shown range, None if the history is empty. """
+        if self._index < 0:
+            return None
+        return self._entries[self._index]
+
+    def canGoBack(self):
+        return self._index > 0
+
+    def canGoForward(self):
+        return self._index < len(self._entries) - 1
+
+    def push(self, rect):
+        """ Appends the range after the current entry and drops all entries ahead of it.
+
+        :param rect: visible range
+        :return: the new entry or the current one if it already shows the range
+        """
+        current = self.current
+        if current is not None and current["range"] == rect:
+            return current
+
+        dropped = self._entries[self._index + 1 :]
+        del self._entries[self._index + 1 :]
+        for entry in dropped:
+            self._release(entry)
+
+        entry = {"range": QRectF(rect), "states": None}
+        self._entries.append(entry)
+
+        while len(self._entries) > self.maxlen:
+            self._release(self._entries.pop(0))
+
+        self._index = len(self._entries) - 1
+        return entry
+
+    def back(self):
+        """ Steps one entry back.
+
+        :return: the entry or None if already at the oldest entry
+        """
+        if not self.canGoBack():
+            return None
+        self._index -= 1
+        return self._entries[self._index]
+
+    def forward(self):
+        """ Steps one entry forward.
+
+        :return: the entry or None if already at the newest entry
+        """
+        if not self.canGoForward():
+            return None
+        self._index += 1
+        return self._entries[self._index]
+
+    def addBookmark(self, name, entry):
+        self._bookmarks[name] = entry
+
+    def removeBookmark(self, name):
+        entry = self._bookmarks.pop(name)
+        self._release(entry)
+
+    def bookmark(self, name):
+        """ Entry of the bookmark.
+
+        :param name: name of the bookmark
+        :return: the entry or None if there is no such bookmark
+        """
+        return self._bookmarks.get(name)
+
+    @property
+    def bookmarks(self):
+        """ Names of all bookmarks. """
+        return list(self._bookmarks.keys())
+
+    def storeStates(self, entry, states):
+        """ Keeps the render states for the entry and evicts the least recently used ones.
+
+        :param entry: history entry
+        :param states: mapping of chart item to render state
+        """
+        if self.cacheSize <= 0:
+            return
+
+        entry["states"] = states
+        self._cached[id(entry)] = entry
+        self._cached.move_to_end(id(entry))
+
+        while len(self._cached) > self.cacheSize:
+            _, evicted = self._cached.popitem(last=False)
+            evicted["states"] = None
+
+    def states(self, entry):
+        """ Render states of the entry, marks the entry as recently used.
+
+        :param entry: history entry
+        :return: mapping of chart item to render state or None
+        """
+        if id(entry) in self._cached:
+            self._cached.move_to_end(id(entry))
+        return entry["states"]
+
+    def _release(self, entry):
+        """ Drops the render states of an entry that is neither in the history nor bookmarked. """
+        referenced = itertools.chain(self._entries, self._bookmarks.values())
+        if any(e is entry for e in referenced):
+            return
+        self._cached.pop(id(entry), None)
+        entry["states"] = None
+
+
 class ChartArea(QGraphicsWidget):
     # Used to update axis,
     hAxisChange = Signal(object)
@@ -1167,6 +1672,8 @@ class ChartArea(QGraphicsWidget):
 
         self.__aspectRatio = None
 
+        self.__history = RangeHistory()
+
         self._dbg_box_color = Qt.red
 
     @property
@@ -1178,6 +1685,16 @@ class ChartArea(QGraphicsWidget):
         if value is not None:
             self.adjustRange()
 
+    @property
+    def visibleRange(self):
+        """ The currently visible rectangle in chart coordinates, None if not yet known. """
+        return self.__visibleRange
+
+    @property
+    def history(self):
+        """ History of the visible ranges, see RangeHistory. """
+        return self.__history
+
     def setMaxVisibleRange(self, rect):
         self.__maxVisibleRange = rect.normalized()
 
@@ -1206,6 +1723,10 @@ class ChartArea(QGraphicsWidget):
         _log.debug("Show event")
         self.adjustRange()
 
+        # the initial range is the first entry to go back to
+        if len(self.__history) == 0 and self.__visibleRange is not None:
+            self.__history.push(self.__visibleRange)
+
     PAN_MODE, ZOOM_BOX_MODE = range(2)
 
     def mousePressEvent(self, event):
@@ -1248,6 +1769,10 @@ class ChartArea(QGraphicsWidget):
 
             _log.debug("Emitting Bounds Changed from: mouseReleaseEvent(...)")
             self.visibleRangeChange.emit(self.__visibleRange)
+            self.commitRange()
+
+        elif self.__mouseMode == ChartArea.PAN_MODE:
+            self.commitRange()
 
         self.__initZoomPrepare = False
         self.__initZoom = False
@@ -1327,6 +1852,10 @@ class ChartArea(QGraphicsWidget):
             self.scene().removeItem(self.__scaleBox)
             self.__initZoom = False
             self.update()
+        elif event.key() == Qt.Key_Left and event.modifiers() == Qt.AltModifier:
+            self.back()
+        elif event.key() == Qt.Key_Right and event.modifiers() == Qt.AltModifier:
+            self.forward()
 
     def wheelEvent(self, event):
         _log.debug("Wheel on area")
@@ -1388,6 +1917,7 @@ class ChartArea(QGraphicsWidget):
         self.adjustRange()
 
         self.visibleRangeChange.emit(self.__visibleRange)
+        self.commitRange()
 
     @classmethod
     def _logTransform(cls, t, desc=None):
@@ -1453,6 +1983,72 @@ class ChartArea(QGraphicsWidget):
         self.__visibleRange = bbox
         self.adjustRange()
         self.visibleRangeChange.emit(self.__visibleRange)
+        self.commitRange()
+
+    def commitRange(self):
+        """ Records the current visible range in the history, along with the render states of the items if the
+        history caches them. Called when a pan or zoom is finished, setRange does not record the range.
+        """
+        if self.__visibleRange is None:
+            return
+
+        entry = self.__history.push(self.__visibleRange)
+        if self.__history.cacheSize > 0:
+            self.__history.storeStates(entry, self._renderStates())
+
+    def _renderStates(self):
+        states = weakref.WeakKeyDictionary()
+        for c in self.__rootItem.childItems():
+            state = c.renderState() if hasattr(c, "renderState") else None
+            if state is not None:
+                states[c] = state
+        return states
+
+    def _restoreEntry(self, entry):
+        """ Shows the range of a history entry and hands the cached render states back to the items. """
+        if entry is None:
+            return
+
+        states = self.__history.states(entry)
+        if states is not None:
+            for item, state in states.items():
+                item.restoreRenderState(state)
+
+        self.__visibleRange = QRectF(entry["range"])
+        self.adjustRange()
+        self.visibleRangeChange.emit(self.__visibleRange)
+
+    def back(self):
+        """ Goes back to the previous visible range. """
+        self._restoreEntry(self.__history.back())
+
+    def forward(self):
+        """ Goes forward to the next visible range. """
+        self._restoreEntry(self.__history.forward())
+
+    def addBookmark(self, name):
+        """ Bookmarks the current visible range.
+
+        :param name: name of the bookmark
+        """
+        if self.__visibleRange is None:
+            return
+        self.commitRange()
+        self.__history.addBookmark(name, self.__history.current)
+
+    def gotoBookmark(self, name):
+        """ Shows the bookmarked range and records it in the history.
+
+        :param name: name of the bookmark
+        """
+        entry = self.__history.bookmark(name)
+        if entry is None:
+            raise QPlotUtilsException("No bookmark named {}".format(name))
+
+        self._restoreEntry(entry)
+        current = self.__history.push(self.__visibleRange)
+        if entry["states"] is not None:
+            self.__history.storeStates(current, entry["states"])
 
     def adjustRange(self):
         if self.__visibleRange is None:
@@ -1542,6 +2138,41 @@ class ChartArea(QGraphicsWidget):
         self.__rootItem.setTransform(n)
         self.axisChange()
 
+    def setHorizontalTransform(self, transform):
+        """ Applies the horizontal mapping of the given transform and keeps the vertical one. Used to share
+        the abscissa between chart areas.
+
+        The horizontal screen coordinate is given by m11, m21 and m31, so rotated orientations like
+        ChartView.AUTOSAR are shared as well. Both areas need the same orientation.
+
+        :param transform: transform of another chart area
+        """
+        t = self.__rootItem.transform()
+        if (
+            t.m11() == transform.m11()
+            and t.m21() == transform.m21()
+            and t.m31() == transform.m31()
+        ):
+            return
+
+        n = QTransform(
+            transform.m11(),
+            t.m12(),
+            transform.m21(),
+            t.m22(),
+            transform.m31(),
+            t.m32(),
+        )
+        if not n.isInvertible():
+            raise QPlotUtilsException(
+                "Orientation of the transform does not match the chart area"
+            )
+        self.__rootItem.setTransform(n)
+
+        self._calcVisibleRange()
+        self.axisChange()
+        self.visibleRangeChange.emit(self.__visibleRange)
+
     def setRange(self, bbox):
         r = bbox.normalized()
         _log.debug("Set range")
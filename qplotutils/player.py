@@ -5,6 +5,9 @@ User controls for interactivity.
 
 """
 import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import numpy as np
 from qtpy.QtCore import *
@@ -37,11 +40,35 @@ class PlaybackWidget(QWidget):
 
     Models / Visualization that choose to be controlled through the playback widget should
     connect to :meth:`qplotutils.player.PlaybackWidget.timestamp_changed`.
+
+    While the slider is dragged, emissions are coalesced to the latest value once per frame. Cheap consumers
+    may connect to :meth:`qplotutils.player.PlaybackWidget.scrub_preview` instead, and with
+    ``scrub_mode = SCRUB_ON_RELEASE`` the expensive ``timestamp_changed`` is only emitted when the slider is
+    released.
     """
 
     #: emited whenever the timestamp is changed.
     timestamp_changed = Signal(int, float)
 
+    #: emitted about once per second during real-time playback with the achieved and the target frame rate.
+    rate_changed = Signal(float, float)
+
+    #: bounds of the playback speed multiplier
+    MIN_SPEED, MAX_SPEED = 0.1, 100.0
+
+    #: seek modes, see :meth:`seek`
+    SEEK_NEAREST, SEEK_PREVIOUS, SEEK_NEXT = "nearest", "previous", "next"
+
+    #: emitted at most once per frame with the latest slider value while the slider is dragged.
+    scrub_preview = Signal(int, float)
+
+    #: scrub modes, emit timestamp_changed during the drag or only on release of the slider
+    SCRUB_LIVE, SCRUB_ON_RELEASE = "live", "on_release"
+
+    #: emitted along with timestamp_changed if streams are set, the dict maps each stream name to the index of
+    #: its latest sample at or before the timestamp (-1 if the stream has not started yet).
+    stream_indices_changed = Signal(int, float, object)
+
     def __init__(self, parent=None):
         super(PlaybackWidget, self).__init__(parent)
         self.ui = Ui_PlaybackControl()
@@ -50,7 +77,30 @@ class PlaybackWidget(QWidget):
         self.__is_playing = False
 
         self.__timestamps = None
+        self.__ts_array = None
         self.__last_index = None
+        self.__streams = None
+        self.__stream_luts = None
+
+        # slider drag
+        self.scrub_mode = self.SCRUB_LIVE
+        self.__scrub_value = None
+        self.__emitted_index = None
+        self.__scrub_timer = QTimer(self)
+        self.__scrub_timer.setSingleShot(True)
+        self.__scrub_timer.setInterval(16)
+        self.__scrub_timer.timeout.connect(self._flush_scrub)
+
+        # real-time playback
+        self.__realtime = False
+        self.__speed = 1.0
+        self.__time_scale = 1.0
+        self.__generation = 0
+        self.__clock = None
+        self.__stats = None
+        self.__ticking = False
+        self.__achieved_rate = 0.0
+        self.__target_rate = 0.0
 
         self.ui.button_play_pause.clicked.connect(self.play_pause)
         self.ui.button_back.clicked.connect(self.step_back)
@@ -58,7 +108,9 @@ class PlaybackWidget(QWidget):
 
         self.ui.slider_index.valueChanged.connect(self._slider_value_changed)
         self.ui.slider_index.sliderPressed.connect(self._slider_pressed)
-        self.ui.edit_timestamp.textEdited.connect(self.jump_to_timestamp)
+        self.ui.slider_index.sliderReleased.connect(self._slider_released)
+        # seek once the input is complete, a seek per keystroke would rewrite the text while typing
+        self.ui.edit_timestamp.editingFinished.connect(self._timestamp_edited)
 
         if CONFIG.debug:
             self.timestamp_changed.connect(self.debug_slider)
@@ -67,14 +119,52 @@ class PlaybackWidget(QWidget):
         try:
             _log.debug(text)
             ts = float(text)
-            idx, = np.where(self.timestamps == ts)
-            self.ui.slider_index.setValue(idx[0])
+            self.seek(ts)
         except Exception as ex:
             _log.info(
                 "Could not set timestamp. Format no recognized or out of interval."
             )
             _log.debug("Exception %s", ex)
 
+    def _timestamp_edited(self):
+        self.jump_to_timestamp(self.ui.edit_timestamp.text())
+
+    def seek(self, ts, mode=SEEK_NEAREST):
+        """ Moves to the sample at the given timestamp. The timestamps are expected to be sorted.
+
+        :param ts: timestamp
+        :param mode: SEEK_NEAREST for the closest sample, SEEK_PREVIOUS for the last sample at or before ts,
+            SEEK_NEXT for the first sample at or after ts
+        :return: index of the sample or None if there is no such sample
+        """
+        timestamps = self.__ts_array
+        if timestamps is None or len(timestamps) == 0:
+            return None
+
+        if mode == self.SEEK_PREVIOUS:
+            idx = np.searchsorted(timestamps, ts, side="right") - 1
+            if idx < 0:
+                return None
+
+        elif mode == self.SEEK_NEXT:
+            idx = np.searchsorted(timestamps, ts, side="left")
+            if idx >= len(timestamps):
+                return None
+
+        elif mode == self.SEEK_NEAREST:
+            idx = np.searchsorted(timestamps, ts, side="left")
+            if idx >= len(timestamps):
+                idx = len(timestamps) - 1
+            elif idx > 0 and ts - timestamps[idx - 1] <= timestamps[idx] - ts:
+                idx -= 1
+
+        else:
+            raise ValueError("Unknown seek mode: {}".format(mode))
+
+        idx = int(idx)
+        self.ui.slider_index.setValue(idx)
+        return idx
+
     def debug_slider(self, index, timestamp):
         _log.debug("{}: {}".format(index, timestamp))
 
@@ -82,21 +172,194 @@ class PlaybackWidget(QWidget):
     def timestamps(self):
         return self.__timestamps
 
+    @property
+    def timestamp_array(self):
+        """ The timestamps as numpy array, converted once when they are set. None if no timestamps are set. """
+        return self.__ts_array
+
     @timestamps.setter
     def timestamps(self, value):
+        self.__streams = None
+        self.__stream_luts = None
         self.__timestamps = value
+        self.__ts_array = np.asarray(value)
         self.__last_index = len(value)
         self.ui.slider_index.setMinimum(0)
         self.ui.slider_index.setMaximum(self.__last_index)
         self.ui.slider_index.setValue(0)
 
+    @property
+    def is_playing(self):
+        return self.__is_playing
+
+    @property
+    def realtime(self):
+        """ If true, playback follows the spacing of the timestamps in wall-clock time instead of advancing one
+        index per timer tick. Frames are dropped when the consumers cannot keep up.
+        """
+        return self.__realtime
+
+    @realtime.setter
+    def realtime(self, value):
+        was_playing = self.__is_playing
+        self.pause()
+        self.__realtime = value
+        if was_playing:
+            self.play()
+
+    @property
+    def speed(self):
+        """ Speed multiplier of the real-time playback, limited to 0.1x ... 100x. """
+        return self.__speed
+
+    @speed.setter
+    def speed(self, value):
+        self.__speed = float(np.clip(value, self.MIN_SPEED, self.MAX_SPEED))
+        self.__restart_clock()
+
+    @property
+    def time_scale(self):
+        """ Timestamp units per second, e.g. 1e6 for timestamps in microseconds. """
+        return self.__time_scale
+
+    @time_scale.setter
+    def time_scale(self, value):
+        self.__time_scale = float(value)
+        self.__restart_clock()
+
+    @property
+    def achieved_rate(self):
+        """ Frames per second emitted during the last second of real-time playback. """
+        return self.__achieved_rate
+
+    @property
+    def target_rate(self):
+        """ Frames per second the timestamps would require at the current speed during the last second of
+        real-time playback.
+        """
+        return self.__target_rate
+
+    @property
+    def dropped_frames(self):
+        """ Number of frames skipped since real-time playback was started. """
+        if self.__stats is None:
+            return 0
+        return self.__stats["dropped"]
+
+    @property
+    def streams(self):
+        """ Named timestamp streams, None if plain timestamps are used. """
+        return self.__streams
+
+    def set_streams(self, streams):
+        """ Plays several timestamp streams on one merged timeline.
+
+        The sorted streams are merged once and for every tick of the merged timeline the index of the
+        latest sample of each stream is precomputed, see :meth:`stream_indices`.
+
+        :param streams: dict of stream name to sorted timestamps
+        """
+        arrays = OrderedDict((k, np.asarray(v)) for k, v in streams.items())
+
+        # stable sort detects the sorted runs and merges them
+        merged = np.sort(np.concatenate(list(arrays.values())), kind="stable")
+        if len(merged) > 0:
+            keep = np.empty(len(merged), dtype=bool)
+            keep[0] = True
+            np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+            merged = merged[keep]
+
+        self.timestamps = merged
+        self.__streams = arrays
+        self.__stream_luts = OrderedDict(
+            (k, np.searchsorted(v, merged, side="right") - 1) for k, v in arrays.items()
+        )
+
+        if len(merged) > 0:
+            value = self.ui.slider_index.value()
+            self.stream_indices_changed.emit(
+                value, merged[value], self.stream_indices(value)
+            )
+
+    def stream_indices(self, index):
+        """ Index of the latest sample of every stream at the given tick of the merged timeline.
+
+        :param index: index into the merged timeline
+        :return: dict of stream name to sample index, -1 if the stream has no sample yet
+        """
+        if self.__stream_luts is None:
+            return {}
+        return {k: int(lut[index]) for k, lut in self.__stream_luts.items()}
+
+    def save_snapshot(self):
+        """ Playback state stored in bench snapshots.
+
+        :return: dict
+        """
+        return {
+            "index": self.ui.slider_index.value(),
+            "speed": self.__speed,
+            "realtime": self.__realtime,
+            "scrub_mode": self.scrub_mode,
+        }
+
+    def load_snapshot(self, state):
+        """ Restores the playback state saved by save_snapshot. Playback is paused at the saved position.
+
+        :param state: dict
+        """
+        self.pause()
+        self.__realtime = state.get("realtime", self.__realtime)
+        self.__speed = float(
+            np.clip(state.get("speed", self.__speed), self.MIN_SPEED, self.MAX_SPEED)
+        )
+        self.scrub_mode = state.get("scrub_mode", self.scrub_mode)
+        self.ui.slider_index.setValue(state.get("index", 0))
+
     def _slider_pressed(self):
         self.pause()
 
+    def _slider_released(self):
+        self.__scrub_timer.stop()
+        self.__scrub_value = None
+
+        value = self.ui.slider_index.value()
+        if value != self.__emitted_index:
+            self._emit_timestamp(value)
+
+    def _flush_scrub(self):
+        """ Emits the latest slider value of the ongoing drag. """
+        value, self.__scrub_value = self.__scrub_value, None
+        if value is None:
+            return
+
+        self.scrub_preview.emit(value, self.timestamps[value])
+        if self.scrub_mode == self.SCRUB_LIVE:
+            self._emit_timestamp(value)
+
+    def _emit_timestamp(self, value):
+        self.__emitted_index = value
+        ts = self.timestamps[value]
+        self.timestamp_changed.emit(value, ts)
+
+        if self.__stream_luts is not None:
+            self.stream_indices_changed.emit(value, ts, self.stream_indices(value))
+
     def _slider_value_changed(self, value):
         ts = self.timestamps[value]
         self.ui.edit_timestamp.setText("{}".format(ts))
-        self.timestamp_changed.emit(value, ts)
+
+        if self.ui.slider_index.isSliderDown():
+            self.__scrub_value = value
+            if not self.__scrub_timer.isActive():
+                self.__scrub_timer.start()
+            return
+
+        self._emit_timestamp(value)
+
+        # jumps during real-time playback continue from the new position
+        if self.__clock is not None and not self.__ticking:
+            self.__restart_clock()
 
     def play_pause(self):
         if self.__is_playing:
@@ -111,6 +374,7 @@ class PlaybackWidget(QWidget):
             QIcon(":/player/icons/media-playback-start.svg")
         )
         self.__is_playing = False
+        self.__clock = None
 
     def play(self):
         if self.__is_playing:
@@ -119,7 +383,11 @@ class PlaybackWidget(QWidget):
             QIcon(":/player/icons/media-playback-pause.svg")
         )
         self.__is_playing = True
-        self.advance()
+        if self.__realtime:
+            self.__stats = {"dropped": 0, "emitted": 0, "covered": 0, "since": None}
+            self.__restart_clock()
+        else:
+            self.advance()
 
     def step_back(self):
         self.pause()
@@ -140,9 +408,384 @@ class PlaybackWidget(QWidget):
             return
 
         self.ui.slider_index.setValue(next_index)
-        if self.__is_playing:
+        if self.__is_playing and not self.__realtime:
             QTimer.singleShot(10, self.advance)
 
+    def __restart_clock(self):
+        """ Anchors the playback clock at the current index and replaces pending ticks by a new one. """
+        self.__generation += 1
+        if not self.__is_playing or not self.__realtime:
+            self.__clock = None
+            return
+
+        now = time.monotonic()
+        ts = self.__ts_array
+        self.__clock = (now, ts[self.ui.slider_index.value()])
+        self.__stats.update(emitted=0, covered=0, since=now)
+
+        generation = self.__generation
+        QTimer.singleShot(0, lambda: self.__tick(generation))
+
+    def __tick(self, generation):
+        """ Shows the newest frame that is due according to the playback clock and schedules the next tick for
+        the following frame.
+
+        :param generation: clock generation the tick was scheduled for, outdated ticks are ignored
+        """
+        if generation != self.__generation or not self.__is_playing:
+            return
+
+        ts = self.__ts_array
+        last = min(self.__last_index, len(ts)) - 1
+        current = self.ui.slider_index.value()
+
+        now = time.monotonic()
+        wall_start, ts_start = self.__clock
+        due = ts_start + (now - wall_start) * self.__speed * self.__time_scale
+
+        index = min(int(np.searchsorted(ts, due, side="right")) - 1, last)
+        if index > current:
+            self.__stats["dropped"] += index - current - 1
+            self.__stats["emitted"] += 1
+            self.__stats["covered"] += index - current
+            self.__ticking = True
+            try:
+                self.ui.slider_index.setValue(index)
+            finally:
+                self.__ticking = False
+
+        self.__update_rates(time.monotonic())
+
+        if index >= last:
+            self.pause()
+            return
+
+        # wake up when the next frame is due
+        now = time.monotonic()
+        due = ts_start + (now - wall_start) * self.__speed * self.__time_scale
+        delay = (ts[index + 1] - due) / self.__time_scale / self.__speed
+        delay_ms = int(np.clip(delay * 1000.0, 0, 1000))
+        QTimer.singleShot(delay_ms, lambda: self.__tick(generation))
+
+    def __update_rates(self, now):
+        stats = self.__stats
+        elapsed = now - stats["since"]
+        if elapsed < 1.0:
+            return
+
+        self.__achieved_rate = stats["emitted"] / elapsed
+        self.__target_rate = stats["covered"] / elapsed
+        stats["emitted"] = 0
+        stats["covered"] = 0
+        stats["since"] = now
+
+        _log.debug(
+            "Playback at {:.1f} fps, target {:.1f} fps, {} frames dropped".format(
+                self.__achieved_rate, self.__target_rate, stats["dropped"]
+            )
+        )
+        self.rate_changed.emit(self.__achieved_rate, self.__target_rate)
+
+
+class PlaybackDataProvider(QObject):
+    """ Loads the data of the consumers of a playback widget ahead of the playback cursor.
+
+    Consumers register a loader that returns the data for a timestamp and a slot that receives it. On every
+    timestamp change of the player the slots are called with the data of the current frame, while the loaders
+    for the next frames in the direction of play run on a thread pool. Frames that are ready are kept in a
+    bounded LRU cache, so steady-state playback does not load on the GUI thread.
+
+    A frame that was not requested ahead, e.g. after a seek, is loaded right away on the GUI thread instead of
+    waiting behind the prefetch queue. Pending loads outside of the new prefetch window are cancelled.
+
+    .. note:: Loaders are called from worker threads and must not touch Qt widgets.
+
+    :param player: the PlaybackWidget
+    :param prefetch: number of frames loaded ahead of the cursor
+    :param cache_size: maximum number of frames kept per consumer
+    :param max_workers: number of worker threads
+    :param parent: parent object
+    """
+
+    def __init__(self, player, prefetch=8, cache_size=64, max_workers=2, parent=None):
+        super(PlaybackDataProvider, self).__init__(parent)
+        self.player = player
+        self.prefetch = prefetch
+        self.cache_size = cache_size
+
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__consumers = OrderedDict()
+        self.__next_handle = 0
+
+        self.__last_index = None
+        self.__direction = 1
+
+        #: number of frames that were requested ahead of their emission
+        self.hits = 0
+        #: number of frames that had to be loaded on emission
+        self.misses = 0
+
+        self.player.timestamp_changed.connect(self._timestamp_changed)
+
+    def register(self, loader, slot):
+        """ Registers a consumer.
+
+        :param loader: callable (index, timestamp) -> data, called from a worker thread
+        :param slot: callable (index, timestamp, data), called on the GUI thread
+        :return: handle to unregister the consumer
+        """
+        handle = self.__next_handle
+        self.__next_handle += 1
+        self.__consumers[handle] = {
+            "loader": loader,
+            "slot": slot,
+            "frames": OrderedDict(),
+        }
+        return handle
+
+    def unregister(self, handle):
+        consumer = self.__consumers.pop(handle)
+        for future in consumer["frames"].values():
+            future.cancel()
+
+    def close(self):
+        """ Disconnects from the player and stops the worker threads. """
+        self.player.timestamp_changed.disconnect(self._timestamp_changed)
+        for handle in list(self.__consumers.keys()):
+            self.unregister(handle)
+        self.__executor.shutdown(wait=False)
+
+    def _timestamp_changed(self, index, timestamp):
+        if self.__last_index is not None and index != self.__last_index:
+            self.__direction = 1 if index > self.__last_index else -1
+        self.__last_index = index
+
+        window = set(index + self.__direction * k for k in range(self.prefetch + 1))
+
+        for consumer in list(self.__consumers.values()):
+            frames = consumer["frames"]
+
+            # after a seek or a change of direction, pending loads of the old window would delay the new frames
+            for k, future in list(frames.items()):
+                if k not in window and future.cancel():
+                    del frames[k]
+
+            future = frames.get(index)
+            if future is None or future.cancelled():
+                self.misses += 1
+                future = frames[index] = self.__load(
+                    consumer["loader"], index, timestamp
+                )
+            else:
+                self.hits += 1
+                if future.cancel():
+                    # requested ahead, but still queued
+                    future = frames[index] = self.__load(
+                        consumer["loader"], index, timestamp
+                    )
+            frames.move_to_end(index)
+
+            try:
+                data = future.result()
+            except Exception as ex:
+                _log.error("Loading frame %s failed: %s", index, ex)
+                del frames[index]
+                continue
+
+            consumer["slot"](index, timestamp, data)
+
+        self.__prefetch(index)
+
+    @staticmethod
+    def __load(loader, index, timestamp):
+        """ Loads a frame on the calling thread.
+
+        :return: completed future with the data or the exception of the loader
+        """
+        future = Future()
+        try:
+            future.set_result(loader(index, timestamp))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    def __prefetch(self, index):
+        """ Submits the frames ahead of the cursor and drops the frames that fell out of the cache. """
+        timestamps = self.player.timestamp_array
+        if timestamps is None:
+            return
+
+        ahead = [
+            index + self.__direction * k
+            for k in range(1, self.prefetch + 1)
+            if 0 <= index + self.__direction * k < len(timestamps)
+        ]
+
+        for consumer in self.__consumers.values():
+            frames = consumer["frames"]
+
+            for k in ahead:
+                if k not in frames or frames[k].cancelled():
+                    frames[k] = self.__executor.submit(
+                        consumer["loader"], k, timestamps[k]
+                    )
+                frames.move_to_end(k)
+
+            # never evict the frames that were just requested
+            while len(frames) > max(self.cache_size, self.prefetch + 1):
+                _, future = frames.popitem(last=False)
+                future.cancel()
+
+
+class PlaybackProfiler(QObject):
+    """ Opt-in instrumentation that times every consumer of a playback widget.
+
+    Consumers are added through the profiler (add_consumer) instead of directly to
+    ``timestamp_changed``. The duration of each call and the interval between emissions are
+    kept in rolling windows to find the consumer that holds back the frame rate.
+
+    :param player: the PlaybackWidget
+    :param window: number of emissions the statistics are computed over
+    :param parent: parent object
+    """
+
+    #: name of the statistics of the interval between two emissions
+    FRAME = "frame"
+
+    def __init__(self, player, window=300, parent=None):
+        super(PlaybackProfiler, self).__init__(parent)
+        self.player = player
+        self.window = window
+
+        self.__samples = OrderedDict()
+        self.__slots = {}
+        self.__last_emission = None
+
+        self.player.timestamp_changed.connect(self.__frame)
+
+    def add_consumer(self, slot, name=None):
+        """ Connects the slot to ``timestamp_changed`` and times each call.
+
+        :param slot: callable (index, timestamp)
+        :param name: unique name in the statistics, defaults to the qualified name of the slot,
+            numbered if several consumers share it (e.g. two docks of the same class)
+        :return: the name
+        """
+        if name is None:
+            base = getattr(slot, "__qualname__", repr(slot))
+            name, k = base, 1
+            while name in self.__slots:
+                k += 1
+                name = "{} #{}".format(base, k)
+        elif name in self.__slots:
+            raise ValueError("A consumer named {} already exists".format(name))
+
+        def timed(index, timestamp):
+            start = time.perf_counter()
+            try:
+                slot(index, timestamp)
+            finally:
+                self.__record(name, time.perf_counter() - start)
+
+        self.__slots[name] = timed
+        self.__samples[name] = deque(maxlen=self.window)
+        self.player.timestamp_changed.connect(timed)
+        return name
+
+    def remove_consumer(self, name):
+        """ Disconnects the consumer added under name. """
+        self.player.timestamp_changed.disconnect(self.__slots.pop(name))
+        del self.__samples[name]
+
+    def close(self):
+        """ Disconnects all consumers and stops profiling. """
+        for name in list(self.__slots.keys()):
+            self.remove_consumer(name)
+        self.player.timestamp_changed.disconnect(self.__frame)
+
+    def reset(self):
+        for samples in self.__samples.values():
+            samples.clear()
+        self.__last_emission = None
+
+    def __frame(self, index, timestamp):
+        now = time.perf_counter()
+        if self.__last_emission is not None:
+            self.__record(self.FRAME, now - self.__last_emission)
+        self.__last_emission = now
+
+    def __record(self, name, duration):
+        samples = self.__samples.get(name)
+        if samples is None:
+            samples = self.__samples[name] = deque(maxlen=self.window)
+        samples.append(duration)
+
+    def stats(self):
+        """ Rolling statistics of every consumer and of the frame interval.
+
+        :return: dict of name to dict with count and p50, p95 and max in milliseconds
+        """
+        result = OrderedDict()
+        for name, samples in self.__samples.items():
+            if len(samples) == 0:
+                continue
+            ms = np.array(samples) * 1000.0
+            result[name] = {
+                "count": len(ms),
+                "p50": float(np.percentile(ms, 50)),
+                "p95": float(np.percentile(ms, 95)),
+                "max": float(np.max(ms)),
+            }
+        return result
+
+    def report(self):
+        """ Statistics as text table, slowest consumer first. """
+        stats = self.stats()
+        frame = stats.pop(self.FRAME, None)
+
+        lines = [
+            "{:<32} {:>8} {:>8} {:>8}".format("consumer [ms]", "p50", "p95", "max")
+        ]
+        for name, s in sorted(stats.items(), key=lambda kv: -kv[1]["p95"]):
+            lines.append(
+                "{:<32} {:>8.2f} {:>8.2f} {:>8.2f}".format(
+                    name[:32], s["p50"], s["p95"], s["max"]
+                )
+            )
+        if frame is not None:
+            lines.append(
+                "{:<32} {:>8.2f} {:>8.2f} {:>8.2f}".format(
+                    "(frame interval)", frame["p50"], frame["p95"], frame["max"]
+                )
+            )
+        return "\n".join(lines)
+
+
+class PlaybackProfilerOverlay(QLabel):
+    """ Small window that periodically shows the report of a playback profiler.
+
+    :param profiler: the PlaybackProfiler
+    :param interval: refresh interval in milliseconds
+    :param parent: parent widget, the overlay is placed on top of it
+    """
+
+    def __init__(self, profiler, interval=500, parent=None):
+        super(PlaybackProfilerOverlay, self).__init__(parent)
+        self.profiler = profiler
+
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white;")
+
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.refresh)
+        self.__timer.start(interval)
+        self.refresh()
+
+    def refresh(self):
+        self.setText(self.profiler.report())
+        self.adjustSize()
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPU buffers for the wireframe items.
+
+Array data is kept GPU resident in buffer objects and only uploaded again when it changed, instead of passing
+client-side arrays to the driver on every frame.
+"""
+import logging
+
+import numpy as np
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_ELEMENT_ARRAY_BUFFER,
+    GL_STATIC_DRAW,
+    glBindBuffer,
+    glBufferData,
+    glBufferSubData,
+    glDeleteBuffers,
+    glGenBuffers,
+)
+
+_log = logging.getLogger(__name__)
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+
+class VertexBuffer(object):
+    """ Buffer object holding one array on the GPU.
+
+    The data is uploaded lazily the next time the buffer is bound with a current GL context. Re-uploads of data with
+    the same size reuse the allocated storage.
+
+    :param data: initial array, optional
+    :param target: GL_ARRAY_BUFFER for vertex attributes or GL_ELEMENT_ARRAY_BUFFER for indices
+    :param usage: usage hint, e.g. GL_STATIC_DRAW or GL_DYNAMIC_DRAW
+    :param dtype: dtype the data is converted to, defaults to float32 for array and uint32 for element buffers
+    """
+
+    def __init__(self, data=None, target=GL_ARRAY_BUFFER, usage=GL_STATIC_DRAW, dtype=None):
+        self.target = target
+        self.usage = usage
+
+        if dtype is None:
+            dtype = np.uint32 if target == GL_ELEMENT_ARRAY_BUFFER else np.float32
+        self.dtype = np.dtype(dtype)
+
+        self._id = 0
+        self._data = None
+        self._nbytes = 0
+        self._dirty = False
+
+        #: Number of uploads to the GPU, for profiling
+        self.uploads = 0
+
+        if data is not None:
+            self.setData(data)
+
+    @property
+    def id(self):
+        """ Name of the GL buffer, 0 if not yet created. """
+        return self._id
+
+    @property
+    def count(self):
+        """ Number of rows of the data, e.g. vertices or indices. """
+        if self._data is None:
+            return 0
+        if self._data.ndim == 1:
+            return self._data.shape[0]
+        return int(np.prod(self._data.shape[:-1]))
+
+    @property
+    def size(self):
+        """ Number of values in the buffer. """
+        return 0 if self._data is None else self._data.size
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def setData(self, data):
+        """ Replaces the data, it is uploaded on the next bind.
+
+        :param data: array like
+        """
+        self._data = np.ascontiguousarray(data, dtype=self.dtype)
+        self._dirty = True
+
+    def upload(self):
+        """ Uploads pending data. Requires a current GL context. """
+        if self._id == 0:
+            self._id = int(glGenBuffers(1))
+
+        glBindBuffer(self.target, self._id)
+        if self._data.nbytes == self._nbytes:
+            glBufferSubData(self.target, 0, self._data.nbytes, self._data)
+        else:
+            glBufferData(self.target, self._data.nbytes, self._data, self.usage)
+            self._nbytes = self._data.nbytes
+
+        self._dirty = False
+        self.uploads += 1
+
+    def bind(self):
+        """ Binds the buffer, uploading pending data first. """
+        if self._dirty or self._id == 0:
+            self.upload()
+        else:
+            glBindBuffer(self.target, self._id)
+
+    def unbind(self):
+        glBindBuffer(self.target, 0)
+
+    def release(self):
+        """ Frees the GPU storage, the data is uploaded again on the next bind. Requires a current GL context. """
+        if self._id != 0:
+            glDeleteBuffers(1, [self._id])
+        self._id = 0
+        self._nbytes = 0
+        self._dirty = self._data is not None
+
+    def __enter__(self):
+        self.bind()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unbind()
+
+    def __repr__(self):
+        return "<VertexBuffer id={} count={}>".format(self._id, self.count)
@@ -5,7 +5,9 @@ Items for the wireframe view
 
 
 """
+import ctypes
 import logging
+from collections import OrderedDict
 
 import numpy as np
 from OpenGL import GL
@@ -17,20 +19,10 @@ from OpenGL.GL import (
     glDisable,
     GL_LINE_SMOOTH,
     GL_POLYGON_SMOOTH,
-    GL_LINE_SMOOTH_HINT,
-    GL_NICEST,
-    glHint,
-    GL_POLYGON_SMOOTH_HINT,
-    glBlendFunc,
-    glLineWidth,
-    glBegin,
     GL_LINES,
     glColor4f,
-    glVertex3f,
-    glEnd,
     glVertexPointerf,
     glEnableClientState,
-    glNormalPointerf,
     glDrawArrays,
     GL_TRIANGLES,
     glDisableClientState,
@@ -39,11 +31,42 @@ from OpenGL.GL import (
     GL_COLOR_ARRAY,
     glDrawElements,
     GL_UNSIGNED_INT,
+    GL_FLOAT,
+    GL_ELEMENT_ARRAY_BUFFER,
+    glVertexPointer,
+    glNormalPointer,
+    glColorPointer,
+    GL_DYNAMIC_DRAW,
+    glEnableVertexAttribArray,
+    glDisableVertexAttribArray,
+    glVertexAttribPointer,
+    glVertexAttribDivisor,
+    glDrawElementsInstanced,
+    glDrawArraysInstanced,
+    GL_POINTS,
+    GL_STREAM_DRAW,
+    GL_TEXTURE_1D,
+    GL_TEXTURE0,
+    GL_TEXTURE_MIN_FILTER,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_WRAP_S,
+    GL_LINEAR,
+    GL_CLAMP_TO_EDGE,
+    GL_RGBA,
+    GL_RGBA32F,
+    glActiveTexture,
+    glBindTexture,
+    glDeleteTextures,
+    glGenTextures,
+    glTexImage1D,
+    glTexParameteri,
 )
 from qtpy.QtCore import QObject
 from qtpy.QtGui import QMatrix4x4
 
+from qplotutils.chart.color import Colormap
 from qplotutils.wireframe.base_types import DefaultGlOptions
+from qplotutils.wireframe.buffers import VertexBuffer
 from qplotutils.wireframe.shader import ShaderRegistry
 
 _log = logging.getLogger(__name__)
@@ -76,6 +99,11 @@ class GLGraphicsItem(QObject):
         self.__children = set()
         self.__transform = QMatrix4x4()
         self.__visible = True
+
+        # cache of the transform to view coordinates, see viewTransform
+        self.__viewTransform = None
+        self.__glMatrix = None
+
         self.setParentItem(parentItem)
         # self.setDepthValue(0)
         self.__glOpts = glOptions
@@ -87,14 +115,24 @@ class GLGraphicsItem(QObject):
         if item is not None:
             item.__children.add(self)
         self.__parent = item
+        self.invalidateTransform()
+
+        if self.__parent is not None and self.view is not self.__parent.view:
+            if self.view is not None:
+                self.view.removeItem(self)
+            if self.__parent.view is not None:
+                self.__parent.view.addItem(self)
 
-        if self.__parent is not None and self.view() is not self.__parent.view():
-            if self.view() is not None:
-                self.view().removeItem(self)
-            self.__parent.view().addItem(self)
+        self._sceneChanged()
+
+    def _sceneChanged(self):
+        """ Notifies the view that the draw order or visibility of its items changed. """
+        if self.view is not None and hasattr(self.view, "sceneChanged"):
+            self.view.sceneChanged()
 
     def setGLOptions(self, opts):
         self.__glOpts = opts.copy()
+        self._sceneChanged()
         self.update()
 
     def updateGLOptions(self, opts):
@@ -104,6 +142,16 @@ class GLGraphicsItem(QObject):
         Values may also be None, in which case the key will be ignored.
         """
         self.__glOpts.update(opts)
+        self._sceneChanged()
+
+    def glOptions(self):
+        """Return the OpenGL state options of this item."""
+        return self.__glOpts
+
+    def shaderProgram(self):
+        """Return the ShaderProgram the item is drawn with, None for the fixed function pipeline.
+        The view groups items by program and GL options to minimize state changes."""
+        return None
 
     def parentItem(self):
         """Return a this item's parent in the scenegraph hierarchy."""
@@ -146,13 +194,28 @@ class GLGraphicsItem(QObject):
         determines how the local coordinate system of the item is mapped to the coordinate
         system of its parent."""
         self.__transform = tr  # Transform3D(tr)
+        self.invalidateTransform()
         self.update()
 
     def resetTransform(self):
         """Reset this item's transform to an identity transformation."""
         self.__transform.setToIdentity()
+        self.invalidateTransform()
         self.update()
 
+    def invalidateTransform(self):
+        """ Drops the cached view transforms of the item and its children. setTransform and the other transform
+        methods call it, call it yourself after modifying the object returned by transform() in place.
+        """
+        if self.__viewTransform is None and self.__glMatrix is None:
+            # children are invalidated together with their parent
+            return
+
+        self.__viewTransform = None
+        self.__glMatrix = None
+        for c in self.__children:
+            c.invalidateTransform()
+
     def applyTransform(self, tr, local):
         """
         Multiply this object's transform by *tr*.
@@ -175,15 +238,22 @@ class GLGraphicsItem(QObject):
 
     def viewTransform(self):
         """Return the transform mapping this item's local coordinate system to the
-        view coordinate system."""
-        tr = self.__transform
-        p = self
-        while True:
-            p = p.parentItem()
+        view coordinate system. The result is cached until the transform of the item or
+        one of its parents changes."""
+        if self.__viewTransform is None:
+            p = self.parentItem()
             if p is None:
-                break
-            tr = p.transform() * tr
-        return tr
+                self.__viewTransform = QMatrix4x4(self.__transform)
+            else:
+                self.__viewTransform = p.viewTransform() * self.__transform
+        return self.__viewTransform
+
+    def glMatrix(self):
+        """Return the view transform as float32 array in column-major order, as expected
+        by glMultMatrixf."""
+        if self.__glMatrix is None:
+            self.__glMatrix = np.array(self.viewTransform().data(), dtype=np.float32)
+        return self.__glMatrix
 
     def translate(self, dx, dy, dz, local=False):
         """
@@ -226,6 +296,7 @@ class GLGraphicsItem(QObject):
     def setVisible(self, vis):
         """Set the visibility of this item."""
         self.__visible = vis
+        self._sceneChanged()
         self.update()
 
     def visible(self):
@@ -242,11 +313,26 @@ class GLGraphicsItem(QObject):
         """
         pass
 
+    def releaseGL(self):
+        """
+        Called when the item is removed from the view, with the widget's GL context made current.
+        Frees the GPU resources of the item.
+        """
+        pass
+
     def _applyGLOptions(self):
         """
         This method is responsible for preparing the GL state options needed to render
         this item (blending, depth testing, etc). The method is called immediately before painting the item.
+        Within a view only the differences to the current state are issued, see GLState.
         """
+        state = getattr(self.view, "glState", None)
+        if state is not None:
+            state.apply(self.__glOpts)
+            program = self.shaderProgram()
+            state.useProgram(0 if program is None else program.program)
+            return
+
         for k, v in self.__glOpts.items():
             if v is None:
                 continue
@@ -259,6 +345,27 @@ class GLGraphicsItem(QObject):
                 else:
                     glDisable(k)
 
+    def _callGL(self, name, *args):
+        """ Calls a GL state function, e.g. glLineWidth, during paint. Within a view the call goes through GLState,
+        which skips it if the state is already set and resets it for the next item.
+
+        :param name: name of the GL function
+        :param args: arguments
+        """
+        state = getattr(self.view, "glState", None)
+        if state is not None:
+            state.call(name, *args)
+        else:
+            getattr(GL, name)(*args)
+
+    def _useFixedFunction(self):
+        """ Unbinds the shader program before drawing with the fixed function pipeline. Within a view shader programs
+        stay bound after use, see GLState.
+        """
+        state = getattr(self.view, "glState", None)
+        if state is not None:
+            state.useProgram(0)
+
     def paint(self):
         """
         Called by the GLViewWidget to draw this item.
@@ -302,127 +409,257 @@ class GLGraphicsItem(QObject):
         return tr.inverted()[0].map(point)
 
 
-class Grid(GLGraphicsItem):
+class LinesItem(GLGraphicsItem):
+    """ Base of items drawing a set of line segments. The geometry is built once into vertex buffers and only
+    rebuilt after invalidateGeometry, e.g. when size or spacing changed.
+
+    :param lineWidth: width of the lines
+    :param lineColor: color of the lines, unless lineGeometry provides a color per vertex
+    """
+
+    def __init__(self, parentItem=None, lineWidth=1.0, lineColor=(1, 1, 1, 1)):
+        super(LinesItem, self).__init__(parentItem=parentItem)
+        self.line_width = lineWidth
+        self.line_color = lineColor
+
+        self._vertex_buffer = VertexBuffer()
+        self._color_buffer = VertexBuffer()
+        self.__valid = False
+        self.__colored = False
+
+    def lineGeometry(self):
+        """ Builds the line segments.
+
+        :return: Array (2N,3) of the segment end points and Array (2N,4) of their colors or None
+        """
+        raise NotImplementedError
+
+    def invalidateGeometry(self):
+        """ Rebuilds the geometry before the next paint. """
+        self.__valid = False
+        self.update()
+
+    def _updateGeometry(self):
+        if self.__valid:
+            return
+
+        vertices, colors = self.lineGeometry()
+        self._vertex_buffer.setData(vertices)
+        self.__colored = colors is not None
+        if self.__colored:
+            self._color_buffer.setData(colors)
+
+        self.__valid = True
+
+    def initializeGL(self):
+        self._updateGeometry()
+
+    def releaseGL(self):
+        self._vertex_buffer.release()
+        self._color_buffer.release()
+
+    def paint(self):
+        super(LinesItem, self).paint()
+        self._updateGeometry()
+
+        self._callGL("glLineWidth", self.line_width)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        with self._vertex_buffer:
+            glVertexPointer(3, GL_FLOAT, 0, None)
+
+        if self.__colored:
+            glEnableClientState(GL_COLOR_ARRAY)
+            with self._color_buffer:
+                glColorPointer(4, GL_FLOAT, 0, None)
+        else:
+            glColor4f(*self.line_color)
+
+        glDrawArrays(GL_LINES, 0, self._vertex_buffer.count)
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+class Grid(LinesItem):
+
+    #: Smoothed, blended lines
+    GL_OPTIONS = {
+        **DefaultGlOptions.OPAQUE,
+        GL_LINE_SMOOTH: True,
+        GL_POLYGON_SMOOTH: True,
+        GL_BLEND: True,
+        "glBlendFunc": (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA),
+    }
+
     def __init__(
         self, x=10, y=10, xs=1.0, ys=1.0, edge_color=(0.7, 0.7, 0.7, 1), parentItem=None
     ):
-        super(Grid, self).__init__(parentItem)
-        self.edge_color = edge_color
+        super(Grid, self).__init__(parentItem, lineWidth=1.3, lineColor=edge_color)
+        self.setGLOptions(Grid.GL_OPTIONS)
 
-        self.x, self.y = x, y
-        self.xs, self.ys = xs, ys
+        self.__x, self.__y = x, y
+        self.__xs, self.__ys = xs, ys
 
-    def paint(self):
-        super(Grid, self).paint()
+    @property
+    def edge_color(self):
+        return self.line_color
 
-        glEnable(GL_LINE_SMOOTH)
-        glEnable(GL_POLYGON_SMOOTH)
-        glHint(GL_LINE_SMOOTH_HINT, GL_NICEST)
-        glHint(GL_POLYGON_SMOOTH_HINT, GL_NICEST)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+    @edge_color.setter
+    def edge_color(self, value):
+        self.line_color = value
+        self.update()
 
-        glLineWidth(1.3)
-        glBegin(GL_LINES)  # lgtm [py/call/wrong-arguments]
+    @property
+    def x(self):
+        return self.__x
 
-        xvals = np.linspace(-self.x / 2.0, self.x / 2.0, self.x / self.xs + 1)
-        yvals = np.linspace(-self.y / 2.0, self.y / 2.0, self.y / self.ys + 1)
+    @x.setter
+    def x(self, value):
+        self.__x = value
+        self.invalidateGeometry()
 
-        glColor4f(*self.edge_color)
-        for x in xvals:
-            glVertex3f(x, yvals[0], 0)
-            glVertex3f(x, yvals[-1], 0)
-        for y in yvals:
-            glVertex3f(xvals[0], y, 0)
-            glVertex3f(xvals[-1], y, 0)
-        glEnd()  # lgtm [py/call/wrong-arguments]
+    @property
+    def y(self):
+        return self.__y
 
+    @y.setter
+    def y(self, value):
+        self.__y = value
+        self.invalidateGeometry()
 
-class CoordinateCross(GLGraphicsItem):
-    def __init__(self, parentItem=None):
-        super(CoordinateCross, self).__init__(parentItem=parentItem)
+    @property
+    def xs(self):
+        return self.__xs
 
-    def paint(self):
-        super(CoordinateCross, self).paint()
-        glLineWidth(20.0)
-        glBegin(GL_LINES)
-        # X
-        glColor4f(1, 0, 0, 0.3)
-        glVertex3f(0, 0, 0)
-        glVertex3f(1, 0, 0)
+    @xs.setter
+    def xs(self, value):
+        self.__xs = value
+        self.invalidateGeometry()
+
+    @property
+    def ys(self):
+        return self.__ys
+
+    @ys.setter
+    def ys(self, value):
+        self.__ys = value
+        self.invalidateGeometry()
 
-        glColor4f(0, 1, 0, 0.3)
-        glVertex3f(0, 0, 0)
-        glVertex3f(0, 1, 0)
+    def lineGeometry(self):
+        xvals = np.linspace(-self.x / 2.0, self.x / 2.0, int(round(self.x / self.xs)) + 1)
+        yvals = np.linspace(-self.y / 2.0, self.y / 2.0, int(round(self.y / self.ys)) + 1)
 
-        glColor4f(0, 0, 1, 0.3)
-        glVertex3f(0, 0, 0)
-        glVertex3f(0, 0, 1)
+        # one line per x value from the first to the last y value, then vice versa
+        nx, ny = len(xvals), len(yvals)
+        v = np.zeros((2 * (nx + ny), 3))
+        v[0 : 2 * nx : 2, 0] = v[1 : 2 * nx : 2, 0] = xvals
+        v[0 : 2 * nx : 2, 1] = yvals[0]
+        v[1 : 2 * nx : 2, 1] = yvals[-1]
+        v[2 * nx :: 2, 1] = v[2 * nx + 1 :: 2, 1] = yvals
+        v[2 * nx :: 2, 0] = xvals[0]
+        v[2 * nx + 1 :: 2, 0] = xvals[-1]
+        return v, None
 
-        glEnd()
 
+class CoordinateCross(LinesItem):
+
+    #: X, Y and Z axis of unit length
+    VERTICES = np.array(
+        [[0, 0, 0], [1, 0, 0], [0, 0, 0], [0, 1, 0], [0, 0, 0], [0, 0, 1]], np.float32
+    )
+
+    COLORS = np.repeat(
+        np.array([[1, 0, 0, 0.3], [0, 1, 0, 0.3], [0, 0, 1, 0.3]], np.float32), 2, axis=0
+    )
 
-class Box(GLGraphicsItem):
     def __init__(self, parentItem=None):
-        super(Box, self).__init__(parentItem)
+        super(CoordinateCross, self).__init__(parentItem=parentItem, lineWidth=20.0)
 
-        self.length = 4  # in x from point of origin
-        self.width = 2  # in y central to point of origin
-        self.height = 1.2  # in z from point of origin
+    def lineGeometry(self):
+        return self.VERTICES, self.COLORS
 
-    def paint(self):
-        super(Box, self).paint()
 
-        l = self.length
-        wh = self.width / 2.0
-        # h = self.height
-
-        p = [
-            [0, wh, 0],
-            [l, wh, 0],
-            [l, -wh, 0],
-            [0, -wh, 0],
-            [0, wh, 1],
-            [l, wh, 1],
-            [l, -wh, 1],
-            [0, -wh, 1],
-        ]
+class Box(LinesItem):
 
-        m = [
-            [0, 1, 0, 1, 1, 0, 0, 0],
-            [0, 0, 1, 0, 0, 1, 0, 0],
-            [0, 0, 0, 1, 0, 0, 1, 0],
-            [0, 0, 0, 0, 0, 0, 0, 1],
-            [0, 0, 0, 0, 0, 1, 0, 1],
-            [0, 0, 0, 0, 0, 0, 1, 0],
-            [0, 0, 0, 0, 0, 0, 0, 1],
-            [0, 0, 0, 0, 0, 0, 0, 0],
+    #: Vertex pairs of the box edges
+    EDGES = np.array(
+        [
+            [0, 1], [0, 3], [0, 4],
+            [1, 2], [1, 5],
+            [2, 3], [2, 6],
+            [3, 7],
+            [4, 5], [4, 7],
+            [5, 6],
+            [6, 7],
         ]
+    )
 
-        glLineWidth(2.0)
-        glBegin(GL_LINES)  # lgtm [py/call/wrong-arguments]
+    def __init__(self, parentItem=None):
+        super(Box, self).__init__(parentItem, lineWidth=2.0, lineColor=(1, 0, 0, 1))
 
-        glColor4f(1, 0, 0, 1)
-        for k in range(8):
-            for j in range(k + 1, 8):
-                if m[k][j] == 1:
-                    glVertex3f(*p[k])
-                    glVertex3f(*p[j])
+        self.__length = 4  # in x from point of origin
+        self.__width = 2  # in y central to point of origin
+        self.height = 1.2  # in z from point of origin
 
-        glEnd()  # lgtm [py/call/wrong-arguments]
+    @property
+    def length(self):
+        return self.__length
+
+    @length.setter
+    def length(self, value):
+        self.__length = value
+        self.invalidateGeometry()
+
+    @property
+    def width(self):
+        return self.__width
+
+    @width.setter
+    def width(self, value):
+        self.__width = value
+        self.invalidateGeometry()
+
+    def lineGeometry(self):
+        l = self.length
+        wh = self.width / 2.0
+
+        p = np.array(
+            [
+                [0, wh, 0],
+                [l, wh, 0],
+                [l, -wh, 0],
+                [0, -wh, 0],
+                [0, wh, 1],
+                [l, wh, 1],
+                [l, -wh, 1],
+                [0, -wh, 1],
+            ]
+        )
+        return p[self.EDGES.ravel()], None
 
 
 class Mesh(object):
+    """ Triangle mesh in indexed form: unique vertices, per vertex normals and a face index array.
+
+    The expanded per face arrays (face_vertices, face_normal_vectors) used for flat shading are built lazily on
+    first access.
+    """
+
     def __init__(self, hasWireframe=False):
         self.has_wireframe = hasWireframe
 
-        # Array (N,3,3) of all the faces of the mesh. Where N is the number of triangles which is defined by 3 vectors in R3
-        self.face_vertices = None
+        # Array (V,3) of the unique vertices
+        self.vertices = None
+
+        # Array (V,3) of the smoothed normal vector per vertex
+        self.vertex_normals = None
 
-        # Array (N,3,3) of the face normal vectors, Same size as face vertices.
-        # self.face_normal_vectors = None
-        self._vertix_normalized_face_normal_vectors = None
-        self._face_normalized_face_normal_vectors = None
+        # Array (N,3) uint32 of vertex indices, one row per triangle
+        self.faces = None
+
+        # Array (N,3) of the normal vector per face
+        self.face_normals = None
 
         # self.debug_face_normals_vertices = None
         # self.debug_face_normals_edges = None
@@ -431,160 +668,242 @@ class Mesh(object):
 
         self.smooth = False
 
-        # Wireframe array and adge mapping
-        self.wireframe_vertices = None
+        # Adge mapping of the wireframe
         self.wireframe_edges = None
 
+        self.__face_vertices = None
+        self.__flat_normals = None
+        self.__smooth_normals = None
+
+    @property
+    def wireframe_vertices(self):
+        """ Vertices referenced by face_edges and wireframe_edges. """
+        return self.vertices
+
+    @property
+    def face_vertices(self):
+        """ Array (N,3,3) of all the faces of the mesh. Where N is the number of triangles which is defined by 3
+        vectors in R3. Expanded from the indexed form on first access.
+        """
+        if self.__face_vertices is None:
+            self.__face_vertices = self.vertices[self.faces]
+        return self.__face_vertices
+
     @property
     def face_normal_vectors(self):
+        """ Array (N,3,3) of the normal vectors per face corner, same size as face vertices. """
         if self.smooth:
-            return self._vertix_normalized_face_normal_vectors
+            if self.__smooth_normals is None:
+                self.__smooth_normals = self.vertex_normals[self.faces]
+            return self.__smooth_normals
         else:
-            return self._face_normalized_face_normal_vectors
+            if self.__flat_normals is None:
+                self.__flat_normals = np.repeat(self.face_normals[:, np.newaxis, :], 3, axis=1)
+            return self.__flat_normals
+
+    def releaseExpanded(self):
+        """ Drops the cached expanded arrays. """
+        self.__face_vertices = None
+        self.__flat_normals = None
+        self.__smooth_normals = None
+
+    #: Number of generated meshes kept in the cache of the procedural generators
+    CACHE_SIZE = 64
+
+    _cache = OrderedDict()
 
     @staticmethod
-    def sphere(stacks=8, sectors=8, radius=1):
+    def _cached(key, build):
+        """ Returns a mesh for the generator key, built only on a cache miss. The arrays of cached meshes are
+        read-only and shared, every call returns a new Mesh object so per item settings (e.g. smooth) stay separate.
 
-        vertices = np.zeros(shape=((stacks - 1) * sectors + 2, 3), dtype=np.float)
+        :param key: hashable generator parameters
+        :param build: function building the mesh
+        :return: Mesh
+        """
+        md = Mesh._cache.get(key)
+        if md is None:
+            md = build()
+            for a in [md.vertices, md.vertex_normals, md.faces, md.face_normals, md.face_edges]:
+                a.setflags(write=False)
+
+            Mesh._cache[key] = md
+            while len(Mesh._cache) > Mesh.CACHE_SIZE:
+                Mesh._cache.popitem(last=False)
+        else:
+            Mesh._cache.move_to_end(key)
 
-        sh = np.pi / (1.0 * stacks)
-        thetas = np.linspace(
-            0 + sh, np.pi - sh, stacks - 1, endpoint=True, dtype=np.float
-        )
-        phis = np.linspace(0, 2 * np.pi, sectors, endpoint=False, dtype=np.float)
+        return md.shallowCopy()
 
-        for k, theta in enumerate(thetas):
-            z = radius * np.cos(theta)
-            xy = radius * np.sin(theta)
+    @staticmethod
+    def clearCache():
+        Mesh._cache.clear()
+
+    def shallowCopy(self):
+        """ New mesh sharing the arrays of this one. """
+        md = Mesh(self.has_wireframe)
+        md.vertices = self.vertices
+        md.vertex_normals = self.vertex_normals
+        md.faces = self.faces
+        md.face_normals = self.face_normals
+        md.face_edges = self.face_edges
+        md.wireframe_edges = self.wireframe_edges
+        md.smooth = self.smooth
+        return md
 
-            for j, phi in enumerate(phis):
-                x = xy * np.sin(phi)
-                y = xy * np.cos(phi)
+    @staticmethod
+    def sphere(stacks=8, sectors=8, radius=1):
+        """ Return a mesh for a UV sphere centered at the point of origin.
 
-                vertices[k * sectors + j] = [x, y, z]
+        :param stacks: number of latitude bands
+        :param sectors: number of longitude segments
+        :param radius: radius of the sphere
+        """
+        key = ("sphere", stacks, sectors, radius)
+        return Mesh._cached(key, lambda: Mesh._sphere(stacks, sectors, radius))
 
-        vertices[-2] = [0, 0, -1 * radius]
-        vertices[-1] = [0, 0, 1 * radius]
+    @staticmethod
+    def _sphere(stacks, sectors, radius):
+        sh = np.pi / (1.0 * stacks)
+        thetas = np.linspace(0 + sh, np.pi - sh, stacks - 1, endpoint=True)
+        phis = np.linspace(0, 2 * np.pi, sectors, endpoint=False)
+
+        # rings from top to bottom, followed by the bottom and the top pole
+        theta, phi = np.meshgrid(thetas, phis, indexing="ij")
+        xy = radius * np.sin(theta)
+        ring = np.stack(
+            [xy * np.sin(phi), xy * np.cos(phi), radius * np.cos(theta)], axis=-1
+        )
+        vertices = np.concatenate(
+            [ring.reshape(-1, 3), [[0, 0, -1 * radius], [0, 0, 1 * radius]]]
+        )
 
-        faces_top = np.zeros((sectors, 3), np.int)
-        faces_bottom = np.zeros((sectors, 3), np.int)
-        faces1 = np.zeros((sectors * (stacks - 2), 3), np.int)
-        faces2 = np.zeros((sectors * (stacks - 2), 3), np.int)
+        n_vertices = len(vertices)
+        l = np.arange(sectors)
+        l_next = (l + 1) % sectors
+        l_prev = (l - 1) % sectors
 
         # top
-        for k in range(sectors):
-            f0 = len(vertices) - 1
-            f1 = k
-            if k + 1 == sectors:
-                f2 = 0
-            else:
-                f2 = k + 1
-            faces_top[k] = [f0, f2, f1]
+        faces_top = np.stack(
+            [np.full(sectors, n_vertices - 1), l_next, l], axis=1
+        )
 
         # bottom
-        for k in range(sectors):
-            f0 = len(vertices) - 2
-            f1 = (stacks - 2) * sectors + k
-            if k + 1 == sectors:
-                f2 = (stacks - 2) * sectors
-            else:
-                f2 = (stacks - 2) * sectors + k + 1
-            faces_bottom[k] = [f1, f2, f0]
-
-        for k in range(stacks - 2):
-            for l in range(sectors):
-                f0 = k * sectors + l
-                if l + 1 == sectors:
-                    f1 = k * sectors
-                else:
-                    f1 = k * sectors + l + 1
-                f2 = (k + 1) * (sectors) + l
-
-                if l == 0:
-                    f3 = (k + 1) * (sectors) + sectors - 1
-                else:
-                    f3 = (k + 1) * (sectors) + (l - 1)
+        base = (stacks - 2) * sectors
+        faces_bottom = np.stack(
+            [base + l, base + l_next, np.full(sectors, n_vertices - 2)], axis=1
+        )
 
-                faces1[f0] = [f0, f1, f2]
+        # two triangles per quad between neighbouring rings
+        k = np.arange(stacks - 2).reshape(-1, 1) * sectors
+        f0 = (k + l).ravel()
+        f1 = (k + l_next).ravel()
+        f2 = (k + sectors + l).ravel()
+        f3 = (k + sectors + l_prev).ravel()
 
-                faces2[f0] = [f0, f2, f3]
+        faces1 = np.stack([f0, f1, f2], axis=1)
+        faces2 = np.stack([f0, f2, f3], axis=1)
 
         faces = np.concatenate((faces_top, faces_bottom, faces1, faces2), axis=0)
-        tt = Mesh.compute_face_arrays(vertices, faces)
-        return tt
+        return Mesh.compute_face_arrays(vertices, faces)
 
     @staticmethod
     def cone(n_faces=4, radius=1, height=1):
         """ Return a mesh for a cone with the defined number of faces
         """
+        key = ("cone", n_faces, radius, height)
+        return Mesh._cached(key, lambda: Mesh._cone(n_faces, radius, height))
 
-        vertices = np.zeros((n_faces + 2, 3), np.float)
-        for k in range(n_faces):
-            x = np.sin(2 * np.pi * k / n_faces) * radius
-            y = np.cos(2 * np.pi * k / n_faces) * radius
+    @staticmethod
+    def _cone(n_faces, radius, height):
+        angles = 2 * np.pi * np.arange(n_faces) / n_faces
 
-            vertices[k] = [x, y, 0]
+        # circle, tip and center of the base
+        vertices = np.zeros((n_faces + 2, 3))
+        vertices[:n_faces, 0] = np.sin(angles) * radius
+        vertices[:n_faces, 1] = np.cos(angles) * radius
         vertices[n_faces] = [0, 0, height]
 
-        a = np.arange(0, n_faces, 1, dtype=np.uint8)
+        a = np.arange(n_faces)
         b = np.roll(a, 1)
-        t_faces = np.array([a, b, np.ones(n_faces) * n_faces], dtype=np.uint8).T
-
-        b_faces = np.array([b, a, np.ones(n_faces) * (n_faces + 1)], dtype=np.uint8).T
+        t_faces = np.stack([a, b, np.full(n_faces, n_faces)], axis=1)
+        b_faces = np.stack([b, a, np.full(n_faces, n_faces + 1)], axis=1)
 
         faces = np.append(t_faces, b_faces, axis=0)
+        return Mesh.compute_face_arrays(vertices, faces)
+
+    @staticmethod
+    def heightField(z, xs=1.0, ys=1.0):
+        """ Return a surface mesh for a regular grid of heights. Cells with a non finite corner are left out.
+
+        :param z: 2D array of heights, rows along y and columns along x
+        :param xs: spacing of the columns
+        :param ys: spacing of the rows
+        """
+        z = np.asarray(z, dtype=np.float64)
+        rows, cols = z.shape
+
+        y, x = np.meshgrid(np.arange(rows) * ys, np.arange(cols) * xs, indexing="ij")
+        vertices = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
 
-        tt = Mesh.compute_face_arrays(vertices, faces)
-        return tt
+        # lower left corner of every cell
+        i = np.arange(rows * cols).reshape(rows, cols)[:-1, :-1].ravel()
+
+        finite = np.isfinite(z.ravel())
+        valid = finite[i] & finite[i + 1] & finite[i + cols] & finite[i + cols + 1]
+        i = i[valid]
+
+        faces = np.concatenate(
+            [
+                np.stack([i, i + 1, i + cols], axis=1),
+                np.stack([i + 1, i + cols + 1, i + cols], axis=1),
+            ]
+        )
+        vertices[~finite, 2] = 0
+        return Mesh.compute_face_arrays(vertices, faces)
 
     @staticmethod
     def compute_face_arrays(vertices, faces, wireframe_edges=None):
-        # n_faces = faces.shape[0]
-        n_vertices = vertices.shape[0]
+        """ Builds the mesh arrays for the given triangles. Runs in linear time and memory in the number of
+        faces and vertices.
 
-        # compute face vertices
-        v = vertices[faces]
+        :param vertices: Array (V,3) of the vertex positions
+        :param faces: Array (F,3) of vertex indices per triangle
+        :param wireframe_edges: Array (E,2) of vertex indices, optional
+        :return: Mesh
+        """
+        faces = np.asarray(faces, dtype=np.int64)
+        vertices = np.asarray(vertices, dtype=np.float64)
+        n_vertices = vertices.shape[0]
 
         # face normals
-        nv = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+        p0 = vertices[faces[:, 0]]
+        nv = np.cross(vertices[faces[:, 1]] - p0, vertices[faces[:, 2]] - p0)
         nvl = np.linalg.norm(nv, axis=1)
         nv = nv / nvl.reshape(-1, 1)
 
-        # non-smoothed face normals
-        norms = np.zeros((nv.shape[0], 3, 3))
-        norms[:] = nv[:, np.newaxis, :]
+        # smoothed normals, the mean of the normals of all faces attached to a vertex.
+        # A face referencing a vertex more than once only contributes once.
+        incident = np.ones(faces.shape, dtype=bool)
+        incident[:, 1] = faces[:, 1] != faces[:, 0]
+        incident[:, 2] = (faces[:, 2] != faces[:, 0]) & (faces[:, 2] != faces[:, 1])
 
-        # smothed normals,
-        # make vector to compute all normals attached to a vertix
-        vertices_norms_mask = np.zeros(
-            (faces.shape[0], vertices.shape[0]), dtype=np.uint8
-        )
-        for k, f in enumerate(faces):
-            vertices_norms_mask[k, f[0]] = 1
-            vertices_norms_mask[k, f[1]] = 1
-            vertices_norms_mask[k, f[2]] = 1
-
-        vertice_norms = np.zeros(vertices.shape, np.float)
-        for v_idx in range(n_vertices):
-            f_idx, = np.where(vertices_norms_mask[:, v_idx] == 1)
-            if f_idx is None or len(f_idx) == 0:
-                continue
-
-            f_idx_u = np.unique(f_idx)
-            nn = nv[f_idx_u]
-            vertice_norms[v_idx] = np.sum(nn, axis=0) / len(f_idx_u)
+        v_idx = faces[incident]
+        f_idx = np.nonzero(incident)[0]
 
-        norms2 = vertice_norms[faces]
+        vertice_norms = np.zeros(vertices.shape, np.float64)
+        np.add.at(vertice_norms, v_idx, nv[f_idx])
+        counts = np.bincount(v_idx, minlength=n_vertices)
+        attached = counts > 0
+        vertice_norms[attached] /= counts[attached].reshape(-1, 1)
 
-        # computation for mesh grid vizu
-        face_edges = np.zeros((faces.shape[0] * 3, 2), np.int)
-        for k, f in enumerate(faces):
-            a = np.sort(f)
-            face_edges[k] = [a[0], a[1]]
-            face_edges[faces.shape[0] + k] = [a[1], a[2]]
-            face_edges[faces.shape[0] * 2 + k] = [a[0], a[2]]
+        # computation for mesh grid vizu, unique edges as sorted vertex pairs
+        a = np.sort(faces, axis=1)
+        face_edges = np.concatenate([a[:, [0, 1]], a[:, [1, 2]], a[:, [0, 2]]])
 
-        face_edges = np.unique(face_edges, axis=0)
+        # unique on a scalar key per edge is much cheaper than np.unique(axis=0)
+        keys = np.unique(face_edges[:, 0] * max(n_vertices, 1) + face_edges[:, 1])
+        face_edges = np.stack([keys // max(n_vertices, 1), keys % max(n_vertices, 1)], axis=1)
 
         md = Mesh()
 
@@ -592,10 +911,10 @@ class Mesh(object):
             md.wireframe_edges = wireframe_edges
             md.has_wireframe = True
 
-        md.wireframe_vertices = vertices
-        md.face_vertices = v
-        md._face_normalized_face_normal_vectors = norms
-        md._vertix_normalized_face_normal_vectors = norms2
+        md.vertices = vertices
+        md.vertex_normals = vertice_norms
+        md.faces = faces.astype(np.uint32)
+        md.face_normals = nv
         md.face_edges = face_edges
         return md
 
@@ -691,37 +1010,139 @@ class MeshItem(GLGraphicsItem):
         else:
             self.setGLOptions(self.shader_program.glOptions)
 
+        if self.__antialiasing:
+            self.updateGLOptions(
+                {
+                    GL_LINE_SMOOTH: True,
+                    GL_BLEND: True,
+                    "glBlendFunc": (GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA),
+                    "glLineWidth": (1.5,),
+                }
+            )
+
+        # GPU resident copies of the mesh, see _updateBuffers
+        self._vertex_buffer = VertexBuffer()
+        self._normal_buffer = VertexBuffer()
+        self._index_buffer = VertexBuffer(target=GL_ELEMENT_ARRAY_BUFFER)
+        self._wireframe_vertex_buffer = VertexBuffer()
+        self._face_edge_buffer = VertexBuffer(target=GL_ELEMENT_ARRAY_BUFFER)
+        self._wireframe_edge_buffer = VertexBuffer(target=GL_ELEMENT_ARRAY_BUFFER)
+        self.__uploaded = None
+
+        self.__mesh = None
         self.mesh = meshData
         self.mesh.smooth = smooth
 
+    @property
+    def mesh(self):
+        return self.__mesh
+
+    @mesh.setter
+    def mesh(self, value):
+        self.__mesh = value
+        self.__uploaded = None
+        self.update()
+
+    def setMeshData(self, meshData):
+        """ Replaces the displayed mesh, its arrays are uploaded on the next paint.
+
+        :param meshData: Mesh
+        """
+        self.mesh = meshData
+
+    def meshChanged(self):
+        """ Marks the arrays of the current mesh as modified so they are uploaded again on the next paint. """
+        self.__uploaded = None
+        self.update()
+
+    @property
+    def indexed(self):
+        """ True if the faces are drawn from the shared vertices with an element buffer. Flat shading needs a
+        normal per face corner and therefore draws the expanded arrays of the mesh.
+        """
+        return self.mesh.smooth
+
+    def _updateBuffers(self):
+        """ Refreshes the buffer data if the mesh or its shading changed since the last upload. """
+        key = (id(self.mesh), self.mesh.smooth)
+        if self.__uploaded == key:
+            return
+
+        m = self.mesh
+        if self.indexed:
+            self._vertex_buffer.setData(m.vertices)
+            self._normal_buffer.setData(m.vertex_normals)
+            self._index_buffer.setData(m.faces.ravel())
+        else:
+            self._vertex_buffer.setData(m.face_vertices.reshape(-1, 3))
+            self._normal_buffer.setData(m.face_normal_vectors.reshape(-1, 3))
+            self._wireframe_vertex_buffer.setData(m.wireframe_vertices)
+        self._face_edge_buffer.setData(m.face_edges.ravel())
+        if m.wireframe_edges is not None:
+            self._wireframe_edge_buffer.setData(m.wireframe_edges.ravel())
+
+        self.__uploaded = key
+
+    def shaderProgram(self):
+        return self.shader_program if self.draw_faces else None
+
     def initializeGL(self):
         _log.debug("InitializeGL")
-        # self.mesh = Mesh.cone() # cube()
+        self._updateBuffers()
+        self._vertex_buffer.upload()
+        self._normal_buffer.upload()
+        self._vertex_buffer.unbind()
+
+    def releaseGL(self):
+        for b in [
+            self._vertex_buffer,
+            self._normal_buffer,
+            self._index_buffer,
+            self._wireframe_vertex_buffer,
+            self._face_edge_buffer,
+            self._wireframe_edge_buffer,
+        ]:
+            b.release()
+
+    def _drawEdges(self, edge_buffer):
+        """ Draws the indexed lines of edge_buffer over the wireframe vertices. """
+        vertex_buffer = self._vertex_buffer if self.indexed else self._wireframe_vertex_buffer
+
+        self._useFixedFunction()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        with vertex_buffer:
+            glVertexPointer(3, GL_FLOAT, 0, None)
+
+        with edge_buffer:
+            glDrawElements(GL_LINES, edge_buffer.count, GL_UNSIGNED_INT, None)
+
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
 
     def paint(self):
         self._applyGLOptions()
 
-        if self.__antialiasing:
-            glEnable(GL_LINE_SMOOTH)
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-            glHint(GL_LINE_SMOOTH_HINT, GL_NICEST)
-            glLineWidth(1.5)
+        self._updateBuffers()
 
         if self.draw_faces:
             # need face
             with self.shader_program:
                 glEnableClientState(GL_VERTEX_ARRAY)
-
-                glVertexPointerf(self.mesh.face_vertices)
+                with self._vertex_buffer:
+                    glVertexPointer(3, GL_FLOAT, 0, None)
                 glColor4f(*self.face_color)
 
                 glEnableClientState(GL_NORMAL_ARRAY)
-                glNormalPointerf(self.mesh.face_normal_vectors)
-
-                glDrawArrays(
-                    GL_TRIANGLES, 0, np.product(self.mesh.face_vertices.shape[:-1])
-                )
+                with self._normal_buffer:
+                    glNormalPointer(GL_FLOAT, 0, None)
+
+                if self.indexed:
+                    with self._index_buffer:
+                        glDrawElements(
+                            GL_TRIANGLES, self._index_buffer.count, GL_UNSIGNED_INT, None
+                        )
+                else:
+                    glDrawArrays(GL_TRIANGLES, 0, self._vertex_buffer.count)
 
                 glDisableClientState(GL_NORMAL_ARRAY)
                 glDisableClientState(GL_VERTEX_ARRAY)
@@ -729,6 +1150,7 @@ class MeshItem(GLGraphicsItem):
 
         if self.debug_face_normals:
             # Visualize the face normal vectors
+            self._useFixedFunction()
             glEnableClientState(GL_VERTEX_ARRAY)
 
             N = self.mesh.face_vertices.shape[0] * 3
@@ -749,23 +1171,497 @@ class MeshItem(GLGraphicsItem):
 
         if self.debug_face_edges:
             # visualize all face edges
-            glEnableClientState(GL_VERTEX_ARRAY)
-            glVertexPointerf(self.mesh.wireframe_vertices)
-
             glColor4f(1.0, 1.0, 0.0, 1.0)
-            edges = self.mesh.face_edges.flatten()
-            glDrawElements(GL_LINES, edges.shape[0], GL_UNSIGNED_INT, edges)
-
-            glDisableClientState(GL_VERTEX_ARRAY)
-            glDisableClientState(GL_COLOR_ARRAY)
+            self._drawEdges(self._face_edge_buffer)
 
         if self.draw_wireframe and self.mesh.has_wireframe:
             # draw a mesh wireframe which may or may not be identical to the face edges, depending on the mesh
-            glEnableClientState(GL_VERTEX_ARRAY)
-            glVertexPointerf(self.mesh.wireframe_vertices)
             glColor4f(0, 1, 0, 1)
-            edges = self.mesh.wireframe_edges.flatten()
-            glDrawElements(GL_LINES, edges.shape[0], GL_UNSIGNED_INT, edges)
+            self._drawEdges(self._wireframe_edge_buffer)
+
+
+class InstancedMeshItem(MeshItem):
+    """ Draws one mesh many times, e.g. markers of tracked objects, with a transform and a color per instance.
+
+    All instances are rendered with a single instanced draw call. Without instancing support (GL < 3.3) the
+    instances are transformed on the CPU and drawn as one batch.
+
+    The per instance arrays are owned by the item. For animations modify them in place and call instancesChanged,
+    same-sized updates reuse the allocated buffers.
+
+    :param meshData: Mesh of a single instance
+    :param transforms: Array (N,4,4) of model matrices, translation in the last column
+    :param colors: Array (N,4) of RGBA colors, defaults to faceColor
+    """
+
+    def __init__(
+        self,
+        meshData,
+        transforms=None,
+        colors=None,
+        parentItem=None,
+        faceColor=(0.6, 0.6, 0.6, 1.0),
+        smooth=True,
+        glOptions=None,
+    ):
+        super(InstancedMeshItem, self).__init__(
+            meshData,
+            parentItem=parentItem,
+            shader="instanced",
+            faceColor=faceColor,
+            smooth=smooth,
+            glOptions=glOptions,
+        )
+
+        # shader of the batched fallback
+        self.shader_registry.add("shaded")
+        self.batch_shader_program = self.shader_registry["shaded"]
+
+        #: Set to True to always use the batched fallback
+        self.force_batched = False
+        self.__instanced = None
+
+        self._transform_buffer = VertexBuffer(usage=GL_DYNAMIC_DRAW)
+        self._color_buffer = VertexBuffer(usage=GL_DYNAMIC_DRAW)
+
+        self._batch_vertex_buffer = VertexBuffer(usage=GL_DYNAMIC_DRAW)
+        self._batch_normal_buffer = VertexBuffer(usage=GL_DYNAMIC_DRAW)
+        self._batch_color_buffer = VertexBuffer(usage=GL_DYNAMIC_DRAW)
+        self._batch_index_buffer = VertexBuffer(target=GL_ELEMENT_ARRAY_BUFFER)
+
+        self.__version = 0
+        self.__uploadedVersion = None
+        self.__batchKey = None
+
+        self.__transforms = np.zeros((0, 4, 4), np.float32)
+        self.__colors = np.zeros((0, 4), np.float32)
+        if transforms is not None:
+            self.setInstances(transforms, colors)
+
+    @property
+    def instanceCount(self):
+        return self.__transforms.shape[0]
+
+    @property
+    def transforms(self):
+        """ Array (N,4,4) float32 of the model matrices, may be modified in place. """
+        return self.__transforms
+
+    @property
+    def colors(self):
+        """ Array (N,4) float32 of the instance colors, may be modified in place. """
+        return self.__colors
+
+    @property
+    def instanced(self):
+        """ True if the instances are drawn with hardware instancing, None until the first paint. """
+        return self.__instanced
+
+    def setInstances(self, transforms, colors=None):
+        """ Replaces all instances.
+
+        :param transforms: Array (N,4,4) of model matrices
+        :param colors: Array (N,4) of RGBA colors or None to use the face color
+        """
+        self.__transforms = np.array(transforms, dtype=np.float32).reshape(-1, 4, 4)
+
+        n = self.__transforms.shape[0]
+        if colors is None:
+            self.__colors = np.tile(np.asarray(self.face_color, np.float32), (n, 1))
+        else:
+            self.__colors = np.array(colors, dtype=np.float32).reshape(n, 4)
+
+        self.instancesChanged()
+
+    def setPositions(self, positions):
+        """ Moves the instances in place by setting the translation of their transforms.
+
+        :param positions: Array (N,3)
+        """
+        self.__transforms[:, :3, 3] = positions
+        self.instancesChanged()
+
+    def instancesChanged(self):
+        """ Marks the per instance arrays as modified, they are uploaded again on the next paint. """
+        self.__version += 1
+        self.update()
+
+    def shaderProgram(self):
+        if self.__instanced is False or self.force_batched:
+            return self.batch_shader_program
+        return self.shader_program
+
+    def supportsInstancing(self):
+        """ Checks the current GL context and the instancing shader. """
+        if self.shader_program.program == 0:
+            return False
+        if not (bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)):
+            return False
+        return (
+            self.shader_program.attribute("instance_transform") >= 0
+            and self.shader_program.attribute("instance_color") >= 0
+        )
+
+    def releaseGL(self):
+        super(InstancedMeshItem, self).releaseGL()
+        for b in [
+            self._transform_buffer,
+            self._color_buffer,
+            self._batch_vertex_buffer,
+            self._batch_normal_buffer,
+            self._batch_color_buffer,
+            self._batch_index_buffer,
+        ]:
+            b.release()
+        self.__uploadedVersion = None
+        self.__batchKey = None
+
+    def paint(self):
+        self._applyGLOptions()
+
+        if self.instanceCount == 0:
+            return
+
+        if self.__instanced is None:
+            self.__instanced = self.supportsInstancing()
+
+        if self.__instanced and not self.force_batched:
+            self._paintInstanced()
+        else:
+            self._paintBatched()
+
+    def _paintInstanced(self):
+        self._updateBuffers()
+
+        if self.__uploadedVersion != self.__version:
+            # GL expects the matrices column-major
+            self._transform_buffer.setData(self.__transforms.transpose(0, 2, 1))
+            self._color_buffer.setData(self.__colors)
+            self.__uploadedVersion = self.__version
+
+        n = self.instanceCount
+        with self.shader_program:
+            glEnableClientState(GL_VERTEX_ARRAY)
+            with self._vertex_buffer:
+                glVertexPointer(3, GL_FLOAT, 0, None)
+
+            glEnableClientState(GL_NORMAL_ARRAY)
+            with self._normal_buffer:
+                glNormalPointer(GL_FLOAT, 0, None)
+
+            # a mat4 attribute occupies four consecutive vec4 locations
+            transform_loc = self.shader_program.attribute("instance_transform")
+            color_loc = self.shader_program.attribute("instance_color")
+            locations = [transform_loc + k for k in range(4)] + [color_loc]
+
+            with self._transform_buffer:
+                for k in range(4):
+                    glEnableVertexAttribArray(transform_loc + k)
+                    glVertexAttribPointer(
+                        transform_loc + k, 4, GL_FLOAT, False, 64, ctypes.c_void_p(16 * k)
+                    )
+
+            with self._color_buffer:
+                glEnableVertexAttribArray(color_loc)
+                glVertexAttribPointer(color_loc, 4, GL_FLOAT, False, 0, None)
+
+            for loc in locations:
+                glVertexAttribDivisor(loc, 1)
+
+            try:
+                if self.indexed:
+                    with self._index_buffer:
+                        glDrawElementsInstanced(
+                            GL_TRIANGLES, self._index_buffer.count, GL_UNSIGNED_INT, None, n
+                        )
+                else:
+                    glDrawArraysInstanced(GL_TRIANGLES, 0, self._vertex_buffer.count, n)
+            finally:
+                for loc in locations:
+                    glVertexAttribDivisor(loc, 0)
+                    glDisableVertexAttribArray(loc)
+
+                glDisableClientState(GL_NORMAL_ARRAY)
+                glDisableClientState(GL_VERTEX_ARRAY)
+
+    def _updateBatch(self):
+        """ Transforms the mesh for every instance on the CPU into one vertex array. """
+        key = (id(self.mesh), self.mesh.smooth, self.__version)
+        if self.__batchKey == key:
+            return
+
+        m = self.mesh
+        if self.indexed:
+            vertices, normals, indices = m.vertices, m.vertex_normals, m.faces.ravel()
+        else:
+            vertices = m.face_vertices.reshape(-1, 3)
+            normals = m.face_normal_vectors.reshape(-1, 3)
+            indices = np.arange(vertices.shape[0])
 
+        n, nv = self.instanceCount, vertices.shape[0]
+        rotation = self.__transforms[:, :3, :3]
+
+        p = np.einsum("nij,vj->nvi", rotation, vertices) + self.__transforms[:, np.newaxis, :3, 3]
+        nn = np.einsum("nij,vj->nvi", rotation, normals)
+        colors = np.repeat(self.__colors[:, np.newaxis, :], nv, axis=1)
+        offsets = (np.arange(n, dtype=np.uint32) * nv).reshape(-1, 1)
+
+        self._batch_vertex_buffer.setData(p.reshape(-1, 3))
+        self._batch_normal_buffer.setData(nn.reshape(-1, 3))
+        self._batch_color_buffer.setData(colors.reshape(-1, 4))
+        self._batch_index_buffer.setData((indices.reshape(1, -1) + offsets).ravel())
+        self.__batchKey = key
+
+    def _paintBatched(self):
+        self._updateBatch()
+
+        with self.batch_shader_program:
+            glEnableClientState(GL_VERTEX_ARRAY)
+            with self._batch_vertex_buffer:
+                glVertexPointer(3, GL_FLOAT, 0, None)
+
+            glEnableClientState(GL_NORMAL_ARRAY)
+            with self._batch_normal_buffer:
+                glNormalPointer(GL_FLOAT, 0, None)
+
+            glEnableClientState(GL_COLOR_ARRAY)
+            with self._batch_color_buffer:
+                glColorPointer(4, GL_FLOAT, 0, None)
+
+            with self._batch_index_buffer:
+                glDrawElements(
+                    GL_TRIANGLES, self._batch_index_buffer.count, GL_UNSIGNED_INT, None
+                )
+
+            glDisableClientState(GL_COLOR_ARRAY)
+            glDisableClientState(GL_NORMAL_ARRAY)
             glDisableClientState(GL_VERTEX_ARRAY)
+
+
+class PointCloudItem(GLGraphicsItem):
+    """ Displays large point clouds, e.g. lidar frames, from GPU buffers.
+
+    Points are colored by their intensity through the LUT of a :class:`qplotutils.chart.color.Colormap`, which is
+    looked up on the GPU. Without intensities all points are drawn in the uniform color.
+
+    setData only stores the newest frame, it is uploaded on the next paint. Frames replaced before that are never
+    uploaded. Frames are written alternately into two buffer sets, so the buffers of the displayed frame are not
+    respecified while the driver may still read them.
+
+    :param points: Array (N,3) of positions, optional
+    :param intensities: Array (N,) of intensities, optional
+    :param colormap: Colormap of the intensities, defaults to Colormap()
+    :param intensityRange: (min, max) mapped to the colormap, defaults to the range of every frame
+    :param pointSize: size of the points in pixel
+    :param color: RGBA color of points without intensity
+    """
+
+    def __init__(
+        self,
+        points=None,
+        intensities=None,
+        colormap=None,
+        intensityRange=None,
+        pointSize=2.0,
+        color=(1.0, 1.0, 1.0, 1.0),
+        parentItem=None,
+        glOptions=DefaultGlOptions.OPAQUE,
+    ):
+        super(PointCloudItem, self).__init__(parentItem=parentItem)
+        self.setGLOptions(glOptions)
+
+        self.colormap = Colormap() if colormap is None else colormap
+        self.intensity_range = intensityRange
+        self.point_size = pointSize
+        self.color = color
+
+        self.shader_registry = ShaderRegistry()
+        self.shader_registry.add("pointcloud")
+        self.shader_program = self.shader_registry["pointcloud"]
+
+        # front (displayed) and back buffer sets
+        self._buffers = [self.__bufferSet(), self.__bufferSet()]
+        self.__front = 0
+        self.__lut_texture = 0
+
+        self.__pending = None
+
+        #: Number of frames uploaded, for profiling
+        self.frames = 0
+
+        if points is not None:
+            self.setData(points, intensities)
+
+    @staticmethod
+    def __bufferSet():
+        return {
+            "points": VertexBuffer(usage=GL_STREAM_DRAW),
+            "intensities": VertexBuffer(usage=GL_STREAM_DRAW),
+            "colors": VertexBuffer(usage=GL_STREAM_DRAW),
+            "count": 0,
+            "range": None,
+            "colored": False,
+        }
+
+    @property
+    def pointCount(self):
+        """ Number of points of the displayed frame. """
+        return self._buffers[self.__front]["count"]
+
+    @property
+    def hasPendingFrame(self):
+        return self.__pending is not None
+
+    @property
+    def gpuColormap(self):
+        """ True if the colormap is applied by the shader, otherwise colors are mapped on the CPU. """
+        return self.shader_program.program != 0
+
+    def shaderProgram(self):
+        return self.shader_program if self.gpuColormap else None
+
+    def setData(self, points, intensities=None):
+        """ Replaces the frame. It is uploaded on the next paint or by calling upload.
+
+        :param points: Array (N,3) of positions
+        :param intensities: Array (N,) or None
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        if intensities is not None:
+            intensities = np.asarray(intensities, dtype=np.float32).ravel()
+            if intensities.shape[0] != points.shape[0]:
+                raise ValueError("Expected one intensity per point")
+
+        self.__pending = (points, intensities)
+        self.update()
+
+    def setColormap(self, colormap):
+        self.colormap = colormap
+        if self.__lut_texture != 0:
+            self.__uploadLut()
+        self.update()
+
+    def _intensityRange(self, intensities):
+        if self.intensity_range is not None:
+            return tuple(self.intensity_range)
+        finite = intensities[np.isfinite(intensities)]
+        if finite.size == 0:
+            return 0.0, 1.0
+        return float(finite.min()), float(finite.max())
+
+    def upload(self):
+        """ Uploads the pending frame into the back buffers and swaps them to the front. Requires a current GL
+        context.
+        """
+        if self.__pending is None:
+            return
+
+        points, intensities = self.__pending
+        self.__pending = None
+
+        back = self._buffers[1 - self.__front]
+        back["points"].setData(points)
+        back["points"].upload()
+
+        back["colored"] = intensities is not None
+        if intensities is not None:
+            back["range"] = self._intensityRange(intensities)
+            if self.gpuColormap:
+                # the shader can not handle NaN, map it to the lower bound like the CPU lookup does
+                r = back["range"]
+                back["intensities"].setData(
+                    np.nan_to_num(intensities, nan=r[0], posinf=r[1], neginf=r[0])
+                )
+                back["intensities"].upload()
+            else:
+                back["colors"].setData(self.__mapColors(intensities, back["range"]))
+                back["colors"].upload()
+
+        back["points"].unbind()
+        back["count"] = points.shape[0]
+
+        self.__front = 1 - self.__front
+        self.frames += 1
+
+    def __mapColors(self, intensities, r):
+        """ CPU fallback of the colormap lookup. """
+        lut = self.colormap.lut
+        v = (intensities - r[0]) / max(r[1] - r[0], 1e-12)
+        idx = np.round(np.clip(np.nan_to_num(v), 0, 1) * (len(lut) - 1)).astype(np.intp)
+        return lut[idx]
+
+    def __uploadLut(self):
+        if self.__lut_texture == 0:
+            self.__lut_texture = int(glGenTextures(1))
+
+        lut = np.ascontiguousarray(self.colormap.lut, dtype=np.float32)
+        glBindTexture(GL_TEXTURE_1D, self.__lut_texture)
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_1D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexImage1D(GL_TEXTURE_1D, 0, GL_RGBA32F, lut.shape[0], 0, GL_RGBA, GL_FLOAT, lut)
+        glBindTexture(GL_TEXTURE_1D, 0)
+
+    def initializeGL(self):
+        if self.gpuColormap:
+            self.__uploadLut()
+        self.upload()
+
+    def releaseGL(self):
+        for bs in self._buffers:
+            for k in ["points", "intensities", "colors"]:
+                bs[k].release()
+            bs["count"] = 0
+
+        if self.__lut_texture != 0:
+            glDeleteTextures(1, [self.__lut_texture])
+            self.__lut_texture = 0
+
+    def paint(self):
+        self._applyGLOptions()
+        self.upload()
+
+        front = self._buffers[self.__front]
+        if front["count"] == 0:
+            return
+
+        self._callGL("glPointSize", self.point_size)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        with front["points"]:
+            glVertexPointer(3, GL_FLOAT, 0, None)
+
+        if not front["colored"]:
+            self._useFixedFunction()
+            glColor4f(*self.color)
+            glDrawArrays(GL_POINTS, 0, front["count"])
+
+        elif self.gpuColormap:
+            if self.__lut_texture == 0:
+                self.__uploadLut()
+
+            with self.shader_program:
+                glActiveTexture(GL_TEXTURE0)
+                glBindTexture(GL_TEXTURE_1D, self.__lut_texture)
+                self.shader_program.setUniform("lut", 0)
+                self.shader_program.setUniform("lut_size", len(self.colormap.lut))
+                self.shader_program.setUniform("intensity_range", front["range"])
+
+                loc = self.shader_program.attribute("intensity")
+                glEnableVertexAttribArray(loc)
+                with front["intensities"]:
+                    glVertexAttribPointer(loc, 1, GL_FLOAT, False, 0, None)
+
+                glDrawArrays(GL_POINTS, 0, front["count"])
+
+                glDisableVertexAttribArray(loc)
+                glBindTexture(GL_TEXTURE_1D, 0)
+
+        else:
+            self._useFixedFunction()
+            glEnableClientState(GL_COLOR_ARRAY)
+            with front["colors"]:
+                glColorPointer(4, GL_FLOAT, 0, None)
+            glDrawArrays(GL_POINTS, 0, front["count"])
             glDisableClientState(GL_COLOR_ARRAY)
+
+        glDisableClientState(GL_VERTEX_ARRAY)
@@ -7,16 +7,42 @@ Shader programs and infrastructure for wire frame items
 """
 import logging
 
+import numpy as np
+from OpenGL import GL
 from OpenGL.GL import (
     shaders,
-    glUniform1fv,
     glGetUniformLocation,
+    glGetAttribLocation,
+    glGetProgramiv,
+    glGetActiveUniform,
     GL_VERTEX_SHADER,
     GL_FRAGMENT_SHADER,
+    GL_ACTIVE_UNIFORMS,
+    GL_TRUE,
+    GL_FLOAT,
+    GL_FLOAT_VEC2,
+    GL_FLOAT_VEC3,
+    GL_FLOAT_VEC4,
+    GL_INT,
+    GL_INT_VEC2,
+    GL_INT_VEC3,
+    GL_INT_VEC4,
+    GL_BOOL,
+    GL_BOOL_VEC2,
+    GL_BOOL_VEC3,
+    GL_BOOL_VEC4,
+    GL_FLOAT_MAT2,
+    GL_FLOAT_MAT3,
+    GL_FLOAT_MAT4,
+    GL_SAMPLER_1D,
+    GL_SAMPLER_2D,
+    GL_SAMPLER_3D,
+    GL_SAMPLER_CUBE,
 )
 
 from qplotutils import CONFIG
 from qplotutils.wireframe.base_types import DefaultGlOptions
+from qplotutils.wireframe.state import GLState
 
 _log = logging.getLogger(__name__)
 
@@ -30,7 +56,72 @@ __email__ = "philipp.baust@gmail.com"
 __status__ = "Development"
 
 
+class UniformSetter(object):
+    """ Typed upload of a uniform value, picked from the type reported by the program.
+
+    :param suffix: suffix of the GL upload function, e.g. "3fv" for glUniform3fv
+    :param components: number of values of one element, e.g. 3 for vec3 and 16 for mat4
+    :param dtype: dtype the value is converted to
+    """
+
+    def __init__(self, suffix, components, dtype):
+        self.components = components
+        self.dtype = np.dtype(dtype)
+        self.matrix = suffix.startswith("Matrix")
+        self.__uniform = getattr(GL, "glUniform" + suffix)
+        self.__programUniform = getattr(GL, "glProgramUniform" + suffix)
+
+    def upload(self, location, data, program=None):
+        """ Uploads the flat data to the bound program, or with glProgramUniform to the given program.
+
+        Matrices are expected row-major, like numpy arrays, and transposed by GL.
+
+        :param location: uniform location
+        :param data: flat array of dtype
+        :param program: upload to this program without binding it, optional
+        """
+        count = max(1, data.size // self.components)
+        args = (location, count, GL_TRUE, data) if self.matrix else (location, count, data)
+        if program is None:
+            self.__uniform(*args)
+        else:
+            self.__programUniform(program, *args)
+
+
+_FLOAT, _INT = np.float32, np.int32
+
+#: Upload functions by the GL type of the uniform
+UNIFORM_SETTERS = {
+    GL_FLOAT: UniformSetter("1fv", 1, _FLOAT),
+    GL_FLOAT_VEC2: UniformSetter("2fv", 2, _FLOAT),
+    GL_FLOAT_VEC3: UniformSetter("3fv", 3, _FLOAT),
+    GL_FLOAT_VEC4: UniformSetter("4fv", 4, _FLOAT),
+    GL_INT: UniformSetter("1iv", 1, _INT),
+    GL_INT_VEC2: UniformSetter("2iv", 2, _INT),
+    GL_INT_VEC3: UniformSetter("3iv", 3, _INT),
+    GL_INT_VEC4: UniformSetter("4iv", 4, _INT),
+    GL_BOOL: UniformSetter("1iv", 1, _INT),
+    GL_BOOL_VEC2: UniformSetter("2iv", 2, _INT),
+    GL_BOOL_VEC3: UniformSetter("3iv", 3, _INT),
+    GL_BOOL_VEC4: UniformSetter("4iv", 4, _INT),
+    GL_FLOAT_MAT2: UniformSetter("Matrix2fv", 4, _FLOAT),
+    GL_FLOAT_MAT3: UniformSetter("Matrix3fv", 9, _FLOAT),
+    GL_FLOAT_MAT4: UniformSetter("Matrix4fv", 16, _FLOAT),
+    GL_SAMPLER_1D: UniformSetter("1iv", 1, _INT),
+    GL_SAMPLER_2D: UniformSetter("1iv", 1, _INT),
+    GL_SAMPLER_3D: UniformSetter("1iv", 1, _INT),
+    GL_SAMPLER_CUBE: UniformSetter("1iv", 1, _INT),
+}
+
+
 class ShaderProgram(object):
+    """ Vertex and fragment shader compiled into a program.
+
+    The locations and types of the uniforms are resolved once after compile. Uniform values in uniformData are
+    uploaded when the program is bound, values that did not change since their last upload are skipped. Use
+    setUniform to change a value between frames.
+    """
+
     def __init__(
         self,
         name=None,
@@ -46,6 +137,16 @@ class ShaderProgram(object):
         self.uniformData = {}
         self.__glOptions = glOptions
 
+        # name -> (location, UniformSetter), None until resolved after compile
+        self._uniforms = None
+        # name -> last uploaded data
+        self._uploaded = {}
+        self.__bound = False
+
+        #: Number of uploaded and of skipped, unchanged uniform values, for profiling
+        self.uploads = 0
+        self.skipped = 0
+
         ## parse extra options from the shader definition
         if uniforms is not None:
             for k, v in uniforms.items():
@@ -66,11 +167,37 @@ class ShaderProgram(object):
                 )
                 self._program = shaders.compileProgram(vertex_shader, fragment_shader)
         except Exception as ex:
-            _log.error("Failed to compile vertex/fragment shader.", ex)
+            _log.error("Failed to compile vertex/fragment shader: {}".format(ex))
             self._program = 0
 
             if CONFIG.debug:
                 raise
+        finally:
+            self._resolveUniforms()
+
+    def _resolveUniforms(self):
+        """ Queries the locations and types of the active uniforms of the program. """
+        self._uploaded.clear()
+        if self._program == 0:
+            self._uniforms = None
+            return
+
+        self._uniforms = {}
+        for index in range(glGetProgramiv(self._program, GL_ACTIVE_UNIFORMS)):
+            name, size, type_ = glGetActiveUniform(self._program, index)
+            name = name.decode("utf_8")
+            if name.startswith("gl_"):
+                continue
+
+            # arrays are reported by their first element
+            if name.endswith("[0]"):
+                name = name[:-3]
+
+            setter = UNIFORM_SETTERS.get(type_)
+            if setter is None:
+                _log.debug("Uniform {} has unsupported type {}".format(name, type_))
+
+            self._uniforms[name] = (glGetUniformLocation(self._program, name.encode("utf_8")), setter)
 
     @property
     def name(self):
@@ -81,29 +208,93 @@ class ShaderProgram(object):
         return self._program
 
     def __enter__(self):
-        shaders.glUseProgram(self.program)  # lgtm [py/call/wrong-arguments]
+        # while a view draws, the program is bound through its state and stays bound for the next item
+        state = GLState.active
+        if state is not None:
+            state.useProgram(self.program)
+        else:
+            shaders.glUseProgram(self.program)  # lgtm [py/call/wrong-arguments]
 
         try:
-            ## load uniform values into program
-            for uniformName, data in self.uniformData.items():
-                loc = self.uniform(uniformName)
-                if loc == -1:
-                    raise Exception(
-                        'Could not find uniform variable "%s"' % uniformName
-                    )
-
-                glUniform1fv(loc, len(data), data)
+            ## load changed uniform values into program
+            if self._program != 0:
+                for uniformName, data in self.uniformData.items():
+                    self._uploadUniform(uniformName, data)
         except:
-            shaders.glUseProgram(0)
+            if state is not None:
+                state.useProgram(0)
+            else:
+                shaders.glUseProgram(0)
             raise
 
+        self.__bound = True
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        shaders.glUseProgram(0)
+        self.__bound = False
+        if GLState.active is None:
+            shaders.glUseProgram(0)
+
+    def isBound(self):
+        """ True if the program is bound, within the with block or while it stays bound for a view. """
+        if self.__bound:
+            return True
+        state = GLState.active
+        return self._program != 0 and state is not None and state.program == self._program
+
+    def setUniform(self, name, value):
+        """ Sets the value of a uniform.
+
+        The value is uploaded right away: to the bound program, otherwise with glProgramUniform if available
+        (GL 4.1) without binding the program. Else it is uploaded the next time the program is bound.
+        Requires a current GL context.
+
+        :param name: name of the uniform
+        :param value: scalar, sequence or array; matrices row-major
+        """
+        self.uniformData[name] = value
+        if self._program == 0:
+            return
+
+        if self.isBound():
+            self._uploadUniform(name, value)
+        elif bool(GL.glProgramUniform1fv):
+            self._uploadUniform(name, value, self._program)
+
+    def _uploadUniform(self, name, value, program=None):
+        """ Uploads the value if it differs from the last upload.
+
+        :param name: name of the uniform
+        :param value: value
+        :param program: upload without binding, see UniformSetter.upload
+        """
+        try:
+            location, setter = self._uniforms[name]
+        except (KeyError, TypeError):
+            raise Exception('Could not find uniform variable "%s"' % name)
+        if setter is None:
+            raise Exception('Unsupported type of uniform variable "%s"' % name)
+
+        data = np.asarray(value, dtype=setter.dtype).ravel()
+        last = self._uploaded.get(name)
+        if last is not None and np.array_equal(last, data):
+            self.skipped += 1
+            return
+
+        setter.upload(location, data, program)
+        self._uploaded[name] = data.copy()
+        self.uploads += 1
 
     def uniform(self, name):
-        """Return the location integer for a uniform variable in this program"""
+        """Return the location integer for a uniform variable in this program, -1 if not found"""
+        if self._uniforms is not None:
+            entry = self._uniforms.get(name)
+            return -1 if entry is None else entry[0]
         return glGetUniformLocation(self.program, name.encode("utf_8"))
 
+    def attribute(self, name):
+        """Return the location integer for a vertex attribute in this program, -1 if not found"""
+        return glGetAttribLocation(self.program, name.encode("utf_8"))
+
 
 class ShaderRegistry(object):
     """ Global states and settings, shared as a borg object. """
@@ -220,6 +411,59 @@ class ShaderRegistry(object):
             }
             """,
         ),
+        "instanced": ShaderProgram(
+            "instanced",
+            """
+            #version 120
+            // per instance model matrix and color, see InstancedMeshItem
+            attribute mat4 instance_transform;
+            attribute vec4 instance_color;
+            varying vec3 normal;
+            void main() {
+                normal = normalize(gl_NormalMatrix * mat3(instance_transform) * gl_Normal);
+                gl_FrontColor = instance_color;
+                gl_BackColor = instance_color;
+                gl_Position = gl_ModelViewProjectionMatrix * instance_transform * gl_Vertex;
+            }
+            """,
+            """
+            #version 120
+            varying vec3 normal;
+            void main() {
+                vec4 color = gl_Color;
+                float s = pow(normal.x*normal.x + normal.y*normal.y, 2.0);
+                color.x = color.x + s * (1.0-color.x);
+                color.y = color.y + s * (1.0-color.y);
+                color.z = color.z + s * (1.0-color.z);
+                gl_FragColor = color;
+            }
+            """,
+        ),
+        "pointcloud": ShaderProgram(
+            "pointcloud",
+            """
+            #version 120
+            // intensity per point, normalized to the colormap range, see PointCloudItem
+            attribute float intensity;
+            uniform vec2 intensity_range;
+            varying float value;
+            void main() {
+                value = (intensity - intensity_range.x) / max(intensity_range.y - intensity_range.x, 1e-12);
+                gl_FrontColor = gl_Color;
+                gl_Position = ftransform();
+            }
+            """,
+            """
+            #version 120
+            uniform sampler1D lut;
+            uniform float lut_size;
+            varying float value;
+            void main() {
+                // sample the texel centers of the LUT
+                gl_FragColor = texture1D(lut, (clamp(value, 0.0, 1.0) * (lut_size - 1.0) + 0.5) / lut_size);
+            }
+            """,
+        ),
         "directional_lighting": ShaderProgram(
             "directional_lighting",
             """
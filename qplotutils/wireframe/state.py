@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tracking of the GL state for the wireframe view.
+
+Instead of saving and restoring all attributes around every item, the view remembers the state it has set and
+items only issue the state changes that differ from it.
+"""
+import logging
+
+from OpenGL import GL
+from OpenGL.GL import (
+    glEnable,
+    glDisable,
+    GL_LINE_SMOOTH,
+    GL_POLYGON_SMOOTH,
+    GL_DEPTH_TEST,
+    GL_BLEND,
+    GL_ALPHA_TEST,
+    GL_CULL_FACE,
+    glUseProgram,
+)
+
+_log = logging.getLogger(__name__)
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+
+class GLState(object):
+    """ Shadow copy of the GL state set through GL options.
+
+    GL options are dicts as used by GLGraphicsItem.setGLOptions: capabilities (e.g. GL_BLEND) map to True / False,
+    names of GL functions (e.g. "glBlendFunc") map to their argument tuple. Options that an item does not specify
+    fall back to DEFAULTS.
+
+    Only state set through the tracker is known to it: GL options and calls made with call, e.g. by
+    GLGraphicsItem._callGL. State in DEFAULTS does not leak from one item to the next. State changed with direct GL
+    calls is not tracked, call invalidate afterwards.
+
+    The bound shader program is tracked as well. While a view draws, its state is the active one: shader programs
+    then stay bound after use, so items sharing a program do not switch back and forth.
+    """
+
+    #: Names of the counters, see counters
+    COUNTERS = ("capabilities", "calls", "programs", "skipped")
+
+    #: State of the view that is currently drawing, None outside of drawing
+    active = None
+
+    #: State of the capabilities an item does not specify
+    DEFAULTS = {
+        GL_DEPTH_TEST: True,
+        GL_BLEND: False,
+        GL_ALPHA_TEST: False,
+        GL_CULL_FACE: False,
+        GL_LINE_SMOOTH: False,
+        GL_POLYGON_SMOOTH: False,
+        "glLineWidth": (1.0,),
+        "glPointSize": (1.0,),
+    }
+
+    def __init__(self):
+        self._current = {}
+        self._program = None
+        self._previous = None
+
+        #: Number of issued capability changes, GL calls and program switches, and of skipped redundant changes
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def invalidate(self):
+        """ Forgets the shadowed state, e.g. after code outside of the tracker changed it. """
+        self._current.clear()
+        self._program = None
+
+    def resetCounters(self):
+        for k in self.counters:
+            self.counters[k] = 0
+
+    @property
+    def program(self):
+        """ Bound shader program, None if unknown. """
+        return self._program
+
+    def useProgram(self, program):
+        """ Binds the shader program if it is not bound yet.
+
+        :param program: GL program name, 0 for the fixed function pipeline
+        """
+        if self._program == program:
+            self.counters["skipped"] += 1
+            return
+
+        glUseProgram(program)
+        self._program = program
+        self.counters["programs"] += 1
+
+    def apply(self, options):
+        """ Applies the options merged over DEFAULTS, only differences to the current state are issued.
+
+        :param options: GL options dict, None values are ignored
+        """
+        desired = dict(self.DEFAULTS)
+        for k, v in options.items():
+            if v is not None:
+                desired[k] = v
+
+        for k, v in desired.items():
+            if isinstance(k, str):
+                self.call(k, *v)
+            else:
+                self.setCapability(k, v)
+
+    def setCapability(self, cap, enabled):
+        """ Enables or disables the capability if it is not yet in that state.
+
+        :param cap: e.g. GL_BLEND
+        :param enabled: bool
+        """
+        enabled = bool(enabled)
+        if self._current.get(cap) is enabled:
+            self.counters["skipped"] += 1
+            return
+
+        if enabled:
+            glEnable(cap)
+        else:
+            glDisable(cap)
+        self._current[cap] = enabled
+        self.counters["capabilities"] += 1
+
+    def call(self, name, *args):
+        """ Calls the GL function if it was not yet called with the same arguments.
+
+        :param name: name of the function, e.g. "glBlendFunc"
+        :param args: arguments
+        """
+        if self._current.get(name) == args:
+            self.counters["skipped"] += 1
+            return
+
+        getattr(GL, name)(*args)
+        self._current[name] = args
+        self.counters["calls"] += 1
+
+    def __enter__(self):
+        self._previous = GLState.active
+        GLState.active = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        GLState.active = self._previous
+        self._previous = None
+        self.useProgram(0)
+
+    def __repr__(self):
+        return "<GLState entries={}>".format(len(self._current))
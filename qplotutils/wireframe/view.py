@@ -31,12 +31,14 @@ from OpenGL.GL import (
     glClear,
     GL_DEPTH_BUFFER_BIT,
     GL_COLOR_BUFFER_BIT,
-    glPushAttrib,
-    GL_ALL_ATTRIB_BITS,
     glLoadName,
-    glPopAttrib,
     glPushMatrix,
     glPopMatrix,
+    glHint,
+    GL_LINE_SMOOTH_HINT,
+    GL_POLYGON_SMOOTH_HINT,
+    GL_NICEST,
+    GL_BLEND,
 )
 from OpenGL.error import GLError
 from qtpy.QtCore import Signal, Qt, QObject, QTime
@@ -47,6 +49,7 @@ from qtpy.QtOpenGL import QGLWidget
 from qplotutils import CONFIG
 from qplotutils.wireframe.base_types import Vector3d
 from qplotutils.wireframe.cam_control import CamControl
+from qplotutils.wireframe.state import GLState
 
 _log = logging.getLogger(__name__)
 
@@ -120,6 +123,78 @@ class ViewProperties(QObject):
         self.changed.emit()
 
 
+class DrawList(object):
+    """ Flat list of the visible items of a view in drawing order.
+
+    Items are grouped by their GL state to minimize state changes: opaque before blended items, then by shader program
+    and GL options. Within a group children are drawn before their parent. The list is rebuilt lazily after
+    invalidate, which the items trigger on changes of the scene graph, their visibility or GL options.
+
+    :param view: view providing the items
+    """
+
+    def __init__(self, view):
+        self.__view = view
+        self.__items = None
+
+    def invalidate(self):
+        self.__items = None
+
+    @property
+    def items(self):
+        if self.__items is None:
+            self.__items = self.build()
+        return self.__items
+
+    def build(self, item=None):
+        """ Collects the visible items of the subtree of item, or of all root items.
+
+        :param item: GLGraphicsItem or None
+        :return: list of items
+        """
+        if item is None:
+            roots = [x for x in self.__view.items if x.parentItem() is None]
+        else:
+            roots = [item]
+
+        items = []
+
+        def visit(i):
+            if not i.visible():
+                return
+            for c in sorted(i.childItems(), key=lambda c: c._id):
+                visit(c)
+            items.append(i)
+
+        for r in roots:
+            visit(r)
+
+        # stable, keeps the tree order within a group
+        items.sort(key=self.stateKey)
+        return items
+
+    @staticmethod
+    def stateKey(item):
+        """ Sort key grouping items with the same GL state.
+
+        :param item: GLGraphicsItem
+        :return: tuple (blended, shader name, GL options)
+        """
+        opts = item.glOptions()
+        program = item.shaderProgram()
+        return (
+            bool(opts.get(GL_BLEND)),
+            "" if program is None else str(program.name),
+            tuple(sorted((str(k), repr(v)) for k, v in opts.items())),
+        )
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
 class ChartView3d(QGLWidget):
     """ Widget to display openGL items.
     """
@@ -137,6 +212,9 @@ class ChartView3d(QGLWidget):
         self.props = ViewProperties()
         self.items = []
 
+        self.draw_list = DrawList(self)
+        self.glState = GLState()
+
         self.makeCurrent()
 
         self.cam_ctrl = CamControl(self.props, self)
@@ -155,11 +233,20 @@ class ChartView3d(QGLWidget):
             item.initializeGL()
 
         item.view = self
-        self.update()
+        self.sceneChanged()
 
     def removeItem(self, item):
         self.items.remove(item)
+        if hasattr(item, "releaseGL"):
+            self.makeCurrent()
+            item.releaseGL()
+
         item.view = None
+        self.sceneChanged()
+
+    def sceneChanged(self):
+        """ Rebuilds the draw list before the next paint. """
+        self.draw_list.invalidate()
         self.update()
 
     def initializeGL(self):
@@ -169,6 +256,10 @@ class ChartView3d(QGLWidget):
         glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LEQUAL)
 
+        glHint(GL_LINE_SMOOTH_HINT, GL_NICEST)
+        glHint(GL_POLYGON_SMOOTH_HINT, GL_NICEST)
+        self.glState.invalidate()
+
         # lighting
         light_position = [1.0, 1.0, 2.0, 0.0]
         glLight(GL_LIGHT0, GL_POSITION, light_position)
@@ -285,54 +376,43 @@ class ChartView3d(QGLWidget):
         bgcolor = self.props.background_color
         glClearColor(*bgcolor)
         glClear(GL_DEPTH_BUFFER_BIT | GL_COLOR_BUFFER_BIT)
-        self.drawItemTree(useItemNames=useItemNames)
+        with self.glState:
+            self.drawItemTree(useItemNames=useItemNames)
 
         self.frame_count += 1
         fps = self.frame_count / (self.frame_time.elapsed() / 1000.0)
         if CONFIG.debug:
             _log.debug("FPS: {}".format(fps))
+            _log.debug("GL state changes: {}".format(self.glState.counters))
 
     def drawItemTree(self, item=None, useItemNames=False):
-        """
+        """ Draws the visible items from the flat draw list. Each item is drawn with its cached view transform,
+        the GL state is set through the state tracker instead of saving and restoring all attributes.
 
-        :param item:
-        :param useItemNames:
+        :param item: draw only the subtree of this item, optional
+        :param useItemNames: load the item ids as names for selection
         :return:
         """
-        if item is None:
-            items = [x for x in self.items if x.parentItem() is None]
-        else:
-            items = item.childItems()
-            items.append(item)
+        items = self.draw_list if item is None else self.draw_list.build(item)
 
+        glMatrixMode(GL_MODELVIEW)
         for i in items:
-            if not i.visible():
-                continue
-            if i is item:
-                try:
-                    glPushAttrib(GL_ALL_ATTRIB_BITS)
-                    if useItemNames:
-                        glLoadName(i._id)
-                        self._itemNames[i._id] = i
-                    i.paint()
-                except GLError as ex:
-                    _log.info("Error while drawing items: {}".format(ex))
-
-                    if CONFIG.debug:
-                        raise
-                finally:
-                    glPopAttrib()
-            else:
-                glMatrixMode(GL_MODELVIEW)
-                glPushMatrix()
-                try:
-                    tr = i.transform()
-                    a = np.array(tr.copyDataTo()).reshape((4, 4))
-                    glMultMatrixf(a.transpose())
-                    self.drawItemTree(i, useItemNames=useItemNames)
-                finally:
-                    glMatrixMode(GL_MODELVIEW)
-                    glPopMatrix()
+            glPushMatrix()
+            try:
+                glMultMatrixf(i.glMatrix())
+                if useItemNames:
+                    glLoadName(i._id)
+                    self._itemNames[i._id] = i
+                i.paint()
+            except GLError as ex:
+                _log.info("Error while drawing items: {}".format(ex))
+
+                # the state of the failed item is unknown
+                self.glState.invalidate()
+                if CONFIG.debug:
+                    raise
+            finally:
+                glPopMatrix()
 
     def setCameraPosition(self, distance=None, elevation=None, azimuth=None):
         """ Sets the camera parameters.
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+==============================
+Test for qplotutils.chart.link
+==============================
+
+"""
+import unittest
+import logging
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+from qtpy.QtTest import QTest
+from qtpy.QtWidgets import *
+
+from qplotutils.chart.link import *
+from qplotutils.chart.view import ChartView
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+
+
+class RangeLinkTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.views = []
+        for _ in range(3):
+            v = ChartView(orientation=ChartView.CARTESIAN)
+            v.resize(300, 200)
+            v.show()
+            v.setRange(QRectF(0, 0, 10, 10))
+            self.views.append(v)
+
+        self.link = RangeLink()
+
+    def _range(self, k):
+        return self.views[k].centralWidget.area.visibleRange
+
+    def test_propagation_is_deferred(self):
+        self.link.join(self.views[0])
+        self.link.join(self.views[1])
+
+        self.views[0].setRange(QRectF(5, 2, 20, 4))
+        self.assertAlmostEqual(self._range(1).left(), 0)
+
+        self.link.flush()
+        self.assertAlmostEqual(self._range(1).left(), 5)
+        self.assertAlmostEqual(self._range(1).top(), 2)
+        self.assertAlmostEqual(self._range(1).width(), 20)
+
+    def test_last_change_in_frame_is_authoritative(self):
+        self.link.join(self.views[0])
+        self.link.join(self.views[1])
+        self.link.join(self.views[2])
+
+        emitted = []
+        self.link.rangeChanged.connect(emitted.append)
+
+        self.views[0].setRange(QRectF(5, 0, 10, 10))
+        self.views[2].setRange(QRectF(7, 0, 10, 10))
+        self.link.flush()
+
+        self.assertEqual(len(emitted), 1)
+        for k in range(3):
+            self.assertAlmostEqual(self._range(k).left(), 7)
+
+        # applying the range does not echo back
+        self.link.flush()
+        self.assertEqual(len(emitted), 1)
+
+    def test_per_axis(self):
+        self.link.join(self.views[0], RangeLink.XY)
+        self.link.join(self.views[1], RangeLink.X)
+        self.link.join(self.views[2], RangeLink.Y)
+
+        self.views[0].setRange(QRectF(5, 3, 20, 6))
+        self.link.flush()
+
+        self.assertAlmostEqual(self._range(1).left(), 5)
+        self.assertAlmostEqual(self._range(1).top(), 0)
+
+        self.assertAlmostEqual(self._range(2).left(), 0)
+        self.assertAlmostEqual(self._range(2).top(), 3)
+
+        # x and y members do not share an axis
+        self.views[1].setRange(QRectF(-5, 0, 10, 10))
+        self.link.flush()
+        self.assertAlmostEqual(self._range(2).left(), 0)
+        self.assertAlmostEqual(self._range(0).left(), -5)
+
+    def test_leave(self):
+        self.link.join(self.views[0])
+        self.link.join(self.views[1])
+        self.link.leave(self.views[1])
+
+        self.views[0].setRange(QRectF(5, 2, 20, 4))
+        self.link.flush()
+
+        self.assertEqual(len(self.link.views), 1)
+        self.assertAlmostEqual(self._range(1).left(), 0)
+
+    def test_timer(self):
+        self.link.setInterval(0)
+        self.link.join(self.views[0])
+        self.link.join(self.views[1])
+
+        self.views[0].setRange(QRectF(5, 2, 20, 4))
+        QTest.qWait(20)
+
+        self.assertAlmostEqual(self._range(1).left(), 5)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================
+Test for qplotutils.chart.stacked
+=================================
+
+"""
+import unittest
+import logging
+import numpy as np
+
+from qtpy.QtCore import *
+from qtpy.QtGui import *
+from qtpy.QtWidgets import *
+
+from qplotutils import QPlotUtilsException
+from qplotutils.chart.items import LineChartItem
+from qplotutils.chart.stacked import *
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+
+
+class StackedChartViewTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.view = StackedChartView(lanes=3, orientation=ChartView.CARTESIAN)
+        self.view.resize(400, 600)
+        self.view.show()
+
+        x = np.arange(0, 100, 0.5, dtype=np.float64)
+        for lane, amplitude in enumerate([1, 10, 1000]):
+            l = LineChartItem()
+            l.plot(amplitude * np.sin(x), x, "lane {}".format(lane))
+            self.view.addItem(l, lane)
+
+    def _transforms(self):
+        return [
+            self.view.area(k).getRootItem().transform() for k in range(self.view.lanes)
+        ]
+
+    def test_lanes(self):
+        self.assertEqual(self.view.lanes, 3)
+        self.assertEqual(self.view.addLane(), 3)
+        self.assertEqual(self.view.lanes, 4)
+
+    def test_auto_range_shares_abscissa(self):
+        self.view.autoRange()
+
+        t = self._transforms()
+        for other in t[1:]:
+            self.assertAlmostEqual(other.m11(), t[0].m11())
+            self.assertAlmostEqual(other.m31(), t[0].m31())
+
+        # vertical ranges stay independent
+        self.assertNotAlmostEqual(t[0].m22(), t[1].m22())
+        self.assertNotAlmostEqual(t[1].m22(), t[2].m22())
+
+        self.view.grab()
+
+    def test_range_change_of_one_lane_moves_all(self):
+        self.view.autoRange()
+        m22 = [t.m22() for t in self._transforms()]
+
+        self.view.area(1).setRange(QRectF(20, -5, 30, 10))
+
+        t = self._transforms()
+        for other in t:
+            self.assertAlmostEqual(other.m11(), t[1].m11())
+            self.assertAlmostEqual(other.m31(), t[1].m31())
+
+        self.assertAlmostEqual(t[0].m22(), m22[0])
+        self.assertAlmostEqual(t[2].m22(), m22[2])
+
+        # the visible range is derived from the bounding rect, which is 1px smaller than the area
+        r = self.view.area(2).visibleRange
+        self.assertAlmostEqual(r.left(), 20, places=3)
+        self.assertAlmostEqual(r.width(), 30, delta=0.5)
+
+    def test_set_range_of_lane(self):
+        self.view.setRange(QRectF(10, -2, 50, 4), lane=0)
+
+        r = self.view.area(0).visibleRange
+        self.assertAlmostEqual(r.top(), -2, places=3)
+        self.assertAlmostEqual(r.height(), 4, delta=0.1)
+
+        r = self.view.area(1).visibleRange
+        self.assertAlmostEqual(r.left(), 10, places=3)
+        self.assertAlmostEqual(r.width(), 50, delta=0.5)
+
+    def test_vertical_axes_share_width(self):
+        self.view.autoRange()
+        self.view.grab()
+
+        widths = set(a.size().width() for a in self.view.centralWidget.vertical_axes)
+        self.assertEqual(len(widths), 1)
+
+    def test_rotated_horizontal_transform(self):
+        view = ChartView(orientation=QTransform(0, -2, -1, 0, 5, 7))
+        area = view.centralWidget.area
+
+        # x axis to the top, the horizontal screen coordinate depends on y only
+        area.setHorizontalTransform(QTransform(0, -1, -3, 0, 11, 13))
+        t = area.getRootItem().transform()
+        self.assertEqual((t.m11(), t.m21(), t.m31()), (0, -3, 11))
+        self.assertEqual((t.m12(), t.m22(), t.m32()), (-2, 0, 7))
+
+        # mismatching orientations would collapse the area
+        self.assertRaises(
+            QPlotUtilsException, area.setHorizontalTransform, ChartView.CARTESIAN
+        )
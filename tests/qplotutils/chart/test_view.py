@@ -100,6 +100,27 @@ class ChartViewTests(unittest.TestCase):
         """ Autogenerated. """
         obj = ChartView()  # TODO: may fail!
 
+    def test_snapshot(self):
+        view = ChartView()
+        view.resize(400, 300)
+        view.show()
+        view.setRange(QRectF(0, 0, 10, 5))
+
+        state = view.saveSnapshot()
+
+        other = ChartView()
+        other.resize(400, 300)
+        other.show()
+        ranges = []
+        other.centralWidget.area.visibleRangeChange.connect(ranges.append)
+        other.loadSnapshot(state)
+
+        r = other.centralWidget.area.visibleRange
+        self.assertAlmostEqual(r.width(), 10, delta=0.1)
+        self.assertAlmostEqual(r.height(), 5, delta=0.1)
+        # items are told about the restored range
+        self.assertEqual(ranges[-1], r)
+
 
 class ChartWidgetTests(unittest.TestCase):
 
@@ -186,4 +207,228 @@ class VerticalChartLabelTests(unittest.TestCase):
         
     def test_instantiate(self):
         """ Autogenerated. """
-        obj = VerticalChartLabel()  # TODO: may fail!
\ No newline at end of file
+        obj = VerticalChartLabel()  # TODO: may fail!
+
+class AxisRepaintTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.view = ChartView(orientation=ChartView.CARTESIAN)
+        self.view.resize(400, 300)
+        self.view.show()
+        self.view.setRange(QRectF(0, 0, 10, 10))
+
+        self.area = self.view.centralWidget.area
+        self.h_axis = self.view.centralWidget.main_horizontal_axis
+        self.v_axis = self.view.centralWidget.main_vertical_axis
+
+    def _shift(self, dx, dy):
+        t = self.area.getRootItem().transform()
+        n = QTransform(t.m11(), t.m12(), t.m21(), t.m22(), t.m31() + dx, t.m32() + dy)
+        self.area.getRootItem().setTransform(n)
+        self.area.axisChange()
+
+    def test_horizontal_pan_keeps_vertical_picture(self):
+        v_picture = self.v_axis._picture
+        h_picture = self.h_axis._picture
+
+        self._shift(25, 0)
+
+        self.assertIs(self.v_axis._picture, v_picture)
+        self.assertEqual(self.v_axis._pictureOffset, 0)
+
+        self.assertIs(self.h_axis._picture, h_picture)
+        self.assertEqual(self.h_axis._pictureOffset, 25)
+
+        self.view.grab()  # plays the translated picture
+
+    def test_vertical_pan_translates_picture(self):
+        v_picture = self.v_axis._picture
+
+        self._shift(0, -12)
+
+        self.assertIs(self.v_axis._picture, v_picture)
+        self.assertEqual(self.v_axis._pictureOffset, -12)
+
+    def test_pan_beyond_margin_rerecords(self):
+        h_picture = self.h_axis._picture
+
+        self._shift(self.h_axis.size().width() + 1, 0)
+
+        self.assertIsNot(self.h_axis._picture, h_picture)
+        self.assertEqual(self.h_axis._pictureOffset, 0)
+
+    def test_zoom_rerecords(self):
+        h_picture = self.h_axis._picture
+        v_picture = self.v_axis._picture
+
+        self.view.setRange(QRectF(0, 0, 5, 5))
+
+        self.assertIsNot(self.h_axis._picture, h_picture)
+        self.assertIsNot(self.v_axis._picture, v_picture)
+
+
+class ChartGridTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.view = ChartView(orientation=ChartView.CARTESIAN)
+        self.view.resize(400, 300)
+        self.view.show()
+        self.view.setRange(QRectF(0, 0, 10, 10))
+        self.view.grab()
+
+        self.area = self.view.centralWidget.area
+        self.grid = self.view.centralWidget.grid
+
+    def test_pan_reuses_tiles(self):
+        h_tile = self.grid._tiles[Qt.Horizontal]["pixmap"]
+        v_tile = self.grid._tiles[Qt.Vertical]["pixmap"]
+        self.assertIsNotNone(h_tile)
+
+        t = self.area.getRootItem().transform()
+        n = QTransform(t.m11(), t.m12(), t.m21(), t.m22(), t.m31() + 30, t.m32())
+        self.area.getRootItem().setTransform(n)
+        self.area.axisChange()
+        self.view.grab()
+
+        self.assertIs(self.grid._tiles[Qt.Horizontal]["pixmap"], h_tile)
+        self.assertEqual(self.grid._tiles[Qt.Horizontal]["offset"], 30)
+        self.assertIs(self.grid._tiles[Qt.Vertical]["pixmap"], v_tile)
+
+    def test_zoom_renders_tiles(self):
+        h_tile = self.grid._tiles[Qt.Horizontal]["pixmap"]
+
+        self.view.setRange(QRectF(0, 0, 5, 5))
+        self.view.grab()
+
+        self.assertIsNot(self.grid._tiles[Qt.Horizontal]["pixmap"], h_tile)
+
+
+class RangeHistoryTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        from qplotutils.chart.items import LineChartItem
+
+        self.view = ChartView(orientation=ChartView.CARTESIAN)
+        self.view.resize(400, 300)
+
+        x = np.arange(0, 100, 0.5)
+        self.item = LineChartItem()
+        self.item.plot(np.sin(x), x, "a sine")
+        self.view.addItem(self.item)
+
+        self.view.autoRange()
+        self.view.show()
+
+        self.area = self.view.centralWidget.area
+        self.auto = QRectF(self.area.visibleRange)
+
+    def _zoom(self, rect):
+        self.view.setRange(rect)
+        self.area.visibleRangeChange.emit(self.area.visibleRange)
+        self.area.commitRange()
+
+    def test_back_forward(self):
+        self._zoom(QRectF(10, -1, 10, 2))
+        self._zoom(QRectF(20, -1, 10, 2))
+        self.assertEqual(len(self.area.history), 3)
+
+        self.view.back()
+        self.assertEqual(self.area.visibleRange.left(), 10)
+        self.view.back()
+        self.assertEqual(self.area.visibleRange, self.auto)
+        self.view.back()  # nothing left
+        self.assertEqual(self.area.visibleRange, self.auto)
+
+        self.view.forward()
+        self.assertEqual(self.area.visibleRange.left(), 10)
+
+        # a new range drops the forward entries
+        self._zoom(QRectF(50, -1, 10, 2))
+        self.assertFalse(self.area.history.canGoForward())
+        self.assertEqual(len(self.area.history), 3)
+
+    def test_bounded(self):
+        self.area.history.maxlen = 5
+        for k in range(10):
+            self._zoom(QRectF(k, -1, 10, 2))
+        self.assertEqual(len(self.area.history), 5)
+
+    def test_bookmarks(self):
+        self._zoom(QRectF(10, -1, 10, 2))
+        self.view.addBookmark("peak")
+        self._zoom(QRectF(50, -1, 10, 2))
+
+        self.view.gotoBookmark("peak")
+        self.assertEqual(self.area.visibleRange.left(), 10)
+        self.assertEqual(self.area.history.bookmarks, ["peak"])
+
+        with self.assertRaises(QPlotUtilsException):
+            self.view.gotoBookmark("unknown")
+
+    def test_cached_render_state(self):
+        self._zoom(QRectF(10, -1, 10, 2))
+        indices = self.item._visible_indices
+        self._zoom(QRectF(20, -1, 10, 2))
+
+        self.view.back()
+        self.assertIs(self.item._visible_indices, indices)
+
+    def test_replotted_data(self):
+        self.item.showTicks = True
+        self._zoom(QRectF(10, -1, 10, 2))
+        self._zoom(QRectF(20, -1, 10, 2))
+
+        # shorter data, the cached indices of the first range do not fit anymore
+        x = np.arange(0, 15, 0.5)
+        self.item.plot(np.cos(x), x)
+        self.view.back()
+
+        np.testing.assert_array_equal(
+            self.item._visible_indices, np.flatnonzero(x >= 10)
+        )
+        self.assertEqual(len(self.item.markers), len(self.item._visible_indices))
+
+    def test_cached_decimated_path(self):
+        x = np.linspace(0, 100, 20 * self.item.MAX_PATH_POINTS)
+        self.item.plot(np.sin(x), x)
+        self._zoom(QRectF(0, -1, 100, 2))
+        path = self.item._visible_path
+        self.assertIsNotNone(path)
+        self.assertLessEqual(path.elementCount(), self.item.MAX_PATH_POINTS)
+
+        self._zoom(QRectF(20, -1, 10, 2))
+        self.view.back()
+        self.assertIs(self.item._visible_path, path)
+
+    def test_cache_eviction(self):
+        self.area.history.cacheSize = 2
+        self._zoom(QRectF(10, -1, 10, 2))
+        indices = self.item._visible_indices
+        self._zoom(QRectF(20, -1, 10, 2))
+        self._zoom(QRectF(30, -1, 10, 2))
+
+        self.area.history.back()
+        entry = self.area.history.back()
+        self.assertIsNone(entry["states"])
+        self.area._restoreEntry(entry)
+
+        self.assertIsNot(self.item._visible_indices, indices)
+        np.testing.assert_array_equal(self.item._visible_indices, indices)
@@ -13,6 +13,7 @@ import unittest
 import logging
 import sys
 import os
+import tempfile
 import numpy as np
 
 from qtpy.QtCore import *
@@ -231,4 +232,354 @@ class TabHeaderTests(unittest.TestCase):
         
     def test_instantiate(self):
         """ Autogenerated. """
-        obj = TabHeader()  # TODO: may fail!
\ No newline at end of file
+        obj = TabHeader()  # TODO: may fail!
+
+class UpdateSchedulerTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.bench = Bench()
+        self.bench.resize(300, 400)
+        self.bench.show()
+
+        self.dock_01 = Dock()
+        self.bench.addDock(self.dock_01)
+
+        self.dock_02 = Dock(title="Dock 2")
+        self.bench.addDock(self.dock_02, placement=Placement.TAB, ref=self.dock_01)
+        QApplication.processEvents()
+
+        self.calls = []
+
+    def test_visible_dock_updates_now(self):
+        self.assertTrue(self.dock_02.scheduleUpdate(lambda: self.calls.append(2)))
+        self.assertEqual(self.calls, [2])
+
+    def test_hidden_dock_is_flushed_on_activation(self):
+        self.assertFalse(self.dock_01.scheduleUpdate(lambda: self.calls.append(1), "range"))
+        self.assertFalse(self.dock_01.scheduleUpdate(lambda: self.calls.append(11), "range"))
+        self.assertTrue(self.bench.scheduler.isDirty(self.dock_01))
+        self.assertEqual(self.calls, [])
+
+        self.dock_01.parentContainer.activateTab(self.dock_01.uid)
+
+        # latest update per key wins
+        self.assertEqual(self.calls, [11])
+        self.assertFalse(self.bench.scheduler.isDirty(self.dock_01))
+
+    def test_closing_discards_updates(self):
+        self.dock_01.scheduleUpdate(lambda: self.calls.append(1))
+        self.dock_01.close()
+        self.assertFalse(self.bench.scheduler.isDirty(self.dock_01))
+
+    def test_collapsed_dock_is_flushed_on_expand(self):
+        dock_03 = Dock(title="Dock 3")
+        self.bench.addDock(dock_03, placement=Placement.RIGHT, ref=self.dock_01)
+        QApplication.processEvents()
+
+        splitter = dock_03.parentContainer.parentContainer._splitter
+        splitter.setSizes([300, 0])
+        QApplication.processEvents()
+
+        self.assertFalse(dock_03.scheduleUpdate(lambda: self.calls.append(3)))
+
+        splitter.setSizes([150, 150])
+        QApplication.processEvents()
+        self.assertEqual(self.calls, [3])
+
+
+class DockIndexTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.bench = Bench()
+        self.bench.resize(300, 400)
+        self.bench.show()
+
+        self.dock_01 = Dock()
+        self.bench.addDock(self.dock_01)
+
+        self.dock_02 = Dock(title="Dock 2")
+        self.bench.addDock(self.dock_02, placement=Placement.BOTTOM, ref=self.dock_01)
+
+    def test_lookup(self):
+        self.assertIs(self.bench.getDock(self.dock_02.uid), self.dock_02)
+        self.assertIs(
+            self.bench.getContainer(self.dock_02.uid), self.dock_02.parentContainer
+        )
+        self.assertIsNone(self.bench.getDock("unknown"))
+
+    def test_move(self):
+        self.bench.dockMove(self.dock_01.uid, Placement.TAB, self.dock_02.uid)
+
+        self.assertIs(self.bench.getDock(self.dock_01.uid), self.dock_01)
+        self.assertIs(
+            self.bench.getContainer(self.dock_01.uid), self.dock_02.parentContainer
+        )
+        self.assertEqual(len(self.bench.docks), 2)
+
+    def test_cached_lists(self):
+        docks = self.bench.docks
+        self.assertEqual(docks, self.bench.root_container.flatDockList)
+        self.assertIn(self.bench.root_container, self.bench.containers)
+
+        self.dock_01.close()
+        self.assertIsNone(self.bench.getDock(self.dock_01.uid))
+        self.assertEqual(self.bench.docks, [self.dock_02])
+
+
+class CountingDock(Dock):
+    instances = 0
+
+    def __init__(self, title="Dock"):
+        super(CountingDock, self).__init__(title)
+        CountingDock.instances += 1
+
+
+class LazyLayoutTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.bench = Bench()
+        self.bench.resize(300, 400)
+        self.bench.show()
+
+        dock_01 = CountingDock("one")
+        self.bench.addDock(dock_01)
+        for title in ["two", "three"]:
+            self.bench.addDock(CountingDock(title), placement=Placement.TAB, ref=dock_01)
+
+        fd, self.filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.bench.saveLayout(self.filename)
+        CountingDock.instances = 0
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_only_active_dock_is_created(self):
+        self.bench.loadLayout(self.filename)
+        self.assertEqual(CountingDock.instances, 1)
+
+        placeholders = [d for d in self.bench.docks if isinstance(d, PlaceholderDock)]
+        self.assertEqual([d.title for d in placeholders], ["one", "two"])
+
+    def test_activation_creates_dock(self):
+        self.bench.loadLayout(self.filename)
+        placeholder = self.bench.docks[0]
+        uid = placeholder.uid
+
+        placeholder.parentContainer.activateTab(uid)
+
+        dock = self.bench.getDock(uid)
+        self.assertIsInstance(dock, CountingDock)
+        self.assertEqual(dock.title, "one")
+        self.assertTrue(dock.tab.active)
+        self.assertEqual(CountingDock.instances, 2)
+
+    def test_creation_activates_once(self):
+        self.bench.loadLayout(self.filename)
+        placeholder = self.bench.docks[0]
+        container = placeholder.parentContainer
+        current = container._dockstack.currentWidget()
+
+        flushed = []
+        flush = self.bench.scheduler.flush
+        self.bench.scheduler.flush = lambda docks: (flushed.append(docks), flush(docks))
+
+        container.activateTab(placeholder.uid)
+        dock = self.bench.getDock(placeholder.uid)
+        self.assertEqual(flushed, [[dock]])
+        self.assertIs(container._dockstack.currentWidget(), dock)
+        self.assertFalse(current.tab.active)
+
+    def test_moved_placeholder_is_created(self):
+        self.bench.loadLayout(self.filename)
+        placeholder = self.bench.docks[0]
+        self.assertIsInstance(placeholder, PlaceholderDock)
+
+        self.bench.dockMove(placeholder.uid, Placement.RIGHT, None)
+
+        dock = self.bench.getDock(placeholder.uid)
+        self.assertIsInstance(dock, CountingDock)
+        self.assertTrue(dock.tab.active)
+        self.assertIs(dock.parentContainer._dockstack.currentWidget(), dock)
+
+    def test_saving_placeholders(self):
+        self.bench.loadLayout(self.filename)
+        layout = self.bench.saveLayout()
+        titles = [d["title"] for d in layout["children"][0]["children"]]
+        self.assertEqual(titles, ["one", "two", "three"])
+
+    def test_registered_factory(self):
+        created = []
+
+        def factory():
+            created.append(CountingDock())
+            return created[-1]
+
+        ItemRegistry.register(CountingDock, factory)
+        try:
+            self.bench.loadLayout(self.filename)
+            self.bench.docks[1].materialize()
+            self.assertEqual(len(created), 2)
+        finally:
+            ItemRegistry.register(CountingDock)
+
+
+class StateDock(Dock):
+
+    def __init__(self, title="Dock"):
+        super(StateDock, self).__init__(title)
+        self.value = None
+        self.data = None
+
+    def saveSnapshot(self):
+        return {"value": self.value, "data": self.data}
+
+    def loadSnapshot(self, state):
+        self.value = state["value"]
+        self.data = state["data"]
+
+
+class SnapshotTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.bench = Bench()
+        self.bench.resize(300, 400)
+        self.bench.show()
+
+        self.dock_01 = StateDock("one")
+        self.dock_01.value = 1
+        self.bench.addDock(self.dock_01)
+
+        self.dock_02 = StateDock("two")
+        self.dock_02.value = 2
+        self.dock_02.data = np.arange(10, dtype=np.float32)
+        self.bench.addDock(self.dock_02, placement=Placement.TAB, ref=self.dock_01)
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "workspace.snap")
+
+    def tearDown(self):
+        for f in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, f))
+        os.rmdir(self.directory)
+
+    def test_roundtrip(self):
+        data = self.bench.saveSnapshot(self.filename)
+        self.assertTrue(data.startswith(SNAPSHOT_MAGIC))
+
+        self.bench.loadSnapshot(self.filename)
+        docks = {d.uid: d for d in self.bench.docks}
+
+        # the active tab is restored right away and keeps its uid
+        dock = docks[self.dock_02.uid]
+        self.assertIsInstance(dock, StateDock)
+        self.assertEqual(dock.value, 2)
+        self.assertIsInstance(dock.data, np.memmap)
+        np.testing.assert_array_equal(dock.data, np.arange(10))
+
+        # inactive tabs receive their state when created
+        placeholder = docks[self.dock_01.uid]
+        self.assertIsInstance(placeholder, PlaceholderDock)
+        placeholder.parentContainer.activateTab(placeholder.uid)
+        self.assertEqual(self.bench.getDock(self.dock_01.uid).value, 1)
+
+    def test_arrays_need_a_file(self):
+        self.assertRaises(BenchException, self.bench.saveSnapshot)
+
+        self.dock_02.data = None
+        data = self.bench.saveSnapshot()
+        self.bench.loadSnapshot(data)
+        self.assertEqual(self.bench.getDock(self.dock_02.uid).value, 2)
+
+    def test_bytes_need_a_directory(self):
+        data = self.bench.saveSnapshot(self.filename)
+        uids = sorted(d.uid for d in self.bench.docks)
+
+        # the .npy files are not looked up relative to the working directory
+        self.assertRaises(BenchException, self.bench.loadSnapshot, data)
+        self.assertEqual(sorted(d.uid for d in self.bench.docks), uids)
+
+        self.bench.loadSnapshot(data, directory=self.directory)
+        np.testing.assert_array_equal(self.bench.getDock(self.dock_02.uid).data, np.arange(10))
+
+    def test_snake_case_widgets(self):
+        class Widget(QWidget):
+            state = None
+
+            def save_snapshot(self):
+                return {"speed": 2}
+
+            def load_snapshot(self, state):
+                self.state = state
+
+        w = Widget()
+        dock = Dock("three")
+        dock.addWidget(w)
+        state = dock.saveSnapshot()
+        self.assertEqual(state["widgets"], [{"speed": 2}])
+
+        dock.loadSnapshot(state)
+        self.assertEqual(w.state, {"speed": 2})
+
+    def test_invalid_snapshots(self):
+        self.dock_02.data = None
+        data = self.bench.saveSnapshot()
+
+        self.assertRaises(BenchException, self.bench.loadSnapshot, b"garbage")
+
+        newer = bytearray(data)
+        newer[len(SNAPSHOT_MAGIC) : len(SNAPSHOT_MAGIC) + 2] = (SNAPSHOT_VERSION + 1).to_bytes(2, "big")
+        self.assertRaises(BenchException, self.bench.loadSnapshot, bytes(newer))
+
+    def test_memmaps(self):
+        raw = os.path.join(self.directory, "raw.bin")
+        mm = np.memmap(raw, dtype=np.int16, mode="w+", shape=(4, 25), offset=8)
+        mm[:] = np.arange(100).reshape(4, 25)
+        mm.flush()
+
+        for data, expected in [(mm, np.arange(100).reshape(4, 25)), (mm[1, 10:20], np.arange(35, 45))]:
+            # the dock is replaced on every restore
+            self.bench.getDock(self.dock_02.uid).data = data
+            self.bench.saveSnapshot(self.filename)
+            self.bench.loadSnapshot(self.filename)
+
+            restored = self.bench.getDock(self.dock_02.uid).data
+            self.assertIsInstance(restored, np.memmap)
+            self.assertEqual(restored.dtype, np.int16)
+            np.testing.assert_array_equal(restored, expected)
+            del restored
+        del mm
+
+    def test_corrupt_snapshot_keeps_layout(self):
+        self.dock_02.data = None
+        data = self.bench.saveSnapshot()
+        uids = sorted(d.uid for d in self.bench.docks)
+
+        header = len(SNAPSHOT_MAGIC) + 6
+        self.assertRaises(BenchException, self.bench.loadSnapshot, data[:-3])
+        self.assertRaises(BenchException, self.bench.loadSnapshot, data[:header] + b"x" * (len(data) - header))
+        self.assertEqual(sorted(d.uid for d in self.bench.docks), uids)
@@ -13,12 +13,14 @@ import unittest
 import logging
 import sys
 import os
+import time
 import numpy as np
 
 from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtOpenGL import *
 from qtpy.QtWidgets import *
+from qtpy.QtTest import QTest
 
 from qplotutils.player import *
 
@@ -47,6 +49,18 @@ class PlaybackWidgetTests(unittest.TestCase):
         config.debug = True
         self.player = PlaybackWidget()
 
+    def test_snapshot(self):
+        self.player.timestamps = list(range(10))
+        self.player.speed = 4
+        self.player.ui.slider_index.setValue(7)
+        state = self.player.save_snapshot()
+
+        other = PlaybackWidget()
+        other.timestamps = list(range(10))
+        other.load_snapshot(state)
+        self.assertEqual(other.ui.slider_index.value(), 7)
+        self.assertEqual(other.speed, 4)
+
     def test_play(self):
         self.player.timestamps = [0,1,2]
         self.player.play()
@@ -100,4 +114,377 @@ class PlaybackWidgetTests(unittest.TestCase):
         p = PlaybackWidget()
         p.timestamps = [0, 1, 2]
         p.play()
-        p.pause()
\ No newline at end of file
+        p.pause()
+
+
+class SeekTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.timestamps = np.array([0.0, 1.0, 2.5, 4.0, 10.0])
+
+    def test_nearest(self):
+        self.assertEqual(self.player.seek(2.4), 2)
+        self.assertEqual(self.player.seek(1.6), 1)
+        self.assertEqual(self.player.seek(-5), 0)
+        self.assertEqual(self.player.seek(100), 4)
+        self.assertEqual(self.player.ui.slider_index.value(), 4)
+
+    def test_previous(self):
+        self.assertEqual(self.player.seek(2.5, PlaybackWidget.SEEK_PREVIOUS), 2)
+        self.assertEqual(self.player.seek(3.9, PlaybackWidget.SEEK_PREVIOUS), 2)
+        self.assertIsNone(self.player.seek(-1, PlaybackWidget.SEEK_PREVIOUS))
+
+    def test_next(self):
+        self.assertEqual(self.player.seek(2.5, PlaybackWidget.SEEK_NEXT), 2)
+        self.assertEqual(self.player.seek(2.6, PlaybackWidget.SEEK_NEXT), 3)
+        self.assertIsNone(self.player.seek(11, PlaybackWidget.SEEK_NEXT))
+
+    def test_timestamp_array(self):
+        self.player.timestamps = [0.0, 1.0, 2.0]
+        ts = self.player.timestamp_array
+        self.assertIsInstance(ts, np.ndarray)
+        # converted once, not per access
+        self.assertIs(self.player.timestamp_array, ts)
+
+    def test_unknown_mode(self):
+        self.assertRaises(ValueError, self.player.seek, 1.0, "closest")
+
+    def test_jump_to_inexact_timestamp(self):
+        self.player.jump_to_timestamp("3.9")
+        self.assertEqual(self.player.ui.slider_index.value(), 3)
+
+    def test_typed_timestamp(self):
+        self.player.timestamps = np.arange(0, 1000, 12)
+        edit = self.player.ui.edit_timestamp
+        edit.clear()
+
+        QTest.keyClicks(edit, "588")
+        self.assertEqual(edit.text(), "588")
+        self.assertEqual(self.player.ui.slider_index.value(), 0)
+
+        QTest.keyClick(edit, Qt.Key_Return)
+        self.assertEqual(self.player.ui.slider_index.value(), 49)
+        self.assertEqual(float(edit.text()), 588.0)
+
+
+class ScrubTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.timestamps = np.arange(0, 100, 1.0)
+        self.slider = self.player.ui.slider_index
+
+        self.changed = []
+        self.previews = []
+        self.player.timestamp_changed.connect(lambda idx, ts: self.changed.append(idx))
+        self.player.scrub_preview.connect(lambda idx, ts: self.previews.append(idx))
+
+    def _drag(self, values):
+        self.slider.setSliderDown(True)
+        for v in values:
+            self.slider.setValue(v)
+
+    def test_coalesces_during_drag(self):
+        self._drag(range(1, 30))
+        self.assertEqual(self.changed, [])
+
+        QTest.qWait(40)
+        self.assertEqual(self.changed, [29])
+        self.assertEqual(self.previews, [29])
+
+        self.slider.setSliderDown(False)
+        self.assertEqual(self.changed, [29])
+
+    def test_on_release(self):
+        self.player.scrub_mode = PlaybackWidget.SCRUB_ON_RELEASE
+
+        self._drag(range(1, 30))
+        QTest.qWait(40)
+        self.assertEqual(self.changed, [])
+        self.assertEqual(self.previews, [29])
+
+        self.slider.setValue(40)
+        self.slider.setSliderDown(False)
+        self.assertEqual(self.changed, [40])
+
+    def test_no_drag_emits_immediately(self):
+        self.slider.setValue(5)
+        self.assertEqual(self.changed, [5])
+        self.assertEqual(self.previews, [])
+
+
+class StreamTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.set_streams(
+            {
+                "camera": np.array([0.0, 0.5, 1.0, 1.5]),
+                "radar": np.array([0.2, 0.5, 1.2]),
+            }
+        )
+
+        self.received = []
+        self.player.stream_indices_changed.connect(
+            lambda idx, ts, indices: self.received.append((idx, ts, indices))
+        )
+
+    def test_merged_timeline(self):
+        np.testing.assert_array_equal(
+            self.player.timestamps, [0.0, 0.2, 0.5, 1.0, 1.2, 1.5]
+        )
+        self.assertEqual(list(self.player.streams.keys()), ["camera", "radar"])
+
+    def test_stream_indices(self):
+        self.assertEqual(self.player.stream_indices(0), {"camera": 0, "radar": -1})
+        self.assertEqual(self.player.stream_indices(2), {"camera": 1, "radar": 1})
+        self.assertEqual(self.player.stream_indices(4), {"camera": 2, "radar": 2})
+
+    def test_emission(self):
+        self.player.seek(1.2)
+        self.assertEqual(self.received, [(4, 1.2, {"camera": 2, "radar": 2})])
+
+    def test_plain_timestamps_clear_streams(self):
+        self.player.timestamps = np.arange(10)
+        self.assertIsNone(self.player.streams)
+        self.assertEqual(self.player.stream_indices(3), {})
+
+
+class RealtimePlaybackTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.timestamps = np.arange(0, 2.0, 0.01)
+        self.player.realtime = True
+
+        self.emitted = []
+        self.player.timestamp_changed.connect(lambda idx, ts: self.emitted.append(idx))
+
+    def _play(self, timeout=5.0):
+        start = time.monotonic()
+        self.player.play()
+        while self.player.is_playing and time.monotonic() - start < timeout:
+            QTest.qWait(5)
+        return time.monotonic() - start
+
+    def test_speed_bounds(self):
+        self.player.speed = 1000
+        self.assertEqual(self.player.speed, PlaybackWidget.MAX_SPEED)
+        self.player.speed = 0
+        self.assertEqual(self.player.speed, PlaybackWidget.MIN_SPEED)
+
+    def test_follows_wall_clock(self):
+        self.player.speed = 10.0
+        elapsed = self._play()
+
+        self.assertEqual(self.player.ui.slider_index.value(), 199)
+        self.assertGreater(elapsed, 0.15)
+        self.assertLess(elapsed, 1.0)
+
+        # timestamps are strictly increasing
+        self.assertTrue(np.all(np.diff(self.emitted) > 0))
+
+    def test_drops_frames_for_slow_consumers(self):
+        self.player.speed = 10.0
+        self.player.timestamp_changed.connect(lambda idx, ts: time.sleep(0.01))
+
+        elapsed = self._play()
+
+        self.assertEqual(self.player.ui.slider_index.value(), 199)
+        self.assertLess(elapsed, 1.0)
+        self.assertGreater(self.player.dropped_frames, 0)
+        self.assertLess(len(self.emitted), 199)
+
+    def test_pause(self):
+        self.player.speed = 1.0
+        self.player.play()
+        QTest.qWait(50)
+        self.player.pause()
+
+        value = self.player.ui.slider_index.value()
+        QTest.qWait(50)
+        self.assertEqual(self.player.ui.slider_index.value(), value)
+
+
+class PlaybackDataProviderTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.timestamps = np.arange(0, 100, 1.0)
+        self.provider = PlaybackDataProvider(self.player, prefetch=4, cache_size=8)
+
+        self.loaded = []
+        self.received = []
+
+        def load(index, ts):
+            self.loaded.append(index)
+            return ts * 2
+
+        self.handle = self.provider.register(
+            load, lambda index, ts, data: self.received.append((index, data))
+        )
+
+    def tearDown(self):
+        self.provider.close()
+
+    def test_prefetch_ahead(self):
+        self.player.seek(10)
+        self.assertEqual(self.received[-1], (10, 20.0))
+        self.assertEqual(self.provider.misses, 1)
+
+        for k in range(11, 20):
+            self.player.seek(k)
+            self.assertEqual(self.received[-1], (k, 2.0 * k))
+
+        self.assertEqual(self.provider.misses, 1)
+        self.assertEqual(self.provider.hits, 9)
+
+    def test_prefetch_backwards(self):
+        self.player.seek(50)
+        self.player.seek(49)
+        self.player.seek(48)
+
+        start = time.monotonic()
+        while 44 not in self.loaded and time.monotonic() - start < 2.0:
+            time.sleep(0.01)
+
+        self.assertIn(44, self.loaded)
+        self.assertEqual(self.provider.hits, 1)
+
+    def test_seek_not_delayed_by_prefetch(self):
+        provider = PlaybackDataProvider(self.player, prefetch=8, max_workers=2)
+        received = []
+
+        def slow(index, ts):
+            time.sleep(0.05)
+            return index
+
+        provider.register(slow, lambda index, ts, data: received.append(data))
+        try:
+            self.player.seek(10)
+
+            start = time.monotonic()
+            self.player.seek(60)
+            elapsed = time.monotonic() - start
+
+            self.assertEqual(received[-1], 60)
+            # the load of frame 60 does not queue behind the prefetched frames 11..18
+            self.assertLess(elapsed, 0.15)
+        finally:
+            provider.close()
+
+    def test_unregister(self):
+        self.provider.unregister(self.handle)
+        self.player.seek(10)
+        self.assertEqual(self.received, [])
+
+    def test_failing_loader(self):
+        def fail(index, ts):
+            raise IOError("disk gone")
+
+        self.provider.register(fail, lambda *args: self.fail("no data expected"))
+        self.player.seek(10)
+        self.assertEqual(self.received[-1], (10, 20.0))
+
+
+class PlaybackProfilerTests(unittest.TestCase):
+
+    app = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication([])
+
+    def setUp(self):
+        self.player = PlaybackWidget()
+        self.player.timestamps = np.arange(0, 100, 1.0)
+        self.profiler = PlaybackProfiler(self.player, window=10)
+
+        self.profiler.add_consumer(lambda idx, ts: time.sleep(0.005), "slow")
+        self.profiler.add_consumer(lambda idx, ts: None, "fast")
+
+    def test_stats(self):
+        for k in range(1, 21):
+            self.player.seek(k)
+
+        stats = self.profiler.stats()
+        self.assertEqual(stats["slow"]["count"], 10)
+        self.assertGreater(stats["slow"]["p50"], 4.0)
+        self.assertLess(stats["fast"]["p95"], stats["slow"]["p50"])
+        self.assertGreaterEqual(stats["slow"]["max"], stats["slow"]["p95"])
+        self.assertIn(PlaybackProfiler.FRAME, stats)
+
+        # slowest consumer first
+        lines = self.profiler.report().splitlines()
+        self.assertTrue(lines[1].startswith("slow"))
+
+    def test_remove_consumer(self):
+        self.profiler.remove_consumer("slow")
+        self.player.seek(5)
+        self.assertNotIn("slow", self.profiler.stats())
+
+    def test_default_names(self):
+        class Consumer(object):
+            def __init__(self):
+                self.calls = 0
+
+            def on(self, index, timestamp):
+                self.calls += 1
+
+        first, second = Consumer(), Consumer()
+        names = [self.profiler.add_consumer(c.on) for c in [first, second]]
+        self.assertTrue(names[0].endswith("Consumer.on"))
+        self.assertEqual(names[1], names[0] + " #2")
+        self.assertRaises(ValueError, self.profiler.add_consumer, first.on, "slow")
+
+        self.player.seek(1)
+        stats = self.profiler.stats()
+        self.assertEqual(stats[names[0]]["count"], 1)
+        self.assertEqual(stats[names[1]]["count"], 1)
+
+        # every consumer is disconnected
+        self.profiler.close()
+        self.player.seek(2)
+        self.assertEqual((first.calls, second.calls), (1, 1))
+
+    def test_qobject_disconnect(self):
+        # the consumer API does not shadow QObject.disconnect
+        self.profiler.objectNameChanged.connect(lambda name: self.fail("still connected"))
+        self.profiler.disconnect()
+        self.profiler.setObjectName("profiler")
+
+    def test_overlay(self):
+        self.player.seek(5)
+        overlay = PlaybackProfilerOverlay(self.profiler, parent=self.player)
+        self.assertIn("fast", overlay.text())
@@ -9,7 +9,9 @@ Tests for package qplotutils.wireframe
 
 Autogenerated module stub.
 """
+import ctypes
 import logging
+import os
 
 __author__ = "Philipp Baust"
 __copyright__ = "Copyright 2019, Philipp Baust"
@@ -18,4 +20,73 @@ __license__ = "MIT"
 __version__ = "0.0.1"
 __maintainer__ = "Philipp Baust"
 __email__ = "philipp.baust@gmail.com"
-__status__ = "Development"
\ No newline at end of file
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+
+_context = None
+
+
+def select_offscreen_platform():
+    """ Without a display the GL tests run on an EGL pbuffer (e.g. Mesa llvmpipe). PyOpenGL selects its platform
+    on first import, so test modules call this before they import qplotutils.wireframe or OpenGL.
+    """
+    if "DISPLAY" not in os.environ and "WAYLAND_DISPLAY" not in os.environ:
+        os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+
+
+def offscreen_context(width=64, height=64):
+    """ Makes a headless GL context with a pbuffer of the given size current.
+
+    :return: True if a context is available, the GL tests are skipped otherwise
+    """
+    global _context
+    if _context is not None:
+        return _context is not False
+
+    _context = False
+
+    select_offscreen_platform()
+    if os.environ.get("PYOPENGL_PLATFORM") != "egl":
+        return False
+
+    try:
+        from OpenGL import platform
+
+        if type(platform.PLATFORM).__name__ != "EGLPlatform":
+            _log.info("PyOpenGL was imported before the EGL platform was selected")
+            return False
+
+        from OpenGL import EGL
+
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, major, minor):
+            return False
+
+        attributes = (EGL.EGLint * 9)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_DEPTH_SIZE, 16,
+            EGL.EGL_NONE, 0, 0,
+        )
+        config = EGL.EGLConfig()
+        n = EGL.EGLint()
+        EGL.eglChooseConfig(display, attributes, ctypes.byref(config), 1, ctypes.byref(n))
+        if n.value == 0:
+            return False
+
+        size = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE)
+        surface = EGL.eglCreatePbufferSurface(display, config, size)
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(display, surface, surface, context):
+            return False
+    except Exception as ex:
+        _log.info("No offscreen GL context: {}".format(ex))
+        return False
+
+    _context = (display, surface, context)
+    return True
@@ -20,6 +20,10 @@ from qtpy.QtGui import *
 from qtpy.QtOpenGL import *
 from qtpy.QtWidgets import *
 
+from . import select_offscreen_platform
+
+select_offscreen_platform()
+
 from qplotutils.wireframe.base_types import *
 
 __author__ = "Philipp Baust"
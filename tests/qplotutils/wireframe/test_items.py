@@ -20,7 +20,12 @@ from qtpy.QtGui import *
 from qtpy.QtOpenGL import *
 from qtpy.QtWidgets import *
 
+from . import offscreen_context, select_offscreen_platform
+
+select_offscreen_platform()
+
 from qplotutils.wireframe.items import *
+from OpenGL import GL
 
 __author__ = "Philipp Baust"
 __copyright__ = "Copyright 2019, Philipp Baust"
@@ -44,6 +49,15 @@ class BoxTests(unittest.TestCase):
         """ Autogenerated. """
         obj = Box()  # TODO: may fail!
 
+    def test_geometry(self):
+        box = Box()
+        v, _ = box.lineGeometry()
+        self.assertEqual(v.shape, (24, 3))
+        # every corner is connected to three others
+        corners, counts = np.unique(v, axis=0, return_counts=True)
+        self.assertEqual(len(corners), 8)
+        self.assertTrue(np.all(counts == 3))
+
 
 class CoordinateCrossTests(unittest.TestCase):
 
@@ -66,6 +80,34 @@ class GLGraphicsItemTests(unittest.TestCase):
         """ Autogenerated. """
         obj = GLGraphicsItem()  # TODO: may fail!
 
+    def test_view_transform_cached(self):
+        item = GLGraphicsItem()
+        item.translate(1, 2, 3)
+        m = item.glMatrix()
+        self.assertIs(item.glMatrix(), m)
+        # column-major, translation in the last column
+        np.testing.assert_array_equal(m[12:15], [1, 2, 3])
+
+    def test_parent_transform_propagates(self):
+        parent = GLGraphicsItem()
+        child = GLGraphicsItem(parentItem=parent)
+        child.translate(0, 1, 0)
+        np.testing.assert_array_equal(child.glMatrix()[12:15], [0, 1, 0])
+
+        parent.translate(2, 0, 0)
+        np.testing.assert_array_equal(child.glMatrix()[12:15], [2, 1, 0])
+        p = child.viewTransform().map(QVector3D(0, 0, 0))
+        self.assertEqual((p.x(), p.y(), p.z()), (2, 1, 0))
+
+    def test_in_place_modification(self):
+        parent = GLGraphicsItem()
+        child = GLGraphicsItem(parentItem=parent)
+        np.testing.assert_array_equal(child.glMatrix()[12:15], [0, 0, 0])
+
+        parent.transform().translate(0, 0, 4)
+        parent.invalidateTransform()
+        np.testing.assert_array_equal(child.glMatrix()[12:15], [0, 0, 4])
+
 
 class GridTests(unittest.TestCase):
 
@@ -77,6 +119,16 @@ class GridTests(unittest.TestCase):
         """ Autogenerated. """
         obj = Grid()  # TODO: may fail!
 
+    def test_geometry(self):
+        grid = Grid(x=4, y=2, xs=1.0, ys=0.5)
+        v, colors = grid.lineGeometry()
+        self.assertIsNone(colors)
+
+        # 5 lines along y followed by 5 lines along x
+        self.assertEqual(v.shape, (20, 3))
+        np.testing.assert_allclose(v[:2], [[-2, -1, 0], [-2, 1, 0]])
+        np.testing.assert_allclose(v[10:12], [[-2, -1, 0], [2, -1, 0]])
+
 
 class MeshTests(unittest.TestCase):
 
@@ -88,6 +140,64 @@ class MeshTests(unittest.TestCase):
         """ Autogenerated. """
         obj = Mesh()  # TODO: may fail!
 
+    def test_face_edges(self):
+        mesh = Mesh.cube()
+        # 12 cube edges and one diagonal per side
+        self.assertEqual(mesh.face_edges.shape, (18, 2))
+        self.assertTrue(np.all(mesh.face_edges[:, 0] < mesh.face_edges[:, 1]))
+
+    def test_smooth_normals(self):
+        k = 20
+        x, y = np.meshgrid(np.arange(k), np.arange(k))
+        vertices = np.stack([x.ravel(), y.ravel(), np.zeros(k * k)], axis=1)
+        i = np.arange(k * k).reshape(k, k)[:-1, :-1].ravel()
+        faces = np.concatenate(
+            [np.stack([i, i + 1, i + k], 1), np.stack([i + 1, i + k + 1, i + k], 1)]
+        )
+
+        mesh = Mesh.compute_face_arrays(vertices, faces)
+        mesh.smooth = True
+        np.testing.assert_allclose(
+            mesh.face_normal_vectors.reshape(-1, 3), [[0, 0, 1]] * (faces.size)
+        )
+        self.assertEqual(len(mesh.face_edges), 3 * (k - 1) ** 2 + 2 * (k - 1))
+
+    def test_generator_cache(self):
+        a = Mesh.sphere(10, 12)
+        b = Mesh.sphere(10, 12)
+        self.assertIsNot(a, b)
+        self.assertIs(a.vertices, b.vertices)
+        self.assertFalse(a.vertices.flags.writeable)
+
+        a.smooth = True
+        self.assertFalse(b.smooth)
+
+        Mesh.clearCache()
+        self.assertIsNot(Mesh.sphere(10, 12).vertices, a.vertices)
+
+    def test_large_cone(self):
+        mesh = Mesh.cone(1000)
+        self.assertEqual(mesh.faces.shape, (2000, 3))
+        self.assertEqual(mesh.faces.max(), 1001)
+
+    def test_height_field(self):
+        z = np.zeros((4, 5))
+        z[0, 0] = np.nan
+        mesh = Mesh.heightField(z, xs=0.5)
+
+        self.assertEqual(mesh.vertices.shape, (20, 3))
+        self.assertAlmostEqual(mesh.vertices[:, 0].max(), 2.0)
+        # one of the 12 cells has a missing corner
+        self.assertEqual(mesh.faces.shape, (22, 3))
+        np.testing.assert_allclose(mesh.face_normals, [[0, 0, 1]] * 22)
+
+    def test_indexed_form(self):
+        mesh = Mesh.cube()
+        self.assertEqual(mesh.vertices.shape, (8, 3))
+        self.assertEqual(mesh.faces.dtype, np.uint32)
+        np.testing.assert_array_equal(mesh.face_vertices, mesh.vertices[mesh.faces])
+        self.assertEqual(mesh.face_normal_vectors.shape, (12, 3, 3))
+
 
 class MeshItemTests(unittest.TestCase):
 
@@ -97,4 +207,258 @@ class MeshItemTests(unittest.TestCase):
         
     def test_instantiate(self):
         """ Autogenerated. """
-        obj = MeshItem(Mesh.cube())  # TODO: may fail!
\ No newline at end of file
+        obj = MeshItem(Mesh.cube())  # TODO: may fail!
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class MeshItemRenderTests(unittest.TestCase):
+
+    def setUp(self):
+        GL.glViewport(0, 0, 64, 64)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+        self.item = MeshItem(Mesh.cube(), faceColor=(0.0, 1.0, 0.0, 1.0))
+        self.item.initializeGL()
+
+    def tearDown(self):
+        self.item.releaseGL()
+
+    def centerPixel(self):
+        return np.frombuffer(GL.glReadPixels(32, 32, 1, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE), np.uint8)
+
+    def test_draws_from_buffers(self):
+        self.item.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertEqual(self.centerPixel()[1], 255)
+
+        self.assertNotEqual(self.item._vertex_buffer.id, 0)
+        self.assertEqual(self.item._vertex_buffer.count, 36)
+
+    def test_uploads_once(self):
+        for _ in range(3):
+            self.item.paint()
+        self.assertEqual(self.item._vertex_buffer.uploads, 1)
+        self.assertEqual(self.item._normal_buffer.uploads, 1)
+
+        self.item.setMeshData(Mesh.cone(8))
+        self.item.paint()
+        self.assertEqual(self.item._vertex_buffer.uploads, 2)
+        self.assertEqual(self.item._vertex_buffer.count, 48)
+
+    def test_indexed(self):
+        self.item.releaseGL()
+        self.item = MeshItem(Mesh.cube(), faceColor=(0.0, 1.0, 0.0, 1.0), smooth=True)
+        self.item.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertEqual(self.centerPixel()[1], 255)
+
+        # shared vertices, the expanded arrays are not needed
+        self.assertEqual(self.item._vertex_buffer.count, 8)
+        self.assertEqual(self.item._index_buffer.count, 36)
+
+        # expanded lazily on access and cached until released
+        mesh = self.item.mesh
+        face_vertices = mesh.face_vertices
+        self.assertIs(mesh.face_vertices, face_vertices)
+        np.testing.assert_array_equal(face_vertices, mesh.vertices[mesh.faces])
+
+        mesh.releaseExpanded()
+        self.assertIsNot(mesh.face_vertices, face_vertices)
+        np.testing.assert_array_equal(mesh.face_vertices, face_vertices)
+
+    def test_wireframe(self):
+        self.item.draw_wireframe = True
+        self.item.debug_face_edges = True
+        self.item.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertEqual(self.item._wireframe_edge_buffer.count, 24)
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class InstancedMeshItemTests(unittest.TestCase):
+
+    def setUp(self):
+        GL.glViewport(0, 0, 64, 64)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+        transforms = np.tile(np.eye(4), (2, 1, 1))
+        transforms[:, :3, :3] *= 0.5
+        transforms[:, :3, 3] = [[-0.5, 0, 0], [0.5, 0, 0]]
+        colors = [[1, 0, 0, 1], [0, 0, 1, 1]]
+
+        self.item = InstancedMeshItem(Mesh.cube(), transforms, colors)
+
+    def tearDown(self):
+        self.item.releaseGL()
+
+    def pixel(self, x, y):
+        return np.frombuffer(GL.glReadPixels(x, y, 1, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE), np.uint8)
+
+    def assertRendered(self):
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [255, 0, 0])
+        np.testing.assert_array_equal(self.pixel(48, 32)[:3], [0, 0, 255])
+        np.testing.assert_array_equal(self.pixel(32, 4)[:3], [0, 0, 0])
+
+    def test_instanced(self):
+        self.item.paint()
+        self.assertTrue(self.item.instanced)
+        self.assertRendered()
+
+    def test_batched(self):
+        self.item.force_batched = True
+        self.item.paint()
+        self.assertRendered()
+        self.assertEqual(self.item._batch_index_buffer.count, 72)
+
+    def test_in_place_update(self):
+        self.item.paint()
+        self.item.setPositions([[0.5, 0, 0], [-0.5, 0, 0]])
+
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        self.item.paint()
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [0, 0, 255])
+
+        # same size, the buffer storage is reused
+        self.assertEqual(self.item._transform_buffer.uploads, 2)
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class PointCloudItemTests(unittest.TestCase):
+
+    def setUp(self):
+        GL.glViewport(0, 0, 64, 64)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+        self.points = np.array([[-0.5, 0, 0], [0.5, 0, 0]], np.float32)
+        self.item = PointCloudItem(self.points, [0.0, 1.0], pointSize=8)
+
+    def tearDown(self):
+        self.item.releaseGL()
+
+    def pixel(self, x, y):
+        return np.frombuffer(GL.glReadPixels(x, y, 1, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE), np.uint8)
+
+    def test_colormap(self):
+        self.item.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertTrue(self.item.gpuColormap)
+
+        # autumn: red to yellow
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [255, 0, 0])
+        np.testing.assert_array_equal(self.pixel(48, 32)[:3], [255, 255, 0])
+        np.testing.assert_array_equal(self.pixel(32, 32)[:3], [0, 0, 0])
+
+    def test_uniform_color(self):
+        self.item.setData(self.points)
+        self.item.color = (0, 1, 0, 1)
+        self.item.paint()
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [0, 255, 0])
+
+    def test_alternating_buffers(self):
+        self.item.paint()
+        first = self.item._buffers[self.item._PointCloudItem__front]["points"].id
+
+        self.item.setData(np.zeros((10, 3)), np.arange(10))
+        self.assertTrue(self.item.hasPendingFrame)
+        # the previous frame is displayed until the new one is uploaded
+        self.assertEqual(self.item.pointCount, 2)
+
+        self.item.upload()
+        self.assertEqual(self.item.pointCount, 10)
+        second = self.item._buffers[self.item._PointCloudItem__front]["points"].id
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.item.frames, 2)
+
+    def test_invalid_intensities(self):
+        self.assertRaises(ValueError, self.item.setData, self.points, [1.0])
+
+    def test_nan_intensities(self):
+        self.item.setData(self.points, [np.nan, np.nan])
+        self.item.upload()
+        front = self.item._buffers[self.item._PointCloudItem__front]
+        self.assertEqual(front["range"], (0.0, 1.0))
+
+    def test_non_finite_intensities_on_gpu(self):
+        self.item.setData(self.points, [np.nan, np.inf])
+        self.item.paint()
+        self.assertTrue(self.item.gpuColormap)
+
+        front = self.item._buffers[self.item._PointCloudItem__front]
+        self.assertTrue(np.all(np.isfinite(front["intensities"]._data)))
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [255, 0, 0])
+        np.testing.assert_array_equal(self.pixel(48, 32)[:3], [255, 255, 0])
+
+    def test_uniform_color_in_view(self):
+        from qplotutils.wireframe.state import GLState
+
+        class View(object):
+            glState = GLState()
+
+            def update(self):
+                pass
+
+        self.assertIs(self.item.shaderProgram(), self.item.shader_program)
+        self.item.view = View()
+        self.item.setData(self.points)
+        self.item.color = (0, 1, 0, 1)
+
+        with self.item.view.glState as state:
+            # left bound by a previous item
+            state.useProgram(self.item.shader_program.program)
+            self.item.paint()
+            self.assertEqual(GL.glGetFloatv(GL.GL_POINT_SIZE), 8)
+
+        np.testing.assert_array_equal(self.pixel(16, 32)[:3], [0, 255, 0])
+        self.item.view = None
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class LinesItemRenderTests(unittest.TestCase):
+
+    def setUp(self):
+        GL.glViewport(0, 0, 64, 64)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
+        GL.glClearColor(0, 0, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+    def test_grid(self):
+        grid = Grid(x=1, y=1, xs=0.5, ys=0.5, edge_color=(1, 1, 1, 1))
+        for _ in range(3):
+            grid.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertEqual(grid._vertex_buffer.uploads, 1)
+
+        # center lines
+        column = np.frombuffer(GL.glReadPixels(32, 0, 1, 64, GL.GL_RED, GL.GL_UNSIGNED_BYTE), np.uint8)
+        self.assertGreater(column[40], 0)
+
+        grid.xs = 0.25
+        grid.paint()
+        self.assertEqual(grid._vertex_buffer.uploads, 2)
+        grid.releaseGL()
+
+    def test_coordinate_cross(self):
+        cross = CoordinateCross()
+        cross.paint()
+        self.assertEqual(GL.glGetError(), GL.GL_NO_ERROR)
+        self.assertEqual(cross._vertex_buffer.count, 6)
+        cross.releaseGL()
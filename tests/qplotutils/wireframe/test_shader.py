@@ -20,7 +20,12 @@ from qtpy.QtGui import *
 from qtpy.QtOpenGL import *
 from qtpy.QtWidgets import *
 
+from . import offscreen_context, select_offscreen_platform
+
+select_offscreen_platform()
+
 from qplotutils.wireframe.shader import *
+from OpenGL import GL
 
 __author__ = "Philipp Baust"
 __copyright__ = "Copyright 2019, Philipp Baust"
@@ -53,4 +58,83 @@ class ShaderRegistryTests(unittest.TestCase):
         
     def test_instantiate(self):
         """ Autogenerated. """
-        obj = ShaderRegistry()  # TODO: may fail!
\ No newline at end of file
+        obj = ShaderRegistry()  # TODO: may fail!
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class ShaderUniformTests(unittest.TestCase):
+
+    def setUp(self):
+        self.program = ShaderProgram(
+            "uniform_test",
+            """
+            uniform mat4 model;
+            void main() {
+                gl_Position = gl_ModelViewProjectionMatrix * model * gl_Vertex;
+            }
+            """,
+            """
+            uniform vec3 tint;
+            uniform float weights[3];
+            void main() {
+                gl_FragColor = vec4(tint * (weights[0] + weights[1] + weights[2]), 1.0);
+            }
+            """,
+            uniforms={"weights": [1, 2, 3]},
+        )
+        self.program.compile()
+        self.assertNotEqual(self.program.program, 0)
+
+    def tearDown(self):
+        GL.glDeleteProgram(self.program.program)
+
+    def value(self, name, n):
+        out = np.zeros(n, np.float32)
+        GL.glGetUniformfv(self.program.program, self.program.uniform(name), out)
+        return out
+
+    def test_locations(self):
+        for name in ["model", "tint", "weights"]:
+            self.assertEqual(
+                self.program.uniform(name),
+                GL.glGetUniformLocation(self.program.program, name.encode("utf_8")),
+            )
+        self.assertEqual(self.program.uniform("missing"), -1)
+
+    def test_unchanged_skipped(self):
+        with self.program:
+            pass
+        with self.program:
+            pass
+        self.assertEqual(self.program.uploads, 1)
+        self.assertEqual(self.program.skipped, 1)
+        np.testing.assert_array_equal(self.value("weights", 1), [1])
+
+    def test_typed_upload(self):
+        m = np.arange(16, dtype=np.float32).reshape(4, 4)
+        with self.program:
+            self.program.setUniform("model", m)
+            self.program.setUniform("tint", (0.5, 0.25, 1.0))
+
+        # uploaded row-major, read back column-major
+        np.testing.assert_array_equal(self.value("model", 16), m.T.ravel())
+        np.testing.assert_array_equal(self.value("tint", 3), [0.5, 0.25, 1.0])
+
+    def test_update_unbound(self):
+        with self.program:
+            pass
+        self.program.setUniform("tint", (1, 0, 0))
+        np.testing.assert_array_equal(self.value("tint", 3), [1, 0, 0])
+        self.assertEqual(GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM), 0)
+
+        with self.program:
+            pass
+        self.assertEqual(self.program.uploads, 2)
+
+    def test_unknown_uniform(self):
+        self.program.uniformData["missing"] = [1]
+        with self.assertRaises(Exception):
+            with self.program:
+                pass
+        self.assertEqual(GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM), 0)
+
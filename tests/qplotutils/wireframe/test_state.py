@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+===================================
+Test for qplotutils.wireframe.state
+===================================
+
+"""
+import unittest
+import logging
+
+from . import offscreen_context, select_offscreen_platform
+
+select_offscreen_platform()
+
+from OpenGL import GL
+
+from qplotutils.wireframe.state import *
+
+__author__ = "Philipp Baust"
+__copyright__ = "Copyright 2019, Philipp Baust"
+__credits__ = []
+__license__ = "MIT"
+__version__ = "0.0.1"
+__maintainer__ = "Philipp Baust"
+__email__ = "philipp.baust@gmail.com"
+__status__ = "Development"
+
+_log = logging.getLogger(__name__)
+
+
+@unittest.skipUnless(offscreen_context(), "No offscreen GL context")
+class GLStateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.state = GLState()
+
+    def test_apply(self):
+        self.state.apply({GL.GL_BLEND: True, "glBlendFunc": (GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)})
+        self.assertTrue(GL.glIsEnabled(GL.GL_BLEND))
+        self.assertTrue(GL.glIsEnabled(GL.GL_DEPTH_TEST))
+        self.assertEqual(GL.glGetIntegerv(GL.GL_BLEND_DST), GL.GL_ONE_MINUS_SRC_ALPHA)
+
+        # unspecified options fall back to the defaults
+        self.state.apply({})
+        self.assertFalse(GL.glIsEnabled(GL.GL_BLEND))
+
+    def test_redundant_changes_skipped(self):
+        self.state.apply({GL.GL_CULL_FACE: True})
+        self.assertTrue(GL.glIsEnabled(GL.GL_CULL_FACE))
+
+        # changed behind the back of the tracker, the shadowed state is still considered current
+        GL.glDisable(GL.GL_CULL_FACE)
+        self.state.apply({GL.GL_CULL_FACE: True})
+        self.assertFalse(GL.glIsEnabled(GL.GL_CULL_FACE))
+
+        self.state.invalidate()
+        self.state.apply({GL.GL_CULL_FACE: True})
+        self.assertTrue(GL.glIsEnabled(GL.GL_CULL_FACE))
+        self.state.apply({})
+
+    def test_line_width_reset(self):
+        self.state.apply({"glLineWidth": (1.5,)})
+        # an item changes the width during paint, e.g. LinesItem
+        self.state.call("glLineWidth", 3.0)
+
+        self.state.apply({"glLineWidth": (1.5,)})
+        self.assertEqual(GL.glGetFloatv(GL.GL_LINE_WIDTH), 1.5)
+
+        self.state.call("glPointSize", 4.0)
+        self.state.apply({})
+        self.assertEqual(GL.glGetFloatv(GL.GL_LINE_WIDTH), 1.0)
+        self.assertEqual(GL.glGetFloatv(GL.GL_POINT_SIZE), 1.0)
+
+    def test_counters(self):
+        self.state.apply({GL.GL_BLEND: True})
+        self.state.resetCounters()
+
+        self.state.apply({GL.GL_BLEND: True})
+        self.assertEqual(self.state.counters["capabilities"], 0)
+        self.assertEqual(self.state.counters["skipped"], len(GLState.DEFAULTS))
+
+        self.state.apply({})
+        self.assertEqual(self.state.counters["capabilities"], 1)
+
+    def test_program_stays_bound(self):
+        from qplotutils.wireframe.shader import ShaderRegistry
+
+        registry = ShaderRegistry()
+        registry.add("shaded")
+        program = registry["shaded"]
+        program.compile()
+        self.assertNotEqual(program.program, 0)
+
+        with self.state:
+            self.assertIs(GLState.active, self.state)
+            for _ in range(3):
+                with program:
+                    pass
+                self.assertEqual(GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM), program.program)
+            self.assertEqual(self.state.counters["programs"], 1)
+
+        # unbound when the drawing ends
+        self.assertIsNone(GLState.active)
+        self.assertEqual(GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM), 0)
+
+        with program:
+            pass
+        self.assertEqual(GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,10 @@ from qtpy.QtGui import *
 from qtpy.QtOpenGL import *
 from qtpy.QtWidgets import *
 
+from . import select_offscreen_platform
+
+select_offscreen_platform()
+
 from qplotutils.wireframe.view import *
 
 __author__ = "Philipp Baust"
@@ -59,4 +63,67 @@ class ViewPropertiesTests(unittest.TestCase):
         
     def test_instantiate(self):
         """ Autogenerated. """
-        obj = ViewProperties()  # TODO: may fail!
\ No newline at end of file
+        obj = ViewProperties()  # TODO: may fail!
+
+
+class DrawListTests(unittest.TestCase):
+
+    class View(object):
+        def __init__(self):
+            self.items = []
+            self.draw_list = DrawList(self)
+
+        def addItem(self, item):
+            self.items.append(item)
+            item.view = self
+            self.sceneChanged()
+
+        def removeItem(self, item):
+            self.items.remove(item)
+            item.view = None
+
+        def sceneChanged(self):
+            self.draw_list.invalidate()
+
+        def update(self):
+            pass
+
+    def setUp(self):
+        from qplotutils.wireframe.items import GLGraphicsItem
+
+        self.view = self.View()
+        self.root = GLGraphicsItem()
+        self.view.addItem(self.root)
+
+        self.child_01 = GLGraphicsItem(parentItem=self.root)
+        self.child_02 = GLGraphicsItem(parentItem=self.root)
+        self.grandchild = GLGraphicsItem(parentItem=self.child_01)
+
+    def test_order(self):
+        # children are added to the view of their parent
+        self.assertEqual(len(self.view.items), 4)
+        self.assertEqual(
+            list(self.view.draw_list),
+            [self.grandchild, self.child_01, self.child_02, self.root],
+        )
+
+    def test_hidden_subtree(self):
+        self.assertEqual(len(self.view.draw_list), 4)
+        self.child_01.hide()
+        self.assertEqual(list(self.view.draw_list), [self.child_02, self.root])
+
+    def test_subtree(self):
+        self.assertEqual(
+            self.view.draw_list.build(self.child_01), [self.grandchild, self.child_01]
+        )
+
+    def test_grouped_by_state(self):
+        from OpenGL.GL import GL_BLEND
+        from qplotutils.wireframe.items import Mesh, MeshItem
+
+        self.child_02.setGLOptions({GL_BLEND: True})
+        mesh = MeshItem(Mesh.cube(), parentItem=self.root)
+        self.assertEqual(
+            list(self.view.draw_list),
+            [self.grandchild, self.child_01, self.root, self.child_02, mesh],
+        )